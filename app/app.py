@@ -1,54 +1,57 @@
 # app/app.py
 
-import sys
-from pathlib import Path
-
-APP_DIR = Path(__file__).resolve().parent
-SERVICES_DIR = APP_DIR / "services"
-
-# Add both folders to Python path
-sys.path.insert(0, str(APP_DIR))
-sys.path.insert(0, str(SERVICES_DIR))
-
-from device_health_app import (
-    load_orgs,
-    load_assets,
-    load_devices,
-    load_interfaces,
-    load_events,
-    compute_device_health
-)
-
-from dash import Dash, dcc, html, Input, Output, dash_table
+from services.dashboard_cache import dashboard_cache, REFRESH_SECONDS
+
+from dash import Dash, dcc, html, Input, Output, State, Patch, ctx, dash_table, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.graph_objects as go
 
 
-app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+# Tables are rendered inside tab content, so their callbacks target
+# components that are not in the initial layout.
+app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP],
+           suppress_callback_exceptions=True)
 app.title = "Intelligent Device Health Monitoring"
 
+# KPIs, country table, figures and table sources are precomputed once per
+# data change by a background worker; callbacks only read the snapshot.
+dashboard_cache.start()
+
+KPI_COLORS = {
+    "Organizations": "primary",
+    "Assets": "info",
+    "Devices": "success",
+    "Interfaces": "warning",
+    "Events": "danger",
+}
 
-def get_kpis(orgs, assets, devices, interfaces, events):
+
+def get_kpis(counts):
     return dbc.Row([
-        dbc.Col(dbc.Card([dbc.CardHeader("Organizations"),
-                          dbc.CardBody(html.H4(len(orgs)))],
-                         color="primary", inverse=True)),
-        dbc.Col(dbc.Card([dbc.CardHeader("Assets"),
-                          dbc.CardBody(html.H4(len(assets)))],
-                         color="info", inverse=True)),
-        dbc.Col(dbc.Card([dbc.CardHeader("Devices"),
-                          dbc.CardBody(html.H4(len(devices)))],
-                         color="success", inverse=True)),
-        dbc.Col(dbc.Card([dbc.CardHeader("Interfaces"),
-                          dbc.CardBody(html.H4(len(interfaces)))],
-                         color="warning", inverse=True)),
-        dbc.Col(dbc.Card([dbc.CardHeader("Events"),
-                          dbc.CardBody(html.H4(len(events)))],
-                         color="danger", inverse=True)),
+        dbc.Col(dbc.Card([dbc.CardHeader(name),
+                          dbc.CardBody(html.H4(counts[name], id=f"kpi-{name.lower()}"))],
+                         color=color, inverse=True))
+        for name, color in KPI_COLORS.items()
     ])
 
 
+def paged_table(table_id, source, page_size, **kwargs):
+    """DataTable whose paging, sorting and filtering run on the server."""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=source.columns,
+        page_current=0,
+        page_size=page_size,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        **kwargs
+    )
+
+
 app.layout = dbc.Container([
     html.H2("Intelligent Device Health Monitoring"),
     dcc.Tabs(id="tabs", value="overview", children=[
@@ -57,7 +60,13 @@ app.layout = dbc.Container([
         dcc.Tab(label="Devices", value="devices"),
         dcc.Tab(label="Events", value="events"),
     ]),
-    html.Div(id="content")
+    html.Div(id="content"),
+
+    # Change feed: each client polls for the delta since the version it last
+    # applied; an up-to-date client gets an empty (no-update) response.
+    dcc.Interval(id="refresh-interval", interval=REFRESH_SECONDS * 1000, n_intervals=0),
+    dcc.Store(id="client-version", data=None),
+    dcc.Store(id="feed-delta", data=None),
 ], fluid=True)
 
 
@@ -65,61 +74,18 @@ app.layout = dbc.Container([
               Input("tabs", "value"))
 def render(tab):
 
-    orgs = load_orgs()
-    assets = load_assets()
-    devices = load_devices()
-    interfaces = load_interfaces()
-    events = load_events()
-
-    if "country" not in orgs.columns:
-        orgs["country"] = "Unknown"
-
-    assets = assets.merge(
-        orgs[["organization_id", "country"]],
-        on="organization_id",
-        how="left"
-    )
-
-    devices = devices.merge(
-        assets[["asset_id", "country"]],
-        on="asset_id",
-        how="left"
-    )
-
-    devices["country"] = devices["country"].fillna("Unknown")
-
-    health_status, health_counts = compute_device_health(devices, events)
-
-    kpis = get_kpis(orgs, assets, devices, interfaces, events)
+    snapshot = dashboard_cache.get()
+    kpis = get_kpis(snapshot.counts)
 
     # ---------------- OVERVIEW ----------------
     if tab == "overview":
 
-        fig = go.Figure(data=[
-            go.Bar(name="Critical", x=["Devices"],
-                   y=[health_counts["Critical"]],
-                   marker_color="red"),
-            go.Bar(name="Warning", x=["Devices"],
-                   y=[health_counts["Warning"]],
-                   marker_color="orange"),
-            go.Bar(name="Healthy", x=["Devices"],
-                   y=[health_counts["Healthy"]],
-                   marker_color="green"),
-        ])
-
-        fig.update_layout(barmode="stack",
-                          title="Device Health Overview")
-
-        return html.Div([kpis, dcc.Graph(figure=fig)])
+        return html.Div([kpis, dcc.Graph(id="overview-graph", figure=snapshot.overview_figure)])
 
     # ---------------- COUNTRY KPI ----------------
     elif tab == "country":
 
-        df = pd.DataFrame({
-            "Organizations": orgs.groupby("country")["organization_id"].nunique(),
-            "Assets": assets.groupby("country")["asset_id"].nunique(),
-            "Devices": devices.groupby("country")["device_id"].nunique(),
-        }).fillna(0).reset_index()
+        df = snapshot.country_table
 
         return html.Div([
             kpis,
@@ -133,34 +99,89 @@ def render(tab):
     # ---------------- DEVICES ----------------
     elif tab == "devices":
 
-        devices["HealthStatus"] = devices["device_id"].map(health_status)
-
         return html.Div([
             kpis,
-            dash_table.DataTable(
-                data=devices.to_dict("records"),
-                columns=[{"name": i, "id": i} for i in devices.columns],
-                page_size=10
-            )
+            paged_table("devices-table", snapshot.tables["devices"], page_size=10)
         ])
 
     # ---------------- EVENTS (NEW) ----------------
     elif tab == "events":
 
-        # Optional: sort latest events first if timestamp exists
-        if "timestamp" in events.columns:
-            events = events.sort_values(by="timestamp", ascending=False)
-
         return html.Div([
             kpis,
-            dash_table.DataTable(
-                data=events.to_dict("records"),
-                columns=[{"name": i, "id": i} for i in events.columns],
-                page_size=15,
-                style_table={"overflowX": "auto"}
-            )
+            paged_table("events-table", snapshot.tables["events"], page_size=15,
+                        style_table={"overflowX": "auto"})
         ])
 
 
+# ---------------- CHANGE FEED ----------------
+@app.callback(Output("feed-delta", "data"),
+              Output("client-version", "data"),
+              Input("refresh-interval", "n_intervals"),
+              State("client-version", "data"))
+def poll_changes(_, client_version):
+    feed = dashboard_cache.feed
+    if client_version is None:
+        # Freshly rendered content already reflects the current snapshot
+        return no_update, feed.version
+    delta = feed.since(client_version)
+    if delta is None:
+        raise PreventUpdate
+    return delta, delta["version"]
+
+
+@app.callback([Output(f"kpi-{name.lower()}", "children") for name in KPI_COLORS],
+              Input("feed-delta", "data"),
+              prevent_initial_call=True)
+def patch_kpis(delta):
+    counts = (delta or {}).get("counts", {})
+    if not counts:
+        raise PreventUpdate
+    return [counts.get(name, no_update) for name in KPI_COLORS]
+
+
+@app.callback(Output("overview-graph", "figure"),
+              Input("feed-delta", "data"),
+              prevent_initial_call=True)
+def patch_overview(delta):
+    health_counts = (delta or {}).get("health_counts")
+    if not health_counts:
+        raise PreventUpdate
+    figure = Patch()
+    for i, trace in enumerate(dashboard_cache.get().overview_figure.data):
+        figure["data"][i]["y"] = [health_counts.get(trace.name, 0)]
+    return figure
+
+
+def _table_changed(delta, keys):
+    return bool(delta) and (delta.get("reset") or any(k in delta for k in keys))
+
+
+# ---------------- SERVER-SIDE TABLE PAGING ----------------
+@app.callback(Output("devices-table", "data"),
+              Output("devices-table", "page_count"),
+              Input("devices-table", "page_current"),
+              Input("devices-table", "page_size"),
+              Input("devices-table", "sort_by"),
+              Input("devices-table", "filter_query"),
+              Input("feed-delta", "data"))
+def page_devices(page_current, page_size, sort_by, filter_query, delta):
+    if ctx.triggered_id == "feed-delta" and not _table_changed(delta, ("changed_statuses", "counts")):
+        raise PreventUpdate
+    return dashboard_cache.get().tables["devices"].page(page_current, page_size, sort_by, filter_query)
+
+
+@app.callback(Output("events-table", "data"),
+              Output("events-table", "page_count"),
+              Input("events-table", "page_current"),
+              Input("events-table", "page_size"),
+              Input("events-table", "sort_by"),
+              Input("events-table", "filter_query"),
+              Input("feed-delta", "data"))
+def page_events(page_current, page_size, sort_by, filter_query, delta):
+    if ctx.triggered_id == "feed-delta" and not _table_changed(delta, ("new_events", "counts")):
+        raise PreventUpdate
+    return dashboard_cache.get().tables["events"].page(page_current, page_size, sort_by, filter_query)
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -1,19 +1,20 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import seaborn as sns
 
-def render_event_distribution(events_df):
+# Components plot precomputed count series (see services.data_service),
+# so render time does not depend on the number of events.
+
+def render_event_distribution(type_counts):
     st.subheader("Event Type Distribution")
     fig, ax = plt.subplots()
-    sns.countplot(data=events_df, x="event_type", ax=ax)
+    ax.bar(type_counts.index.astype(str), type_counts.to_numpy())
+    ax.set_xlabel("event_type")
+    ax.set_ylabel("count")
     plt.xticks(rotation=45)
     st.pyplot(fig)
 
-def render_events_over_time(events_df):
+def render_events_over_time(daily_counts):
     st.subheader("Events Over Time")
-    events_df["event_timestamp"] = pd.to_datetime(events_df["event_timestamp"])
-    grouped = events_df.groupby(events_df["event_timestamp"].dt.date).size()
-
     fig, ax = plt.subplots()
-    grouped.plot(ax=ax)
-    st.pyplot(fig)
\ No newline at end of file
+    daily_counts.plot(ax=ax)
+    st.pyplot(fig)
@@ -1,6 +1,5 @@
 import streamlit as st
 
-def device_filter(devices_df):
-    device_ids = devices_df["device_id"].unique()
+def device_filter(device_ids):
     selected = st.sidebar.selectbox("Select Device", device_ids)
-    return selected
\ No newline at end of file
+    return selected
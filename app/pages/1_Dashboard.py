@@ -1,5 +1,5 @@
 import streamlit as st
-from services.data_service import load_dashboard_data, load_events
+from services.data_service import load_dashboard_data, event_counts_by_type
 from components.kpis import render_kpis
 from components.charts import render_event_distribution
 
@@ -8,5 +8,4 @@ st.title("📊 System Overview")
 data = load_dashboard_data()
 render_kpis(data)
 
-events = load_events()
-render_event_distribution(events)
\ No newline at end of file
+render_event_distribution(event_counts_by_type())
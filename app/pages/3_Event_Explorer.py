@@ -1,12 +1,10 @@
 import streamlit as st
-from services.data_service import load_events
+from services.data_service import event_type_index, get_events_by_type
 from components.tables import render_event_table
 
 st.title("🚨 Event Explorer")
 
-events = load_events()
+event_type = st.selectbox("Filter by Event Type", event_type_index().keys())
+filtered = get_events_by_type(event_type)
 
-event_type = st.selectbox("Filter by Event Type", events["event_type"].unique())
-filtered = events[events["event_type"] == event_type]
-
-render_event_table(filtered)
\ No newline at end of file
+render_event_table(filtered)
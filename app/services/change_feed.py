@@ -0,0 +1,93 @@
+# app/services/change_feed.py
+
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MAX_NEW_EVENTS = 100  # new event records carried per delta (the rest are counted only)
+
+
+# -------------------------------------------------
+# 1️⃣  Snapshot diff
+# -------------------------------------------------
+def diff_snapshots(old, new) -> dict:
+    """
+    Delta between two dashboard snapshots: changed KPI / health counts,
+    events added since ``old`` and devices whose status changed.
+    Counts are absolute values, so applying a delta twice is harmless.
+    """
+    delta: dict = {}
+
+    counts = {k: v for k, v in new.counts.items() if old.counts.get(k) != v}
+    if counts:
+        delta["counts"] = counts
+    if new.health_counts != old.health_counts:
+        delta["health_counts"] = new.health_counts
+
+    old_status = pd.Series(old.health_status, dtype=object)
+    new_status = pd.Series(new.health_status, dtype=object)
+    changed = new_status[new_status.ne(old_status.reindex(new_status.index))]
+    if not changed.empty:
+        delta["changed_statuses"] = changed.to_dict()
+
+    new_ids = new.event_ids[~np.isin(new.event_ids, old.event_ids)]
+    if len(new_ids):
+        events = new.tables["events"].df
+        rows = events[events["event_id"].isin(new_ids[:MAX_NEW_EVENTS])]
+        delta["new_event_count"] = int(len(new_ids))
+        delta["new_events"] = rows.to_dict("records")
+
+    return delta
+
+
+# -------------------------------------------------
+# 2️⃣  Versioned feed
+# -------------------------------------------------
+class ChangeFeed:
+    """
+    Bounded, versioned log of dashboard deltas.
+
+    Clients remember the last version they applied and ask for everything
+    since; an up-to-date client gets ``None`` (nothing to send). Clients older
+    than the retained window get a ``reset`` delta with absolute totals.
+    """
+
+    def __init__(self, max_entries: int = 100):
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self.version = 0
+        self._latest_totals: dict = {}
+
+    def publish(self, version: int, delta: dict, totals: dict):
+        """Record the delta that produced ``version`` plus that version's absolute totals."""
+        with self._lock:
+            self._entries.append((version, delta))
+            self.version = version
+            self._latest_totals = totals
+
+    def since(self, client_version: Optional[int]) -> Optional[dict]:
+        """Merged delta from ``client_version`` to the current version, or None if up to date."""
+        with self._lock:
+            if client_version is not None and client_version >= self.version:
+                return None
+            oldest = self._entries[0][0] if self._entries else self.version + 1
+            if client_version is None or client_version + 1 < oldest:
+                return {"version": self.version, "reset": True, **self._latest_totals}
+
+            merged: Dict = {"version": self.version}
+            for version, delta in self._entries:
+                if version <= client_version:
+                    continue
+                for key, value in delta.items():
+                    if key in ("changed_statuses", "counts"):
+                        merged.setdefault(key, {}).update(value)
+                    elif key == "new_events":
+                        merged[key] = (merged.get(key, []) + value)[-MAX_NEW_EVENTS:]
+                    elif key == "new_event_count":
+                        merged[key] = merged.get(key, 0) + value
+                    else:
+                        merged[key] = value
+            return merged
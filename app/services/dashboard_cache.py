@@ -0,0 +1,216 @@
+# app/services/dashboard_cache.py
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+from services.device_health_app import (
+    DATA_ROOT,
+    load_orgs,
+    load_assets,
+    load_devices,
+    load_interfaces,
+    load_events,
+    compute_device_health,
+    compute_health_rollup,
+    update_health_rollup,
+    country_kpis
+)
+from services.table_service import TableSource
+from health.rollup import HealthRollup
+from transformation.encoding import COLUMN_KINDS
+from services.change_feed import ChangeFeed, diff_snapshots
+from utils.config import get_section
+from utils.logger import get_logger
+
+logger = get_logger("dashboard_cache")
+
+# -------------------------------------------------
+# 1️⃣  Config
+# -------------------------------------------------
+DASHBOARD_CONFIG = get_section("dashboard")
+REFRESH_SECONDS = DASHBOARD_CONFIG.get("refresh_seconds", 60)
+
+EVENTS_FILE = DATA_ROOT / "event" / "events.csv"
+WATCHED_FILES = [
+    DATA_ROOT / "organization" / "organization.csv",
+    DATA_ROOT / "asset" / "assets.csv",
+    DATA_ROOT / "device" / "devices.csv",
+    DATA_ROOT / "interface" / "interfaces.csv",
+    EVENTS_FILE,
+]
+
+HEALTH_COLORS = {"Critical": "red", "Warning": "orange", "Healthy": "green"}
+
+
+# -------------------------------------------------
+# 2️⃣  Snapshot: everything the callbacks need, precomputed
+# -------------------------------------------------
+class DashboardSnapshot:
+    def __init__(self, version: int, counts: Dict[str, int], health_status: dict,
+                 health_counts: Dict[str, int], rollup: HealthRollup, country_table, overview_figure,
+                 tables: Dict[str, TableSource], event_ids: np.ndarray):
+        self.version = version
+        self.built_at = datetime.now()
+        self.counts = counts
+        self.health_status = health_status
+        self.health_counts = health_counts
+        self.rollup = rollup
+        self.country_table = country_table
+        self.overview_figure = overview_figure
+        self.tables = tables
+        self.event_ids = event_ids
+
+
+def health_overview_figure(health_counts: Dict[str, int]) -> go.Figure:
+    fig = go.Figure(data=[
+        go.Bar(name=status, x=["Devices"], y=[health_counts.get(status, 0)],
+               marker_color=HEALTH_COLORS.get(status))
+        for status in ("Critical", "Warning", "Healthy")
+    ])
+    fig.update_layout(barmode="stack", title="Device Health Overview")
+    return fig
+
+
+def build_snapshot(version: int = 0, previous: Optional[DashboardSnapshot] = None) -> DashboardSnapshot:
+    """
+    Load the CSVs once and precompute KPIs, country table, figure and table sources.
+
+    ``previous`` is passed when only events changed since it was built: the
+    hierarchy is the same, so its rollup is updated with the devices whose
+    status changed instead of being rebuilt.
+    """
+    orgs = load_orgs()
+    assets = load_assets()
+    devices = load_devices()
+    interfaces = load_interfaces()
+    events = load_events()
+
+    if "country" not in orgs.columns:
+        orgs["country"] = "Unknown"
+
+    assets = assets.merge(orgs[["organization_id", "country"]], on="organization_id", how="left")
+    devices = devices.merge(assets[["asset_id", "country"]], on="asset_id", how="left")
+    devices["country"] = devices["country"].fillna("Unknown").astype("category")
+
+    health_status, health_counts = compute_device_health(devices, events)
+    devices["HealthStatus"] = devices["device_id"].map(health_status)
+
+    if previous is not None:
+        rollup = update_health_rollup(previous.rollup, previous.health_status, health_status)
+    else:
+        rollup = compute_health_rollup(orgs, assets, devices, interfaces, health_status)
+
+    # Latest events first
+    time_col = next((c for c in ("event_timestamp", "timestamp") if c in events.columns), None)
+
+    return DashboardSnapshot(
+        version=version,
+        counts={
+            "Organizations": len(orgs),
+            "Assets": len(assets),
+            "Devices": len(devices),
+            "Interfaces": len(interfaces),
+            "Events": len(events),
+        },
+        health_status=health_status,
+        health_counts=health_counts,
+        rollup=rollup,
+        country_table=country_kpis(rollup),
+        overview_figure=health_overview_figure(health_counts),
+        tables={
+            "devices": TableSource(devices, encodings=COLUMN_KINDS),
+            "events": TableSource(events, sort_by=time_col, ascending=False, encodings=COLUMN_KINDS),
+        },
+        event_ids=events["event_id"].to_numpy() if "event_id" in events.columns else np.empty(0),
+    )
+
+
+# -------------------------------------------------
+# 3️⃣  Shared cache with background refresh
+# -------------------------------------------------
+class DashboardCache:
+    """
+    Holds the current snapshot for all callbacks in the process.
+
+    A daemon thread polls the source files' (mtime, size) signature and rebuilds
+    the snapshot only when it changes; readers always get the last complete
+    snapshot and never trigger a recompute themselves. Each rebuild publishes
+    its delta against the previous snapshot to ``feed``.
+    """
+
+    def __init__(self, builder: Callable[[int, Optional[DashboardSnapshot]], DashboardSnapshot] = build_snapshot,
+                 watched_files: Iterable = WATCHED_FILES,
+                 refresh_seconds: float = REFRESH_SECONDS):
+        self.builder = builder
+        self.watched_files = list(watched_files)
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[DashboardSnapshot] = None
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.feed = ChangeFeed()
+
+    def _data_signature(self) -> Tuple:
+        signature = []
+        for path in self.watched_files:
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the snapshot if the data changed. Returns True when rebuilt."""
+        with self._lock:
+            signature = self._data_signature()
+            if not force and self._snapshot is not None and signature == self._signature:
+                return False
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            # Only events.csv changed: the builder can update the previous rollup in place
+            events_only = not force and self._snapshot is not None and all(
+                new == old for new, old in zip(signature, self._signature) if new[0] != str(EVENTS_FILE))
+            started = time.perf_counter()
+            snapshot = self.builder(version, self._snapshot if events_only else None)
+            delta = diff_snapshots(self._snapshot, snapshot) if self._snapshot else {}
+            self._snapshot, self._signature = snapshot, signature
+            self.feed.publish(version, delta, totals={
+                "counts": snapshot.counts,
+                "health_counts": snapshot.health_counts,
+            })
+        logger.info("Dashboard snapshot v%d built in %.2fs", version, time.perf_counter() - started)
+        return True
+
+    def get(self) -> DashboardSnapshot:
+        """Current snapshot (built synchronously only on first use)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Dashboard snapshot refresh failed; keeping previous snapshot")
+
+    def start(self):
+        """Start the background refresh worker (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dashboard-cache", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+dashboard_cache = DashboardCache()
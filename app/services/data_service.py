@@ -2,17 +2,45 @@ import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+from services.index_service import GroupIndex
+from transformation.encoding import decode_frame, encode_frame
+from transformation.snapshots import SnapshotStore
+
 DATA_PATH = Path("../data/processed")
+SNAPSHOTS = SnapshotStore()
+
+# Frames and indexes are cached as shared resources: st.cache_data would
+# copy (pickle round-trip) the whole events frame on every rerun, which
+# defeats O(result) lookups. Callers must treat these frames as read-only.
+# IPs and serials are held in binary form and text columns as categoricals;
+# the get_* lookups decode the rows they return for display.
+
+# The devices snapshot is cached per store version (see transformation.snapshots):
+# a rerun after `device-health snapshot` picks up the new version, older ones
+# are evicted. Without a store, the exported devices_snapshot.csv is used.
+@st.cache_resource(max_entries=2)
+def _devices(version):
+    df = SNAPSHOTS.read("devices") if version is not None else pd.read_csv(DATA_PATH / "devices_snapshot.csv")
+    return encode_frame(df)
 
-@st.cache_data
 def load_devices():
-    return pd.read_csv(DATA_PATH / "devices_snapshot.csv")
+    return _devices(SNAPSHOTS.version)
 
-@st.cache_data
+@st.cache_resource
 def load_events():
-    return pd.read_csv(DATA_PATH / "events_snapshot_sample.csv")
+    # Timestamps are parsed once here; charts never re-parse them
+    return encode_frame(pd.read_csv(DATA_PATH / "events_snapshot_sample.csv", parse_dates=["event_timestamp"]))
 
 def load_dashboard_data():
+    # Counters maintained by the snapshot store: fresh without reading any rows
+    totals = SNAPSHOTS.totals()
+    if totals:
+        return {
+            "total_devices": totals["devices"],
+            "total_events": totals["events"],
+            "avg_events_per_device": totals["events"] / max(totals["devices"], 1)
+        }
+
     devices = load_devices()
     events = load_events()
 
@@ -20,4 +48,49 @@ def load_dashboard_data():
         "total_devices": len(devices),
         "total_events": len(events),
         "avg_events_per_device": devices["num_events"].mean()
-    }
\ No newline at end of file
+    }
+
+# -----------------------
+# Group indexes (built once, O(result) lookups)
+# -----------------------
+@st.cache_resource(max_entries=2)
+def _device_index(version):
+    return GroupIndex(_devices(version)["device_id"])
+
+def device_index():
+    """device_id -> row positions in load_devices()."""
+    return _device_index(SNAPSHOTS.version)
+
+@st.cache_resource
+def device_event_index():
+    """device_id -> row positions in load_events()."""
+    return GroupIndex(load_events()["device_id"])
+
+@st.cache_resource
+def event_type_index():
+    """event_type -> row positions in load_events()."""
+    return GroupIndex(load_events()["event_type"])
+
+def get_device(device_id):
+    version = SNAPSHOTS.version
+    return decode_frame(_device_index(version).take(_devices(version), device_id))
+
+def get_device_events(device_id):
+    return decode_frame(device_event_index().take(load_events(), device_id))
+
+def get_events_by_type(event_type):
+    return decode_frame(event_type_index().take(load_events(), event_type))
+
+# -----------------------
+# Precomputed chart series
+# -----------------------
+@st.cache_resource
+def event_counts_by_day():
+    """Events per calendar day, indexed by day."""
+    timestamps = load_events()["event_timestamp"]
+    return timestamps.groupby(timestamps.dt.floor("D")).size()
+
+@st.cache_resource
+def event_counts_by_type():
+    """Events per event_type (read off the event_type index)."""
+    return event_type_index().counts()
@@ -1,9 +1,10 @@
 # app/services/device_health_app.py
 
-import sys
 from pathlib import Path
 import pandas as pd
 
+from transformation.encoding import encode_frame
+
 
 # -------------------------------------------------
 # 1️⃣  Resolve repo root safely
@@ -12,16 +13,7 @@ CURRENT_FILE = Path(__file__).resolve()
 REPO_ROOT = CURRENT_FILE.parent.parent.parent
 
 # -------------------------------------------------
-# 2️⃣  Add src folder to Python path
-# -------------------------------------------------
-SRC_PATH = REPO_ROOT / "src"
-
-if str(SRC_PATH) not in sys.path:
-    sys.path.insert(0, str(SRC_PATH))
-
-
-# -------------------------------------------------
-# 3️⃣  Data paths
+# 2️⃣  Data paths
 # -------------------------------------------------
 DATA_ROOT = REPO_ROOT / "data" / "raw"
 
@@ -33,8 +25,11 @@ def load_csv(relative_path: str):
     return pd.read_csv(file_path)
 
 
+# Device, interface and event frames hold IPs / MACs / serials in binary form
+# and low-cardinality text as categoricals; decode_frame() turns them back
+# into text for display.
 def load_devices():
-    return load_csv("device/devices.csv")
+    return encode_frame(load_csv("device/devices.csv"))
 
 
 def load_assets():
@@ -46,77 +41,94 @@ def load_orgs():
 
 
 def load_interfaces():
-    return load_csv("interface/interfaces.csv")
+    return encode_frame(load_csv("interface/interfaces.csv"))
 
 
 def load_events():
-    return load_csv("event/events.csv")
+    return encode_frame(load_csv("event/events.csv"))
 
 
 # -------------------------------------------------
-# 4️⃣  PURE EVENT-BASED HEALTH SCORING (No external dependency)
+# 3️⃣  PURE EVENT-BASED HEALTH SCORING (rules from config.yaml)
 # -------------------------------------------------
+from health.rules import get_rules
+
+
 def compute_device_health(devices: pd.DataFrame,
                           events: pd.DataFrame):
     """
     Computes device health directly from events DataFrame.
-    No dependency on health_scoring module.
-    Fully aligned with CSV schema.
+    Penalties and status bands come from the compiled health rules;
+    scoring is vectorized (one penalty lookup per distinct event type).
     """
+    rules = get_rules()
 
     if devices.empty:
-        return {}, {"Critical": 0, "Warning": 0, "Healthy": 0}
-
-    # Initialize all devices with perfect health
-    scores = {device_id: 100 for device_id in devices["device_id"]}
+        return {}, rules.status_counts([])
 
-    # If no events, all devices are Healthy
-    if events.empty or "device_id" not in events.columns:
-        health_status = {k: "Healthy" for k in scores}
-        return health_status, {
-            "Critical": 0,
-            "Warning": 0,
-            "Healthy": len(scores)
-        }
+    device_ids = devices["device_id"].to_numpy()
+    scores = pd.Series(float(rules.max_score), index=device_ids)
 
     # Deduct score based on event_type
-    for _, event in events.iterrows():
+    if not events.empty and "device_id" in events.columns:
+        event_types = events["event_type"] if "event_type" in events.columns \
+            else pd.Series("", index=events.index)
+        penalties = pd.Series(rules.penalty_series(event_types), index=events.index)
+        deductions = penalties.groupby(events["device_id"]).sum()
+        scores = scores.sub(deductions.reindex(device_ids, fill_value=0).to_numpy())
 
-        device_id = event.get("device_id")
-        event_type = str(event.get("event_type", "")).lower()
+    # Clamp and categorize
+    statuses = rules.classify_series(rules.clamp_series(scores.to_numpy()))
+    health_status = dict(zip(device_ids.tolist(), statuses.tolist()))
+
+    return health_status, rules.status_counts(statuses)
 
-        if device_id not in scores:
-            continue
 
-        if event_type == "high_cpu":
-            scores[device_id] -= 5
-        elif event_type == "high_memory":
-            scores[device_id] -= 0
-        elif event_type == "interface_down":
-            scores[device_id] -= 5
-        elif event_type == "critical_error":
-            scores[device_id] -= 10
-        else:
-            scores[device_id] -= 0
-
-    # Clamp between 0–100
-    for device_id in scores:
-        scores[device_id] = max(0, min(100, scores[device_id]))
-
-    # Categorize
-    health_status = {}
-    health_counts = {"Critical": 0, "Warning": 0, "Healthy": 0}
-
-    for device_id, score in scores.items():
-
-        if score == 90:
-            status = "Critical"
-        elif score == 95:
-            status = "Warning"
-        else:
-            status = "Healthy"
-
-        health_status[device_id] = status
-        health_counts[status] += 1
-
-    return health_status, health_counts
\ No newline at end of file
+# -------------------------------------------------
+# 4️⃣  FLEET ROLLUPS (interface -> device -> asset -> org -> country)
+# -------------------------------------------------
+from health.rollup import HealthRollup
+
+
+def compute_health_rollup(orgs: pd.DataFrame,
+                          assets: pd.DataFrame,
+                          devices: pd.DataFrame,
+                          interfaces: pd.DataFrame,
+                          health_status: dict) -> HealthRollup:
+    """
+    Builds the fleet hierarchy once and rolls entity counts and
+    per-status device counts up to every level.
+    """
+    rollup = HealthRollup.from_frames(orgs, assets, devices, interfaces)
+    statuses = devices["device_id"].map(health_status).to_numpy()
+    for status in get_rules().statuses:
+        rollup.set_leaf("device", status, statuses == status, rollup=False)
+    rollup.rollup()
+    return rollup
+
+
+def update_health_rollup(rollup: HealthRollup, old_status: dict, new_status: dict) -> HealthRollup:
+    """
+    Folds device status changes into an existing rollup (same hierarchy),
+    walking only the changed devices' ancestor chains.
+    """
+    for device_id, status in new_status.items():
+        previous = old_status.get(device_id)
+        if status == previous:
+            continue
+        if previous is not None:
+            rollup.update("device", device_id, previous, 0.0)
+        rollup.update("device", device_id, status, 1.0)
+    return rollup
+
+
+def country_kpis(rollup: HealthRollup) -> pd.DataFrame:
+    """Country KPI table straight from the rollup (no joins or groupbys)."""
+    df = rollup.frame("country").rename(columns={
+        "organizations": "Organizations",
+        "assets": "Assets",
+        "devices": "Devices",
+        "interfaces": "Interfaces",
+    })
+    columns = ["Organizations", "Assets", "Devices", "Interfaces", *get_rules().statuses]
+    return df[columns].astype(int).reset_index()
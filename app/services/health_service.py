@@ -1,6 +1,6 @@
+from health.rules import get_rules
+
+
 def classify_health(score):
-    if score >= 80:
-        return "Healthy"
-    elif score >= 50:
-        return "Warning"
-    return "Critical"
\ No newline at end of file
+    """Status band for a health score (thresholds from config.yaml)."""
+    return get_rules().classify(score)
@@ -0,0 +1,45 @@
+# app/services/index_service.py
+
+from typing import Hashable, List
+
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    """
+    Maps each distinct value of a column to the row positions holding it.
+
+    Built once with a factorize + stable argsort (O(n log n)); a lookup is a
+    hash probe plus a slice, so selecting a group costs O(result), not O(rows).
+    """
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values, sort=True)
+        valid = codes >= 0
+        self._keys = pd.Index(uniques)
+        self._order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> List[Hashable]:
+        """Distinct values, sorted."""
+        return self._keys.tolist()
+
+    def counts(self) -> pd.Series:
+        """Rows per distinct value, indexed by value (free: read off the offsets)."""
+        return pd.Series(np.diff(self._offsets), index=self._keys, name="count")
+
+    def positions(self, key: Hashable) -> np.ndarray:
+        """Row positions for ``key`` (empty when the key is unknown)."""
+        loc = self._keys.get_indexer([key])[0]
+        if loc < 0:
+            return np.empty(0, dtype=np.intp)
+        return self._order[self._offsets[loc]:self._offsets[loc + 1]]
+
+    def take(self, df: pd.DataFrame, key: Hashable) -> pd.DataFrame:
+        """Rows of ``df`` (the frame the index was built from) matching ``key``."""
+        return df.iloc[self.positions(key)]
@@ -0,0 +1,140 @@
+# app/services/table_service.py
+
+from functools import lru_cache
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from transformation.encoding import decode_frame, decode_series, encode_value
+
+
+# -------------------------------------------------
+# 1️⃣  Dash DataTable filter syntax
+# -------------------------------------------------
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def split_filter_part(filter_part: str):
+    """Parse one ``{column} op value`` clause of a DataTable ``filter_query``."""
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+
+                value_part = value_part.strip()
+                v0 = value_part[0] if value_part else ""
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                # word operators need spaces after them in the filter string,
+                # but we don't want these later
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+# -------------------------------------------------
+# 2️⃣  Paged table source
+# -------------------------------------------------
+class TableSource:
+    """
+    Serves DataTable pages from a frame held server-side.
+
+    Sort orders are computed once per (column, direction) and filter masks are
+    cached per clause, so a page request costs one mask combine plus a slice;
+    only the rows of the visible page are converted to records.
+
+    Columns named in ``encodings`` (see ``transformation.encoding``) stay in
+    binary form: they sort and compare on their codes and are decoded only
+    for text filters and for the rows of the visible page.
+    """
+
+    def __init__(self, df: pd.DataFrame, sort_by: Optional[str] = None, ascending: bool = True,
+                 encodings: Optional[Dict[str, str]] = None):
+        if sort_by is not None and sort_by in df.columns:
+            df = df.sort_values(sort_by, ascending=ascending, kind="stable")
+        self.df = df.reset_index(drop=True)
+        self.encodings = {c: kind for c, kind in (encodings or {}).items()
+                          if c in self.df.columns and kind != "category"}
+        self._sort_orders = {}
+        self._filter_masks = lru_cache(maxsize=32)(self._filter_mask)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def columns(self) -> List[dict]:
+        return [{"name": c, "id": c} for c in self.df.columns]
+
+    def _sort_order(self, column: str, ascending: bool) -> np.ndarray:
+        key = (column, ascending)
+        if key not in self._sort_orders:
+            order = self.df[column].sort_values(ascending=ascending, kind="stable").index.to_numpy()
+            self._sort_orders[key] = order
+        return self._sort_orders[key]
+
+    def _filter_mask(self, clause: str) -> Optional[np.ndarray]:
+        column, operator, value = split_filter_part(clause)
+        if column not in self.df.columns:
+            return None
+        series = self.df[column]
+        kind = self.encodings.get(column)
+        if kind is not None:
+            text = str(value).removesuffix(".0") if isinstance(value, float) else str(value)
+            try:
+                value = encode_value(text, kind) if operator in ("eq", "ne", "lt", "le", "gt", "ge") else None
+            except ValueError:
+                value = None
+            if value is None:   # text operators and partial values match on the display form
+                series, value = decode_series(series, kind), text
+        if operator in ("eq", "ne", "lt", "le", "gt", "ge"):
+            if isinstance(value, float) and not pd.api.types.is_numeric_dtype(series):
+                value = str(value).removesuffix(".0")
+            ops = {"eq": series.eq, "ne": series.ne, "lt": series.lt,
+                   "le": series.le, "gt": series.gt, "ge": series.ge}
+            mask = ops[operator](value)
+        elif operator == "contains":
+            mask = series.astype(str).str.contains(str(value), regex=False)
+        elif operator == "datestartswith":
+            mask = series.astype(str).str.startswith(str(value))
+        else:
+            return None
+        return mask.fillna(False).to_numpy(dtype=bool)
+
+    def positions(self, sort_by: Optional[list] = None, filter_query: str = "") -> np.ndarray:
+        """Row positions matching the filter, in the requested order."""
+        mask = None
+        for clause in filter(None, (filter_query or "").split(" && ")):
+            clause_mask = self._filter_masks(clause)
+            if clause_mask is not None:
+                mask = clause_mask if mask is None else mask & clause_mask
+
+        if sort_by:
+            order = self._sort_order(sort_by[0]["column_id"], sort_by[0]["direction"] == "asc")
+            return order[mask[order]] if mask is not None else order
+        return np.flatnonzero(mask) if mask is not None else np.arange(len(self.df))
+
+    def page(self, page_current: int = 0, page_size: int = 10,
+             sort_by: Optional[list] = None, filter_query: str = "") -> Tuple[List[dict], int]:
+        """Return ``(records, page_count)`` for the requested page."""
+        positions = self.positions(sort_by, filter_query)
+        page_count = max(1, math.ceil(len(positions) / page_size))
+        start = (page_current or 0) * page_size
+        rows = decode_frame(self.df.iloc[positions[start:start + page_size]], self.encodings)
+        return rows.to_dict("records"), page_count
@@ -0,0 +1,116 @@
+# benchmarks/bench_encoding_memory.py
+"""
+Memory of devices and interfaces: plain strings vs the compact encodings.
+
+    python benchmarks/bench_encoding_memory.py
+    python benchmarks/bench_encoding_memory.py --data-dir data/synthetic/x10 --baseline <rev>
+
+Objects: builds Device / Interface objects from the raw CSVs with the
+relational model at ``--baseline`` (default: the commit before
+transformation/encoding.py was added) and at the working tree, each in a
+fresh process, and reports the memory the objects retain (tracemalloc).
+The sample data in data/raw has near-unique manufacturer names, so interning
+them saves nothing there; ``device-health generate`` fleets use a realistic
+vendor list.
+Frames: ``memory_usage(deep=True)`` of the app's device / interface / event
+frames as read from CSV vs after ``encode_frame``, plus encode and
+display-decode times.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+OBJECTS = """
+import csv, gc, json, sys, tracemalloc
+from transformation.relational_model import Organization, Asset, DeviceClass, Device, Interface
+data_dir = sys.argv[1]
+rows = lambda name: csv.DictReader(open(f"{data_dir}/{name}", newline="", encoding="utf-8-sig"))
+asset = Asset(1, "asset", Organization(1, "org", org_country="USA"))
+device_class = DeviceClass(1, "class")
+result = {}
+
+# Retained memory once the parsed rows are gone (what the loaded graph costs)
+tracemalloc.start()
+devices = {}
+for row in rows("device/devices.csv"):
+    devices[int(row["device_id"])] = Device(int(row["device_id"]), row["ip_address"], asset, device_class,
+                                            row["serial_number"], row["manufacturer"])
+gc.collect()
+result["devices"] = tracemalloc.get_traced_memory()[0]
+interfaces = [Interface(int(row["interface_id"]), row["name"], devices[int(row["device_id"])],
+                        row["status"], row["mac_address"]) for row in rows("interface/interfaces.csv")]
+gc.collect()
+result["interfaces"] = tracemalloc.get_traced_memory()[0] - result["devices"]
+print(json.dumps(result))
+"""
+
+
+def baseline_rev() -> str:
+    added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--",
+                            "src/transformation/encoding.py"], cwd=REPO_ROOT,
+                           capture_output=True, text=True, check=True).stdout.split()
+    return f"{added[-1]}~1" if added else "HEAD"
+
+
+def object_memory(src: Path, data_dir: Path) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(src), str(REPO_ROOT)]),
+               DEVICE_HEALTH_METRICS_FILE=os.devnull)
+    out = subprocess.run([sys.executable, "-c", OBJECTS, str(data_dir)], env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def frame_memory(data_dir: Path):
+    import pandas as pd
+    from transformation.encoding import decode_frame, encode_frame
+
+    print(f"\n{'frame':<14}{'rows':>9}{'csv MB':>9}{'encoded MB':>12}{'encode s':>10}{'decode s':>10}")
+    for name, path in (("devices", "device/devices.csv"), ("interfaces", "interface/interfaces.csv"),
+                       ("events", "event/events.csv")):
+        if not (data_dir / path).exists():
+            continue
+        df = pd.read_csv(data_dir / path)
+        started = time.perf_counter()
+        encoded = encode_frame(df)
+        encode_s = time.perf_counter() - started
+        started = time.perf_counter()
+        decode_frame(encoded)
+        decode_s = time.perf_counter() - started
+        mb = lambda frame: frame.memory_usage(deep=True).sum() / 1e6
+        print(f"{name:<14}{len(df):>9,}{mb(df):>9.2f}{mb(encoded):>12.2f}{encode_s:>10.3f}{decode_s:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=REPO_ROOT / "data" / "raw")
+    parser.add_argument("--baseline", default=None, help="git revision with the string-based model")
+    args = parser.parse_args()
+    data_dir = args.data_dir.resolve()
+    rev = args.baseline or baseline_rev()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(["git", "archive", rev, "src"], cwd=REPO_ROOT, capture_output=True, check=True)
+        tarfile.open(fileobj=BytesIO(archive.stdout)).extractall(tmp, filter="data")
+        before = object_memory(Path(tmp) / "src", data_dir)
+    after = object_memory(REPO_ROOT / "src", data_dir)
+
+    print(f"objects: {rev} vs working tree ({data_dir})\n")
+    print(f"{'entities':<14}{'before MB':>11}{'after MB':>10}{'saved':>8}")
+    for name in ("devices", "interfaces"):
+        print(f"{name:<14}{before[name] / 1e6:>11.2f}{after[name] / 1e6:>10.2f}"
+              f"{1 - after[name] / before[name]:>8.0%}")
+    frame_memory(data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_feature_matrix.py
+"""
+Model-input loading: feature CSV + DataFrame.drop vs the persisted float32 matrix.
+
+    python benchmarks/bench_feature_matrix.py --repeat-rows 10
+
+Builds features from data/aggregated_device_1h.csv (tiled ``--repeat-rows``
+times), writes both formats to a temp dir and times producing the array a
+model consumes in a fresh process (imports excluded, file in page cache).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+SETUP = "import numpy as np, pandas as pd\nfrom features.feature_matrix import load_feature_matrix\n"
+LOADERS = {
+    "csv": """
+df = pd.read_csv(PATH)
+X = df.drop(columns=["target", "timestamp", "device_id"], errors="ignore").to_numpy(dtype=np.float32)
+""",
+    "matrix (mmap)": "X = load_feature_matrix(PATH).X\n",
+    "matrix (read)": "X = load_feature_matrix(PATH, mmap=False).X\n",
+}
+
+
+def time_in_fresh_process(loader: str, path: Path) -> float:
+    code = (SETUP + "import time; t = time.perf_counter()\n" + LOADERS[loader].replace("PATH", repr(str(path)))
+            + "X.sum()\nprint(time.perf_counter() - t)")
+    env = dict(os.environ, DEVICE_HEALTH_METRICS_FILE=os.devnull)
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat-rows", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from features.feature_engineering import FEATURE_COLS, build_features, load_aggregates
+    from features.feature_matrix import write_feature_matrix
+
+    base = load_aggregates(REPO_ROOT / "data" / "aggregated_device_1h.csv")
+    frames = []
+    for i in range(args.repeat_rows):
+        copy = base.copy()
+        copy["device_id"] += i * (base["device_id"].max() + 1)
+        frames.append(copy)
+    df = build_features(pd.concat(frames, ignore_index=True))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, matrix_dir = Path(tmp) / "device_features.csv", Path(tmp) / "feature_matrix"
+        df.to_csv(csv_path, index=False)
+        write_feature_matrix(df, FEATURE_COLS, matrix_dir, source=csv_path)
+        size = lambda p: sum(f.stat().st_size for f in ([p] if p.is_file() else p.iterdir())) / 1e6
+        print(f"{len(df):,} rows: csv {size(csv_path):.1f} MB, matrix dir {size(matrix_dir):.1f} MB\n")
+        print(f"{'loader':<16}{'median s':>10}")
+        for loader in LOADERS:
+            path = csv_path if loader == "csv" else matrix_dir
+            times = sorted(time_in_fresh_process(loader, path) for _ in range(args.runs))
+            print(f"{loader:<16}{times[len(times) // 2]:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_import_time.py
+"""
+Cold-start import cost of each pipeline command's module (python -X importtime).
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --root /path/to/other/checkout   # compare trees
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+COMMANDS = {
+    "cli": "pipeline.cli",
+    "run": "pipeline.run_pipeline",
+    "score": "health.health_scoring",
+    "aggregate": "health.window_aggregation",
+    "features": "features.feature_engineering",
+    "train": "models.train",
+    "evaluate": "models.evaluate",
+    "predict": "inference.predict",
+    "anomaly": "models.anomaly_detection",
+}
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_time_ms(module: str, root: Path) -> float:
+    """Cumulative microseconds of ``import module`` in a fresh interpreter, in ms."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        str(p) for p in (root / "src", root, root / "src" / "models")))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    cumulative = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:   # top-level imports only
+            cumulative += int(match.group(2))
+    return cumulative / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'command':<12}{'module':<32}{'median ms':>10}")
+    for command, module in COMMANDS.items():
+        try:
+            times = [import_time_ms(module, args.root) for _ in range(args.repeat)]
+            print(f"{command:<12}{module:<32}{statistics.median(times):>10.1f}")
+        except ImportError as e:
+            print(f"{command:<12}{module:<32}{'failed':>10}  {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_logging.py
+"""
+Scoring throughput of calculate_device_health with per-device logging off,
+synchronous, and queue-based (background listener).
+
+    python benchmarks/bench_logging.py --devices 200000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Keep benchmark logs out of the repo's logs/ directory
+os.environ["DEVICE_HEALTH_LOG_FILE"] = os.path.join(tempfile.mkdtemp(prefix="bench_logging_"), "pipeline.log")
+
+# Console handlers bind sys.stderr when created, so silence it before the imports
+sys.stderr = open(os.devnull, "w")
+
+from utils import logger as log_utils
+from transformation.relational_model import Organization, Asset, Device, Event
+from health import health_scoring
+
+
+def synthetic_devices(n_devices: int, events_per_device: int = 5):
+    org = Organization(1, "org")
+    asset = Asset(1, "asset", org)
+    fleet = []
+    for device_id in range(n_devices):
+        device = Device(device_id, "10.0.0.1", asset)
+        events = [Event(i, datetime(2025, 1, 1), device, event_type=("error" if i % 4 == 0 else "high_cpu"))
+                  for i in range(events_per_device)]
+        fleet.append((device, events))
+    return fleet
+
+
+def run(fleet, label):
+    started = time.perf_counter()
+    for device, events in fleet:
+        health_scoring.calculate_device_health(device, events)
+    elapsed = time.perf_counter() - started
+    log_utils.shutdown_logging()  # drain the queue so its cost is not hidden in the next run
+    drained = time.perf_counter() - started
+    print(f"{label:<30}{len(fleet) / elapsed:>12,.0f} devices/s  "
+          f"({elapsed:.2f}s, {drained:.2f}s incl. drain)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200_000)
+    args = parser.parse_args()
+
+    fleet = synthetic_devices(args.devices)
+    logger = health_scoring.logger
+
+    logger.setLevel(logging.INFO)          # debug lines filtered, never formatted
+    run(fleet, "logging off (INFO level)")
+
+    logger.setLevel(logging.DEBUG)
+    log_utils.configure_logging(queue_mode=False)
+    for handler in logger.handlers:
+        handler.setLevel(logging.DEBUG)
+    run(fleet, "DEBUG, synchronous handlers")
+
+    log_utils.configure_logging(queue_mode=True)
+    run(fleet, "DEBUG, queue handler")
+
+
+if __name__ == "__main__":
+    main()
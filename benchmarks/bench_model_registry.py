@@ -0,0 +1,155 @@
+# benchmarks/bench_model_registry.py
+"""
+Model load time and per-process memory: joblib pickle vs memory-mapped registry.
+
+    python benchmarks/bench_model_registry.py --workers 8
+    python benchmarks/bench_model_registry.py --model xgboost --trees 400
+
+Trains a model on synthetic feature rows, saves it both as a legacy pickle and
+as a registry version, then starts N fresh worker processes per format. Each
+worker loads the model, scores a batch and reports load time, batch latency,
+RSS (anonymous vs file-backed) and PSS, which splits shared pages between the
+processes mapping them.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+N_FEATURES = 5
+
+
+# -----------------------
+# Process memory (Linux /proc)
+# -----------------------
+def memory_kb() -> dict:
+    fields = {}
+    for path, keys in (("/proc/self/status", ("VmRSS", "RssAnon", "RssFile")),
+                       ("/proc/self/smaps_rollup", ("Pss",))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in keys:
+                        fields[key] = int(value.split()[0])
+        except OSError:
+            pass
+    return fields
+
+
+# -----------------------
+# Model fixture
+# -----------------------
+def synthetic_rows(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, N_FEATURES)).astype(np.float32)
+    X[:, 0] *= 50
+    y = ((X[:, 1] * X[:, 0] / 50 + rng.normal(0, 0.15, n)) > 0.45).astype(int)
+    return X, y
+
+
+def build_model(kind: str, trees: int, rows: int):
+    X, y = synthetic_rows(rows)
+    if kind == "xgboost":
+        from xgboost import XGBClassifier
+        model = XGBClassifier(n_estimators=trees, max_depth=6, learning_rate=0.1, eval_metric="logloss")
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(n_estimators=trees, min_samples_leaf=2, n_jobs=-1, random_state=42)
+    model.fit(X, y)
+    return model
+
+
+# -----------------------
+# Worker
+# -----------------------
+def worker(fmt: str, location: str, batch: int, barrier, results):
+    import pandas as pd
+
+    baseline = memory_kb()
+    started = time.perf_counter()
+    if fmt == "pickle":
+        import joblib
+        model = joblib.load(location)
+        score = lambda X: model.predict_proba(X)[:, 1]
+    else:
+        from models.registry import ModelRegistry
+        model = ModelRegistry(Path(location)).load("bench")
+        score = lambda X: model.predict_proba(X)[:, 1]
+    load_seconds = time.perf_counter() - started
+
+    X, _ = synthetic_rows(batch, seed=os.getpid())
+    frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(N_FEATURES)])
+    batch = frame.to_numpy() if fmt == "pickle" else frame
+    timings = []
+    for _ in range(2):      # first batch includes page faults on the mapped arrays
+        started = time.perf_counter()
+        score(batch)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    barrier.wait()          # every worker holds its model: PSS now reflects sharing
+    after = memory_kb()
+    results.put({"load_ms": load_seconds * 1000, "first_ms": timings[0], "warm_ms": timings[1],
+                 **{k: (after.get(k, 0) - baseline.get(k, 0)) / 1024 for k in after}})
+    barrier.wait()
+
+
+def run_workers(fmt: str, location: str, workers: int, batch: int) -> list:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(fmt, location, batch, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return collected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", choices=["forest", "xgboost"], default="forest")
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=200_000, help="training rows")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=10_000, help="rows scored per worker")
+    args = parser.parse_args()
+
+    import joblib
+    from models.registry import ModelRegistry
+
+    model = build_model(args.model, args.trees, args.rows)
+    columns = [f"f{i}" for i in range(N_FEATURES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = Path(tmp) / "model.pkl"
+        joblib.dump(model, pickle_path)
+        registry = ModelRegistry(Path(tmp) / "registry")
+        registry.register("bench", model, threshold=0.5, feature_columns=columns)
+        loaded = registry.load("bench")
+
+        X, _ = synthetic_rows(5_000, seed=1)
+        native = model.predict_proba(X)[:, 1]
+        flat = loaded.predict_proba(X)[:, 1]
+        print(f"{args.model}: {args.trees} trees, {loaded.meta['trees']['n_nodes'] if loaded.ensemble else 0} nodes, "
+              f"pickle {pickle_path.stat().st_size / 1e6:.1f} MB, "
+              f"max |flat - native| = {np.abs(flat - native).max():.2e}")
+
+        print(f"\n{args.workers} workers, batch {args.batch} rows (medians; memory in MB added by the model)")
+        print(f"{'format':<10}{'load ms':>10}{'1st batch':>10}{'warm':>8}{'RSS':>8}{'anon':>8}{'file':>8}{'PSS':>8}")
+        for fmt, location in (("pickle", pickle_path), ("registry", registry.root)):
+            rows = run_workers(fmt, str(location), args.workers, args.batch)
+            med = lambda key: statistics.median(r.get(key, 0) for r in rows)
+            print(f"{fmt:<10}{med('load_ms'):>10.1f}{med('first_ms'):>10.1f}{med('warm_ms'):>8.1f}{med('VmRSS'):>8.1f}"
+                  f"{med('RssAnon'):>8.1f}{med('RssFile'):>8.1f}{med('Pss'):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end pipeline benchmark on synthetic fleets, tracked across commits.
+
+    python benchmarks/bench_pipeline.py --scales 1 10
+    python benchmarks/bench_pipeline.py --scales 100 --stages aggregate features
+
+Each scale's fleet is generated once under data/synthetic/x<scale> (see
+src/simulation/synthetic_fleet.py). Every run appends one line per scale to
+benchmarks/results/history.jsonl with the commit it ran on, and prints the
+change against the most recent run of the same scale on another commit.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # FailurePredictionModel.train plots; never block on a window
+
+from simulation.synthetic_fleet import ensure_fleet, OUTPUT_ROOT
+from utils.metrics import stage
+
+HISTORY_PATH = REPO_ROOT / "benchmarks" / "results" / "history.jsonl"
+STAGES = ["load", "aggregate", "scoring", "features", "train", "inference"]
+DEPENDS_ON = {"scoring": "load", "features": "aggregate", "train": "features", "inference": "train"}
+
+
+# -----------------------
+# Stages (each reads/extends the shared context and returns its row count)
+# -----------------------
+def run_load(ctx):
+    from transformation.load_relational_data import load_all_data
+    ctx["db"] = load_all_data(ctx["data_dir"])
+    return sum(len(table) for table in ctx["db"].values())
+
+
+def run_aggregate(ctx):
+    from health.window_aggregation import load_events, aggregate_events_vectorized
+    events = load_events(ctx["data_dir"] / "event" / "events.csv")
+    ctx["device_agg"], ctx["interface_agg"] = aggregate_events_vectorized(events, "1h")
+    return len(events)
+
+
+def run_scoring(ctx):
+    from health.event_index import EventIndex
+    from health.health_scoring import score_all_devices, score_all_interfaces
+    db = ctx["db"]
+    index = EventIndex.build(db["events"])
+    score_all_devices(db["devices"], db["events"], index=index)
+    score_all_interfaces(db["interfaces"], db["events"], index=index)
+    return len(db["events"])
+
+
+def run_features(ctx):
+    from features.feature_engineering import build_features
+    agg = ctx["device_agg"].sort_values(["device_id", "timestamp"])
+    ctx["features"] = build_features(agg[["device_id", "timestamp", "total_events",
+                                          "failure_events", "health_score"]].copy())
+    return len(ctx["features"])
+
+
+def run_train(ctx):
+    from models.failure_prediction import FailurePredictionModel
+    df = ctx["features"]
+    X = df.drop(columns=["target", "timestamp", "device_id"], errors="ignore")
+    model = FailurePredictionModel()
+    model.train(X, df["target"])
+    ctx["model"], ctx["X"] = model, X
+    return len(X)
+
+
+def run_inference(ctx):
+    ctx["model"].predict(ctx["X"])
+    return len(ctx["X"])
+
+
+RUNNERS = {name: globals()[f"run_{name}"] for name in STAGES}
+
+
+# -----------------------
+# History
+# -----------------------
+def git_commit() -> dict:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def previous_run(scale: float, commit: str):
+    if not HISTORY_PATH.exists():
+        return None
+    previous = None
+    with open(HISTORY_PATH, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["scale"] == scale and entry["commit"] != commit:
+                previous = entry
+    return previous
+
+
+def print_report(entry: dict, previous):
+    print(f"\nscale x{entry['scale']:g}  commit {entry['commit']}{' (dirty)' if entry['dirty'] else ''}"
+          + (f"  vs {previous['commit']}" if previous else ""))
+    print(f"{'stage':<12}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'rows/s':>14}{'vs prev':>10}")
+    for name, result in entry["stages"].items():
+        if result["status"] != "ok":
+            print(f"{name:<12}  {result['status']}")
+            continue
+        before = (previous or {}).get("stages", {}).get(name, {})
+        change = (f"{result['wall_seconds'] / before['wall_seconds']:.2f}x"
+                  if before.get("status") == "ok" and before.get("wall_seconds") else "")
+        peak = result["peak_rss_bytes"] / 2**20 if result["peak_rss_bytes"] else float("nan")
+        print(f"{name:<12}{result['wall_seconds']:>10.3f}{result['cpu_seconds']:>10.3f}{peak:>10.0f}"
+              f"{result['rows_per_second'] or 0:>14,.0f}{change:>10}")
+
+
+# -----------------------
+# Harness
+# -----------------------
+def bench_scale(scale: float, stages, seed: int) -> dict:
+    data_dir = ensure_fleet(scale, OUTPUT_ROOT / f"x{scale:g}", seed)
+    ctx = {"data_dir": data_dir}
+    results = {}
+    for name in STAGES:
+        if name not in stages:
+            continue
+        dependency = DEPENDS_ON.get(name)
+        if dependency and results.get(dependency, {}).get("status") != "ok":
+            results[name] = {"status": f"skipped (needs {dependency})"}
+            continue
+        try:
+            with stage(f"bench.{name}") as s:
+                s.rows = RUNNERS[name](ctx)
+            results[name] = {k: s.result[k] for k in
+                             ("status", "wall_seconds", "cpu_seconds", "peak_rss_bytes", "rows", "rows_per_second")}
+        except ImportError as e:
+            results[name] = {"status": f"skipped ({e})"}
+    return {
+        **git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": os.uname().nodename if hasattr(os, "uname") else None,
+        "scale": scale,
+        "seed": seed,
+        "stages": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="dependencies of the selected stages are run too")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-history", action="store_true", help="don't append to history.jsonl")
+    args = parser.parse_args()
+
+    stages = set(args.stages)
+    for name in args.stages:
+        while DEPENDS_ON.get(name):
+            name = DEPENDS_ON[name]
+            stages.add(name)
+
+    for scale in args.scales:
+        entry = bench_scale(scale, stages, args.seed)
+        print_report(entry, previous_run(scale, entry["commit"]))
+        if not args.no_history:
+            HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_sharded_model.py
+"""
+Single global failure model vs one model per device class: training wall time,
+per-batch inference latency and weighted F1.
+
+    python benchmarks/bench_sharded_model.py --scale 1
+    python benchmarks/bench_sharded_model.py --scale 10 --workers 8 --batches 1000 10000 100000
+
+Features come from a synthetic fleet (data/synthetic/x<scale>, see
+src/simulation/synthetic_fleet.py). Uses the pipeline's XGBoost classifier when
+xgboost is installed, else a RandomForest of similar size.
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import time
+from functools import partial
+
+import numpy as np
+
+from simulation.synthetic_fleet import ensure_fleet, OUTPUT_ROOT
+
+
+def model_factory():
+    """Picklable factory for the shard workers, plus its label."""
+    if importlib.util.find_spec("xgboost") is not None:
+        from models.failure_prediction import default_classifier
+        return partial(default_classifier, n_jobs=1), "xgboost"
+    from sklearn.ensemble import RandomForestClassifier
+    return partial(RandomForestClassifier, n_estimators=100, max_depth=12, n_jobs=1,
+                   class_weight="balanced", random_state=42), "random forest"
+
+
+def fleet_features(scale: float, seed: int):
+    from features.feature_engineering import build_features
+    from health.window_aggregation import aggregate_events_vectorized, load_events
+    from models.sharded import device_classes
+
+    data_dir = ensure_fleet(scale, OUTPUT_ROOT / f"x{scale:g}", seed)
+    device_agg, _ = aggregate_events_vectorized(load_events(data_dir / "event" / "events.csv"), "1h")
+    agg = device_agg.sort_values(["device_id", "timestamp"])
+    df = build_features(agg[["device_id", "timestamp", "total_events", "failure_events", "health_score"]].copy())
+    X = df.drop(columns=["target", "timestamp", "device_id"], errors="ignore")
+    classes = device_classes(df["device_id"], data_dir / "device" / "devices.csv")
+    return X, df["target"], classes
+
+
+def latency_ms(score, X, classes, batch: int, repeats: int = 5) -> float:
+    rng = np.random.default_rng(0)
+    times = []
+    for _ in range(repeats):
+        rows = rng.integers(0, len(X), batch)
+        started = time.perf_counter()
+        score(X.iloc[rows], classes[rows])
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--min-rows", type=int, default=500)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    from models.failure_prediction import FailurePredictionModel
+    from models.sharded import ShardedFailureModel
+
+    X, y, classes = fleet_features(args.scale, args.seed)
+    factory, label = model_factory()
+    print(f"x{args.scale:g}: {len(X):,} feature rows, {len(np.unique(classes))} device classes, "
+          f"{label}, {args.workers} workers")
+
+    single = FailurePredictionModel(factory())
+    started = time.perf_counter()
+    single_metrics = single.train(X, y, plot=False)
+    single_train = time.perf_counter() - started
+
+    sharded = ShardedFailureModel(factory, min_rows=args.min_rows, max_workers=args.workers)
+    started = time.perf_counter()
+    sharded_metrics = sharded.train(X, y, classes)
+    sharded_train = time.perf_counter() - started
+
+    print(f"\n{'model':<10}{'shards':>8}{'train s':>10}{'F1':>8}{'AUC':>8}"
+          + "".join(f"{f'{b:,} rows ms':>16}" for b in args.batches))
+    rows = (
+        ("single", 1, single_train, single_metrics["f1_score"], single_metrics["roc_auc"],
+         lambda Xb, cb: single.predict(Xb)),
+        ("sharded", len(sharded.shards), sharded_train, sharded_metrics["weighted_f1_score"],
+         sharded_metrics["weighted_roc_auc"], sharded.predict),
+    )
+    for name, shards, train_s, f1, auc, score in rows:
+        latencies = "".join(f"{latency_ms(score, X, classes, b):>16.1f}" for b in args.batches)
+        print(f"{name:<10}{shards:>8}{train_s:>10.2f}{f1:>8.3f}{auc:>8.3f}{latencies}")
+
+
+if __name__ == "__main__":
+    main()
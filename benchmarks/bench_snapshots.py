@@ -0,0 +1,97 @@
+# benchmarks/bench_snapshots.py
+"""
+Device / asset snapshots: full rebuild vs incremental update after appends.
+
+    python benchmarks/bench_snapshots.py --scale 1 --batches 5 --batch-events 10000
+
+Copies a synthetic fleet (``device-health generate``) to a temp dir, builds
+the snapshot store, then appends batches of events and interfaces to the raw
+CSVs and times ``SnapshotStore.update`` against a from-scratch ``build`` of
+the same data, checking that both produce identical snapshots.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def append_batch(data_dir: Path, rng: np.random.Generator, n_events: int, n_interfaces: int, next_ids: dict):
+    """Append events and interfaces for random existing devices (CSV appends, as a collector would)."""
+    devices = next_ids["device_ids"]
+    events = pd.DataFrame({
+        "event_id": np.arange(next_ids["event"], next_ids["event"] + n_events),
+        "event_timestamp": (pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 86400, n_events), "s"))
+        .strftime("%Y-%m-%d %H:%M:%S"),
+        "device_id": rng.choice(devices, n_events),
+        "interface_id": "",
+        "org_country": "",
+        "event_type": rng.choice(["link_down", "high_cpu", "error"], n_events),
+        "event_description": "",
+    })
+    interfaces = pd.DataFrame({
+        "interface_id": np.arange(next_ids["interface"], next_ids["interface"] + n_interfaces),
+        "device_id": rng.choice(devices, n_interfaces),
+        "name": "eth99",
+        "mac_address": "02:00:00:00:00:01",
+        "status": "up",
+    })
+    events.to_csv(data_dir / "event" / "events.csv", mode="a", header=False, index=False)
+    interfaces.to_csv(data_dir / "interface" / "interfaces.csv", mode="a", header=False, index=False)
+    next_ids["event"] += n_events
+    next_ids["interface"] += n_interfaces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--batch-events", type=int, default=10_000)
+    parser.add_argument("--batch-interfaces", type=int, default=100)
+    parser.add_argument("--batch-devices", type=int, default=50,
+                        help="distinct devices the appended rows are spread over")
+    args = parser.parse_args()
+
+    from simulation.synthetic_fleet import ensure_fleet
+    from transformation.snapshots import SnapshotStore
+
+    fleet = ensure_fleet(args.scale)
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "raw"
+        shutil.copytree(fleet, data_dir)
+        store = SnapshotStore(Path(tmp) / "snapshots", data_dir)
+
+        started = time.perf_counter()
+        store.build()
+        print(f"fleet x{args.scale:g}: initial build {time.perf_counter() - started:.2f}s, {store.totals()}\n")
+
+        device_ids = pd.read_csv(data_dir / "device" / "devices.csv", usecols=["device_id"])["device_id"].to_numpy()
+        next_ids = {
+            "event": int(pd.read_csv(data_dir / "event" / "events.csv", usecols=["event_id"])["event_id"].max()) + 1,
+            "interface": int(device_ids.size * 100 + 1),
+            "device_ids": rng.choice(device_ids, args.batch_devices, replace=False),
+        }
+        print(f"{'batch':<7}{'update s':>10}{'partitions':>12}{'rebuild s':>11}")
+        for batch in range(args.batches):
+            append_batch(data_dir, rng, args.batch_events, args.batch_interfaces, next_ids)
+            started = time.perf_counter()
+            summary = store.update()
+            update_s = time.perf_counter() - started
+
+            rebuilt = SnapshotStore(Path(tmp) / f"rebuild-{batch}", data_dir)
+            started = time.perf_counter()
+            rebuilt.build()
+            rebuild_s = time.perf_counter() - started
+            if not rebuilt.read("devices").equals(store.read("devices")):
+                raise AssertionError("incremental snapshot differs from a full rebuild")
+            shutil.rmtree(rebuilt.root)
+            print(f"{batch:<7}{update_s:>10.3f}{summary['partitions_rewritten']['devices']:>12}{rebuild_s:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
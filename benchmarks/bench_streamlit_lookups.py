@@ -0,0 +1,74 @@
+# benchmarks/bench_streamlit_lookups.py
+"""
+Interaction latency of the Streamlit selections: boolean-mask scan vs GroupIndex.
+
+    python benchmarks/bench_streamlit_lookups.py --events 10000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "app" / "services"))
+
+from index_service import GroupIndex
+
+EVENT_TYPES = ["high_cpu", "high_memory", "interface_down", "critical_error", "config_change",
+               "login", "link_down", "error", "reboot", "disk_full"]
+
+
+def synthetic_events(n_events: int, n_devices: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "event_id": np.arange(n_events),
+        "device_id": rng.integers(1, n_devices + 1, n_events),
+        "event_type": pd.Series(rng.choice(EVENT_TYPES, n_events)).astype(object),
+    })
+
+
+def time_per_call(fn, keys):
+    timings = []
+    for key in keys:
+        started = time.perf_counter()
+        fn(key)
+        timings.append(time.perf_counter() - started)
+    return np.median(timings) * 1e3, np.percentile(timings, 95) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--devices", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events, args.devices)
+    rng = np.random.default_rng(0)
+    device_keys = rng.integers(1, args.devices + 1, args.lookups)
+    type_keys = rng.choice(EVENT_TYPES, min(args.lookups, 20))
+
+    started = time.perf_counter()
+    by_device = GroupIndex(events["device_id"])
+    by_type = GroupIndex(events["event_type"])
+    build_s = time.perf_counter() - started
+
+    rows = [
+        ("device_id mask scan", *time_per_call(lambda k: events[events["device_id"] == k], device_keys)),
+        ("device_id GroupIndex", *time_per_call(lambda k: by_device.take(events, k), device_keys)),
+        ("event_type mask scan", *time_per_call(lambda k: events[events["event_type"] == k], type_keys)),
+        ("event_type GroupIndex", *time_per_call(lambda k: by_type.take(events, k), type_keys)),
+    ]
+
+    print(f"{args.events:,} events, {args.devices:,} devices | index build (both): {build_s:.2f}s (once)")
+    print(f"{'selection':<24}{'median ms':>12}{'p95 ms':>12}")
+    for name, median_ms, p95_ms in rows:
+        print(f"{name:<24}{median_ms:>12.2f}{p95_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
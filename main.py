@@ -1,9 +1,4 @@
-import sys
-from pathlib import Path
-
-# Add src folder to path
-sys.path.append(str(Path(__file__).resolve().parent / "src"))
-
+# Requires the package to be installed: pip install -e .  (or use the `device-health` command)
 from pipeline.run_pipeline import run_pipeline
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+# pipeline/cli.py
+"""
+``device-health`` command line entry point.
+
+Each command runs one pipeline module as ``__main__`` with the remaining
+arguments; the module is imported only when its command is chosen, so
+``device-health --help`` and light commands never load pandas, sklearn,
+xgboost or matplotlib.
+"""
+
+import argparse
+import runpy
+import sys
+
+COMMANDS = {
+    "run": ("pipeline.run_pipeline", "run the pipeline DAG (cached stages are skipped)"),
+    "validate": ("transformation.validation", "check raw tables and write the quarantine file"),
+    "load": ("transformation.load_relational_data", "load and link the raw relational CSVs"),
+    "snapshot": ("transformation.snapshots", "update the device / asset snapshots incrementally"),
+    "score": ("health.health_scoring", "score device/interface health and print summaries"),
+    "aggregate": ("health.window_aggregation", "aggregate events into hourly health windows"),
+    "ingest": ("health.event_ingest", "dedupe appended events and fold them (late ones too) into the windows"),
+    "features": ("features.feature_engineering", "build device features and the baseline model"),
+    "train": ("models.train", "train the failure prediction model"),
+    "evaluate": ("models.evaluate", "evaluate the trained model on the feature set"),
+    "backtest": ("models.backtest", "walk-forward backtest over many cut-points in parallel"),
+    "predict": ("inference.predict", "score device features with the trained model"),
+    "anomaly": ("models.anomaly_detection", "streaming or batch anomaly detection"),
+    "generate": ("simulation.synthetic_fleet", "generate a synthetic fleet at a given scale"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="device-health",
+        description="Intelligent Device Health Monitoring pipeline.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<11}{help_text}" for name, (_, help_text) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the command")
+    args = parser.parse_args(argv)
+
+    module, _ = COMMANDS[args.command]
+    sys.argv = [f"device-health {args.command}", *args.args]
+    runpy.run_module(module, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# pipeline/dag.py
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+from utils.metrics import stage as metrics_stage
+
+logger = get_logger("dag")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = REPO_ROOT / "data" / "processed" / ".pipeline_cache.json"
+HASH_CHUNK = 1 << 20
+
+
+# -----------------------
+# Stage declaration
+# -----------------------
+class Stage:
+    """
+    One pipeline step with declared file inputs and outputs.
+
+    ``code`` lists the source/config files whose content changes should also
+    invalidate the stage; ``params`` are hashed alongside. ``after`` adds
+    ordering-only dependencies. Producers of a stage's inputs become its
+    upstream stages automatically.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None], inputs: Iterable = (),
+                 outputs: Iterable = (), code: Iterable = (), params: Optional[dict] = None,
+                 after: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.code = [Path(p) for p in code]
+        self.params = params or {}
+        self.after = list(after)
+
+
+# -----------------------
+# Content hashing (memoized on path, size and mtime)
+# -----------------------
+class FileHasher:
+    def __init__(self, known: Optional[dict] = None):
+        self.known = known or {}
+        self._lock = threading.Lock()
+
+    def hash(self, path: Path) -> Optional[str]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            cached = self.known.get(key)
+        if cached and cached[:2] == signature:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        with self._lock:
+            self.known[key] = [*signature, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def snapshot(self) -> dict:
+        """Copy of the known hashes, safe to serialise while other threads keep hashing."""
+        with self._lock:
+            return dict(self.known)
+
+
+# -----------------------
+# Runner
+# -----------------------
+class Pipeline:
+    """
+    Runs stages in dependency order, skipping those whose input/code/param hash
+    matches the last successful run (and whose outputs still exist), and
+    running independent branches concurrently.
+    """
+
+    def __init__(self, stages: List[Stage], cache_path: Path = CACHE_PATH, max_workers: int = 4):
+        self.stages = {s.name: s for s in stages}
+        self.cache_path = Path(cache_path)
+        self.max_workers = max_workers
+        self.upstream = self._resolve_dependencies()
+
+    def _resolve_dependencies(self) -> Dict[str, set]:
+        producers = {}
+        for s in self.stages.values():
+            for output in s.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is produced by both {producers[output]} and {s.name}")
+                producers[output] = s.name
+        upstream = {}
+        for s in self.stages.values():
+            deps = {producers[p] for p in s.inputs if p in producers} | set(s.after)
+            unknown = deps - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage {s.name} depends on unknown stages: {sorted(unknown)}")
+            upstream[s.name] = deps
+        self._check_acyclic(upstream)
+        return upstream
+
+    @staticmethod
+    def _check_acyclic(upstream: Dict[str, set]):
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in upstream[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+
+        for name in upstream:
+            visit(name, [])
+
+    def _load_cache(self) -> dict:
+        if self.cache_path.exists():
+            try:
+                return json.loads(self.cache_path.read_text())
+            except json.JSONDecodeError:
+                logger.warning("Ignoring unreadable pipeline cache %s", self.cache_path)
+        return {"stages": {}, "files": {}}
+
+    def _save_cache(self, cache: dict):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=1, sort_keys=True))
+        tmp.replace(self.cache_path)
+
+    def stage_key(self, s: Stage, hasher: FileHasher) -> str:
+        digest = hashlib.sha256(s.name.encode())
+        for path in sorted(s.inputs + s.code):
+            digest.update(str(path).encode())
+            digest.update((hasher.hash(path) or "missing").encode())
+        digest.update(json.dumps(s.params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _selected(self, targets: Optional[Iterable[str]]) -> set:
+        if not targets:
+            return set(self.stages)
+        selected, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.upstream[name])
+        return selected
+
+    def run(self, targets: Optional[Iterable[str]] = None, force: bool = False,
+            dry_run: bool = False) -> Dict[str, dict]:
+        """
+        Run ``targets`` (default: every stage) plus their upstream stages.
+        Returns ``{stage: {"status": cached|ran|failed|skipped|stale, "seconds": ...}}``.
+        """
+        selected = self._selected(targets)
+        cache = self._load_cache()
+        hasher = FileHasher(cache.get("files"))
+        cache_lock = threading.Lock()
+        results: Dict[str, dict] = {}
+
+        def execute(name: str) -> dict:
+            s = self.stages[name]
+            started = time.perf_counter()
+            key = self.stage_key(s, hasher)
+            previous = cache["stages"].get(name, {})
+            up_to_date = (previous.get("key") == key and all(p.exists() for p in s.outputs))
+            if up_to_date and not force:
+                return {"status": "cached", "seconds": time.perf_counter() - started}
+            if dry_run:
+                return {"status": "stale", "seconds": 0.0}
+
+            logger.info("Running stage %s", name)
+            with metrics_stage(f"dag.{name}"):
+                s.func()
+            missing = [str(p) for p in s.outputs if not p.exists()]
+            if missing:
+                raise RuntimeError(f"Stage {name} did not produce {missing}")
+            for output in s.outputs:
+                hasher.hash(output)  # downstream keys hash these next
+            with cache_lock:
+                cache["stages"][name] = {"key": key, "finished_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+                cache["files"] = hasher.snapshot()
+                self._save_cache(cache)
+            return {"status": "ran", "seconds": time.perf_counter() - started}
+
+        pending = set(selected)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag") as pool:
+            while pending or running:
+                for name in sorted(pending):
+                    deps = self.upstream[name] & selected
+                    if any(results.get(d, {}).get("status") in ("failed", "skipped") for d in deps):
+                        results[name] = {"status": "skipped", "seconds": 0.0}
+                        pending.discard(name)
+                    elif dry_run and any(results.get(d, {}).get("status") == "stale" for d in deps):
+                        results[name] = {"status": "stale", "seconds": 0.0}
+                        pending.discard(name)
+                    elif all(d in results for d in deps):
+                        running[pool.submit(execute, name)] = name
+                        pending.discard(name)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.exception("Stage %s failed", name)
+                        results[name] = {"status": "failed", "seconds": 0.0, "error": str(e)}
+
+        with cache_lock:
+            cache["files"] = hasher.snapshot()
+            if not dry_run:
+                self._save_cache(cache)
+        return {name: results[name] for name in self._order(selected)}
+
+    def _order(self, selected: set) -> List[str]:
+        ordered, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in sorted(self.upstream[name] & selected):
+                visit(dep)
+            ordered.append(name)
+
+        for name in self.stages:
+            if name in selected:
+                visit(name)
+        return ordered
@@ -1,19 +1,132 @@
-from src.transformation.load_relational_data import load_all_data
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
 
+from pipeline.dag import Pipeline, Stage
+from utils.config import get_section
+from utils.metrics import timed
 
-def run_pipeline():
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# -----------------------
+# Paths (stage inputs and outputs)
+# -----------------------
+SRC = REPO_ROOT / "src"
+RAW_DIR = REPO_ROOT / "data" / "raw"
+PROCESSED_DIR = REPO_ROOT / "data" / "processed"
+CONFIG = REPO_ROOT / "config.yaml"
+
+RAW_TABLES = [
+    RAW_DIR / "organization" / "organization.csv",
+    RAW_DIR / "device_class" / "device_class.csv",
+    RAW_DIR / "asset" / "assets.csv",
+    RAW_DIR / "device" / "devices.csv",
+    RAW_DIR / "interface" / "interfaces.csv",
+]
+EVENTS_CSV = RAW_DIR / "event" / "events.csv"
+QUARANTINE_DIR = REPO_ROOT / get_section("validation").get("quarantine_dir", "data/processed/quarantine")
+QUARANTINE = [QUARANTINE_DIR / name for name in ("quarantine.csv", "summary.json")]
+SNAPSHOT_MANIFEST = REPO_ROOT / get_section("snapshots").get("dir", "data/processed/snapshots") / "manifest.json"
+INGEST_MANIFEST = REPO_ROOT / get_section("ingest").get("dir", "data/processed/ingest") / "manifest.json"
+WINDOW_FREQ = "1h"
+DEVICE_AGG = PROCESSED_DIR / f"aggregated_device_{WINDOW_FREQ}.csv"
+INTERFACE_AGG = PROCESSED_DIR / f"aggregated_interface_{WINDOW_FREQ}.csv"
+FEATURES = PROCESSED_DIR / "device" / "device_features.csv"
+FEATURE_MATRIX = [PROCESSED_DIR / "device" / "feature_matrix" / name
+                  for name in ("schema.json", "X.npy", "y.npy", "device_id.npy", "timestamp.npy")]
+SHARDED = get_section("model").get("sharding", "none") == "device_class"
+MODEL = REPO_ROOT / "models" / ("failure_model_sharded.pkl" if SHARDED else "failure_model_xgb.pkl")
+DEVICES_CSV = RAW_DIR / "device" / "devices.csv"
+PREDICTIONS = PROCESSED_DIR / "device" / "device_predictions.csv"
+
+HEALTH_CODE = [SRC / "health" / "window_aggregation.py", SRC / "health" / "rules.py",
+               SRC / "health" / "decay.py", CONFIG]
+MODEL_CODE = [SRC / "models" / "failure_prediction.py", SRC / "models" / "sharded.py",
+              SRC / "models" / "registry.py", CONFIG]
+ROUTING = [DEVICES_CSV] if SHARDED else []   # sharded models route rows by device class
+
+
+# -----------------------
+# Stage bodies (imports are local so unchanged stages never pay for them)
+# -----------------------
+def validate_relational():
+    from transformation.load_relational_data import load_all_data
+    load_all_data(RAW_DIR)
+
+
+def update_snapshots():
+    from transformation.snapshots import SnapshotStore
+    SnapshotStore(data_dir=RAW_DIR).update()
+
+
+def ingest_events():
+    from health.event_ingest import EventIngestor
+    ingestor = EventIngestor(data_dir=RAW_DIR)
+    ingestor.update()
+    ingestor.export_csv()
+
+
+def build_device_features():
+    from features.feature_engineering import load_aggregates, build_features, save_features
+    save_features(build_features(load_aggregates(DEVICE_AGG)), FEATURES)
+
+
+def run_module(module: str):
+    """
+    Stage body running ``python -m module`` in a fresh interpreter. The model
+    stages start process pools of their own, which must not be forked from the
+    DAG's worker threads, and their ``__main__`` blocks expect a process to
+    themselves.
+    """
+    def run():
+        path = [str(SRC), str(REPO_ROOT), os.environ.get("PYTHONPATH", "")]
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in path if p)}
+        subprocess.run([sys.executable, "-m", module], cwd=REPO_ROOT, env=env, check=True)
+    return run
+
+
+def build_dag(max_workers: int = 4) -> Pipeline:
+    return Pipeline([
+        Stage("relational", validate_relational, inputs=RAW_TABLES + [EVENTS_CSV], outputs=QUARANTINE,
+              code=[SRC / "transformation" / "load_relational_data.py",
+                    SRC / "transformation" / "validation.py",
+                    SRC / "transformation" / "relational_model.py",
+                    SRC / "transformation" / "encoding.py"]),
+        Stage("snapshots", update_snapshots, inputs=RAW_TABLES + [EVENTS_CSV], outputs=[SNAPSHOT_MANIFEST],
+              code=[SRC / "transformation" / "snapshots.py", SRC / "transformation" / "validation.py"]),
+        Stage("ingest", ingest_events, inputs=[EVENTS_CSV], outputs=[DEVICE_AGG, INTERFACE_AGG, INGEST_MANIFEST],
+              code=HEALTH_CODE + [SRC / "health" / "event_ingest.py"], params={"freq": WINDOW_FREQ}),
+        Stage("features", build_device_features, inputs=[DEVICE_AGG], outputs=[FEATURES] + FEATURE_MATRIX,
+              code=[SRC / "features" / "feature_engineering.py", SRC / "features" / "feature_matrix.py"]),
+        Stage("train", run_module("models.train"), inputs=FEATURE_MATRIX + ROUTING, outputs=[MODEL],
+              code=[SRC / "models" / "train.py"] + MODEL_CODE),
+        Stage("predict", run_module("inference.predict"), inputs=[MODEL] + FEATURE_MATRIX + ROUTING,
+              outputs=[PREDICTIONS], code=[SRC / "inference" / "predict.py"] + MODEL_CODE),
+    ], max_workers=max_workers)
+
+
+@timed("run_pipeline")
+def run_pipeline(targets=None, force: bool = False, dry_run: bool = False, max_workers: int = 4):
     print("🚀 Starting Intelligent Device Health Pipeline...")
 
-    # Step 1: Load full relational data
-    db = load_all_data()
+    # Stages whose inputs, code and params are unchanged since their last run are skipped
+    results = build_dag(max_workers).run(targets, force=force, dry_run=dry_run)
+
+    for name, result in results.items():
+        print(f"  {name:<20} {result['status']:<8} {result['seconds']:7.2f}s"
+              + (f"  {result['error']}" if "error" in result else ""))
 
-    print("✅ Data loaded successfully")
+    print("Pipeline execution completed.")
+    return results
 
-    # You can now access:
-    # db["organizations"]
-    # db["assets"]
-    # db["devices"]
-    # db["interfaces"]
-    # db["events"]
 
-    print("Pipeline execution completed.")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the device health pipeline DAG.")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and rerun the selected stages")
+    parser.add_argument("--dry-run", action="store_true", help="only report which stages are stale")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    run_pipeline(args.targets or None, force=args.force, dry_run=args.dry_run, max_workers=args.workers)
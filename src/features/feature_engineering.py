@@ -1,11 +1,7 @@
 # src/features/feature_engineering_simple.py
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
-import joblib
 
 # -----------------------
 # Paths
@@ -15,88 +11,123 @@ DATA_PATH = REPO_ROOT / "data" / "aggregated_device_1h.csv"
 MODEL_PATH = REPO_ROOT / "models" / "device_failure_model_balanced_simple.pkl"
 FEATURE_PATH = REPO_ROOT / "data" / "processed" / "device" / "device_features.csv"
 
-# Ensure processed folder exists
-FEATURE_PATH.parent.mkdir(parents=True, exist_ok=True)
+from utils.metrics import stage
+from features.feature_matrix import FEATURE_MATRIX_DIR, write_feature_matrix
+
+FEATURE_COLS = ["total_events", "failure_events", "health_score", "failure_rate", "rolling_failure_3"]
+THRESHOLD = 0.525
 
 # -----------------------
 # Load data
 # -----------------------
-df = pd.read_csv(DATA_PATH, parse_dates=["timestamp"])
-df = df.sort_values(["device_id", "timestamp"])
-print(f"Loaded data: {df.shape[0]} rows")
+def load_aggregates(path: Path = DATA_PATH) -> pd.DataFrame:
+    """Hourly device aggregates sorted by device and time."""
+    with stage("feature_engineering.load") as s:
+        df = pd.read_csv(path, parse_dates=["timestamp"])
+        df = df.sort_values(["device_id", "timestamp"])
+        s.rows = len(df)
+    print(f"Loaded data: {df.shape[0]} rows")
+    return df
 
 # -----------------------
 # Create features
 # -----------------------
-print("Creating simple features...")
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Add failure_rate, rolling_failure_3 and the next-window ``target``."""
+    print("Creating simple features...")
 
-# Basic failure rate
-df["failure_rate"] = df["failure_events"] / df["total_events"]
-df["failure_rate"] = df["failure_rate"].fillna(0)
+    with stage("feature_engineering.features", rows=len(df)):
+        # Basic failure rate
+        df["failure_rate"] = df["failure_events"] / df["total_events"]
+        df["failure_rate"] = df["failure_rate"].fillna(0)
 
-# Rolling 3-window failure_events per device
-df["rolling_failure_3"] = df.groupby("device_id")["failure_events"].transform(
-    lambda x: x.rolling(3, min_periods=1).mean()
-)
+        # Rolling 3-window failure_events per device
+        df["rolling_failure_3"] = df.groupby("device_id")["failure_events"].transform(
+            lambda x: x.rolling(3, min_periods=1).mean()
+        )
 
-# -----------------------
-# Create target (next window failure)
-# -----------------------
-print("Creating target (next window failure)...")
-df["target"] = df.groupby("device_id")["failure_events"].shift(-1).fillna(0)
-df["target"] = (df["target"] > 0).astype(int)
+        # -----------------------
+        # Create target (next window failure)
+        # -----------------------
+        print("Creating target (next window failure)...")
+        df["target"] = df.groupby("device_id")["failure_events"].shift(-1).fillna(0)
+        df["target"] = (df["target"] > 0).astype(int)
 
-# Drop rows with missing target
-df = df.dropna()
-
-# -----------------------
-# Save feature-engineered data
-# -----------------------
-df.to_csv(FEATURE_PATH, index=False)
-print(f"Feature-engineered data saved to: {FEATURE_PATH}")
+        # Drop rows with missing target
+        df = df.dropna()
+    return df
 
 # -----------------------
-# Select features & target
+# Save features (CSV for inspection, float32 matrix for the models)
 # -----------------------
-feature_cols = ["total_events", "failure_events", "health_score", "failure_rate", "rolling_failure_3"]
-X = df[feature_cols]
-y = df["target"]
+def save_features(df: pd.DataFrame, path: Path = FEATURE_PATH, matrix_dir: Path = FEATURE_MATRIX_DIR):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with stage("feature_engineering.save", rows=len(df)):
+        df.to_csv(path, index=False)
+    write_feature_matrix(df, FEATURE_COLS, matrix_dir, source=path)
 
 # -----------------------
 # Train/Validation split (chronological)
 # -----------------------
-split_index = int(len(df) * 0.8)
-X_train, X_val = X.iloc[:split_index], X.iloc[split_index:]
-y_train, y_val = y.iloc[:split_index], y.iloc[split_index:]
-
-print(f"Training on {len(X_train)} rows, validating on {len(X_val)} rows")
+def split_chronological(df: pd.DataFrame, train_fraction: float = 0.8):
+    X = df[FEATURE_COLS]
+    y = df["target"]
+    split_index = int(len(df) * train_fraction)
+    return X.iloc[:split_index], X.iloc[split_index:], y.iloc[:split_index], y.iloc[split_index:]
 
 # -----------------------
 # Train model
 # -----------------------
-model = RandomForestClassifier(
-    n_estimators=100,
-    random_state=42,
-    class_weight="balanced",
-    n_jobs=-1
-)
-model.fit(X_train, y_train)
-print("Model training complete!")
+def train_model(X_train: pd.DataFrame, y_train: pd.Series):
+    from sklearn.ensemble import RandomForestClassifier
 
-# -----------------------
-# Predict & evaluate
-# -----------------------
-threshold = 0.525
-probs = model.predict_proba(X_val)[:, 1]
-y_pred = (probs >= threshold).astype(int)
+    model = RandomForestClassifier(
+        n_estimators=100,
+        random_state=42,
+        class_weight="balanced",
+        n_jobs=-1
+    )
+    with stage("feature_engineering.train", rows=len(X_train)):
+        model.fit(X_train, y_train)
+    print("Model training complete!")
+    return model
 
-print("\nModel Evaluation at fixed threshold 0.525:")
-print(classification_report(y_val, y_pred))
-print(confusion_matrix(y_val, y_pred))
 
-# -----------------------
-# Save model
-# -----------------------
-joblib.dump(model, MODEL_PATH)
-print(f"Model saved to: {MODEL_PATH}")
-print(f"Balanced threshold used: {threshold}")
\ No newline at end of file
+def main():
+    import joblib
+    from sklearn.metrics import classification_report, confusion_matrix
+
+    df = build_features(load_aggregates())
+
+    # -----------------------
+    # Save feature-engineered data
+    # -----------------------
+    save_features(df)
+    print(f"Feature-engineered data saved to: {FEATURE_PATH}")
+
+    X_train, X_val, y_train, y_val = split_chronological(df)
+    print(f"Training on {len(X_train)} rows, validating on {len(X_val)} rows")
+
+    model = train_model(X_train, y_train)
+
+    # -----------------------
+    # Predict & evaluate
+    # -----------------------
+    with stage("feature_engineering.predict", rows=len(X_val)):
+        probs = model.predict_proba(X_val)[:, 1]
+    y_pred = (probs >= THRESHOLD).astype(int)
+
+    print(f"\nModel Evaluation at fixed threshold {THRESHOLD}:")
+    print(classification_report(y_val, y_pred))
+    print(confusion_matrix(y_val, y_pred))
+
+    # -----------------------
+    # Save model
+    # -----------------------
+    joblib.dump(model, MODEL_PATH)
+    print(f"Model saved to: {MODEL_PATH}")
+    print(f"Balanced threshold used: {THRESHOLD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# src/features/feature_matrix.py
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from utils.logger import get_logger
+from utils.metrics import stage
+
+logger = get_logger("feature_matrix")
+
+# -----------------------
+# Layout
+# -----------------------
+# data/processed/device/feature_matrix/
+#     schema.json        ordered feature names, their source dtypes, row count and the
+#                        feature CSV (path, mtime, size) the matrix was built from
+#     X.npy              (rows, features) float32, C-contiguous -> np.load(mmap_mode="r")
+#     y.npy              int8 target (absent for unlabeled inputs)
+#     device_id.npy      int64 row keys
+#     timestamp.npy      datetime64[ns] row keys
+FEATURE_MATRIX_DIR = REPO_ROOT / "data" / "processed" / "device" / "feature_matrix"
+MATRIX_DTYPE = np.float32
+KEY_COLUMNS = ("device_id", "timestamp")
+TARGET_COLUMN = "target"
+
+
+# -----------------------
+# Schema
+# -----------------------
+class FeatureSchema:
+    """Ordered model input columns and the dtypes they had in the feature table."""
+
+    def __init__(self, columns: Sequence[str], dtypes: Dict[str, str]):
+        self.columns: List[str] = list(columns)
+        self.dtypes = dict(dtypes)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str]) -> "FeatureSchema":
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Feature table is missing schema columns: {missing}")
+        return cls(columns, {c: str(df[c].dtype) for c in columns})
+
+    def to_dict(self) -> dict:
+        return {"columns": self.columns, "dtypes": self.dtypes, "matrix_dtype": np.dtype(MATRIX_DTYPE).name}
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureSchema":
+        meta = json.loads(Path(path).read_text())
+        return cls(meta["columns"], meta["dtypes"])
+
+    def check(self, columns: Optional[Sequence[str]]):
+        """Raise if a model was trained on a different column order than this schema."""
+        if columns is not None and list(columns) != self.columns:
+            raise ValueError(f"Model expects features {list(columns)}, feature matrix has {self.columns}")
+
+
+def build_matrix(df: pd.DataFrame, schema: FeatureSchema) -> np.ndarray:
+    """Schema columns of ``df`` as one C-contiguous float32 array (NaN for missing values)."""
+    X = np.empty((len(df), len(schema.columns)), dtype=MATRIX_DTYPE)
+    for j, column in enumerate(schema.columns):
+        X[:, j] = df[column].to_numpy(dtype=MATRIX_DTYPE, na_value=np.nan)
+    return X
+
+
+# -----------------------
+# Persisted matrix
+# -----------------------
+class FeatureMatrix:
+    """Model inputs (``X``), target (``y``) and row keys, as written by ``write_feature_matrix``."""
+
+    def __init__(self, X: np.ndarray, schema: FeatureSchema, y: Optional[np.ndarray] = None,
+                 keys: Optional[Dict[str, np.ndarray]] = None):
+        self.X = X
+        self.schema = schema
+        self.y = y
+        self.keys = keys or {}
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.columns
+
+    def to_frame(self) -> pd.DataFrame:
+        """Keys, features (integer columns restored to their source dtype) and target."""
+        data = dict(self.keys)
+        for j, column in enumerate(self.schema.columns):
+            dtype = self.schema.dtypes.get(column, "float32")
+            values = self.X[:, j]
+            data[column] = values.astype(dtype) if np.issubdtype(np.dtype(dtype), np.integer) else values
+        if self.y is not None:
+            data[TARGET_COLUMN] = self.y
+        return pd.DataFrame(data)
+
+
+def matrix_from_frame(df: pd.DataFrame, columns: Sequence[str]) -> FeatureMatrix:
+    """Build the in-memory ``FeatureMatrix`` for a feature table."""
+    schema = FeatureSchema.from_frame(df, columns)
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int8) if TARGET_COLUMN in df.columns else None
+    keys = {}
+    for key in KEY_COLUMNS:
+        if key in df.columns:
+            keys[key] = (pd.to_datetime(df[key]) if key == "timestamp" else df[key]).to_numpy()
+    return FeatureMatrix(build_matrix(df, schema), schema, y, keys)
+
+
+def _source_state(csv_path: Path) -> dict:
+    stat = Path(csv_path).stat()
+    return {"path": str(Path(csv_path).resolve()), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def write_feature_matrix(df: pd.DataFrame, columns: Sequence[str], out_dir: Path = FEATURE_MATRIX_DIR,
+                         source: Optional[Path] = None) -> FeatureSchema:
+    """
+    Persist ``df``'s feature columns as a float32 matrix with its schema and row
+    keys; ``source`` is the CSV ``df`` was saved to, which ``load_features``
+    checks before trusting the matrix.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with stage("feature_matrix.write", rows=len(df)):
+        matrix = matrix_from_frame(df, columns)
+        np.save(out_dir / "X.npy", matrix.X)
+        for name, values in (("y", matrix.y), *((key, matrix.keys.get(key)) for key in KEY_COLUMNS)):
+            if values is not None:
+                np.save(out_dir / f"{name}.npy", values)
+            else:
+                (out_dir / f"{name}.npy").unlink(missing_ok=True)
+        meta = {**matrix.schema.to_dict(), "rows": len(df),
+                "created_at": datetime.now().isoformat(timespec="seconds")}
+        if source is not None and Path(source).exists():
+            meta["source"] = _source_state(source)
+        (out_dir / "schema.json").write_text(json.dumps(meta, indent=2))
+    logger.info(f"Feature matrix written to {out_dir} ({len(df)} x {len(columns)})")
+    return matrix.schema
+
+
+def load_feature_matrix(directory: Path = FEATURE_MATRIX_DIR, mmap: bool = True) -> Optional[FeatureMatrix]:
+    """The persisted matrix (memory-mapped by default), or None if it has not been built."""
+    directory = Path(directory)
+    if not (directory / "schema.json").exists():
+        return None
+    mode = "r" if mmap else None
+    with stage("feature_matrix.load") as s:
+        schema = FeatureSchema.load(directory / "schema.json")
+        X = np.load(directory / "X.npy", mmap_mode=mode)
+        y = np.load(directory / "y.npy", mmap_mode=mode) if (directory / "y.npy").exists() else None
+        keys = {key: np.load(directory / f"{key}.npy", mmap_mode=mode)
+                for key in KEY_COLUMNS if (directory / f"{key}.npy").exists()}
+        s.rows = X.shape[0]
+    if X.shape[1] != len(schema.columns) or X.dtype != MATRIX_DTYPE:
+        raise ValueError(f"{directory / 'X.npy'} does not match its schema ({X.shape}, {X.dtype})")
+    return FeatureMatrix(X, schema, y, keys)
+
+
+def _stale_reason(meta: dict, csv_path: Path, columns: Sequence[str]) -> Optional[str]:
+    """Why the persisted matrix cannot stand in for ``csv_path`` (None if it can)."""
+    if meta["columns"] != list(columns):
+        return f"feature matrix has columns {meta['columns']}"
+    source = meta.get("source")
+    if source is None:
+        return "feature matrix records no source CSV"
+    if source["path"] != str(csv_path.resolve()):
+        return f"feature matrix was built from {source['path']}"
+    if not csv_path.exists() or _source_state(csv_path) != source:
+        return f"{csv_path} changed since the feature matrix was built"
+    return None
+
+
+def load_features(csv_path: Path, columns: Sequence[str],
+                  directory: Path = FEATURE_MATRIX_DIR) -> Optional[FeatureMatrix]:
+    """
+    Persisted matrix if it was built from ``csv_path`` as it is now and with
+    ``columns``, else one converted from the feature CSV, else None. A matrix
+    whose own CSV was rewritten (e.g. by something other than ``save_features``)
+    is rebuilt in place.
+    """
+    csv_path, directory = Path(csv_path), Path(directory)
+    reason = f"No feature matrix under {directory}"
+    if (directory / "schema.json").exists():
+        meta = json.loads((directory / "schema.json").read_text())
+        stale = _stale_reason(meta, csv_path, columns)
+        if stale is None:
+            return load_feature_matrix(directory)
+        reason = stale[0].upper() + stale[1:]
+        if meta.get("source", {}).get("path") == str(csv_path.resolve()) and meta["columns"] == list(columns) \
+                and csv_path.exists():
+            logger.info(f"{reason}; rebuilding {directory}")
+            write_feature_matrix(pd.read_csv(csv_path), columns, directory, source=csv_path)
+            return load_feature_matrix(directory)
+    if not csv_path.exists():
+        return None
+    logger.info(f"{reason}; converting {csv_path}")
+    return matrix_from_frame(pd.read_csv(csv_path), columns)
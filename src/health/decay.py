@@ -0,0 +1,126 @@
+# src/health/decay.py
+
+import math
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from health.rules import HealthRules, get_rules
+
+
+def _to_seconds(timestamp) -> float:
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return pd.Timestamp(timestamp).timestamp()
+
+
+# -----------------------
+# Incremental tracker (object graph / streaming path)
+# -----------------------
+class DecayedHealthTracker:
+    """
+    Exponentially time-decayed health per entity.
+
+    Each entity keeps only a decayed failure load and the timestamp it was last
+    brought up to date. A failure adds 1 to the load; the load halves every
+    ``half_life_hours``. Health is ``max_score - failure_penalty * load``,
+    clamped to the score range. Updates and queries are O(1).
+    """
+
+    def __init__(self, rules: Optional[HealthRules] = None,
+                 half_life_hours: Optional[float] = None,
+                 failure_penalty: Optional[float] = None):
+        self.rules = rules or get_rules()
+        half_life_hours = half_life_hours or self.rules.decay_half_life_hours
+        self.decay_rate = math.log(2) / (half_life_hours * 3600.0)  # per second
+        self.failure_penalty = failure_penalty if failure_penalty is not None \
+            else self.rules.decay_failure_penalty
+        self._state: Dict[Hashable, Tuple[float, float]] = {}
+        self.latest_timestamp: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def update(self, entity_id: Hashable, timestamp, failures: float = 1.0):
+        """Add ``failures`` observed at ``timestamp``; out-of-order updates are decayed in place."""
+        ts = _to_seconds(timestamp)
+        load, last = self._state.get(entity_id, (0.0, ts))
+        if ts >= last:
+            load = load * math.exp(-self.decay_rate * (ts - last)) + failures
+            last = ts
+        else:
+            load += failures * math.exp(-self.decay_rate * (last - ts))
+        self._state[entity_id] = (load, last)
+        if self.latest_timestamp is None or ts > self.latest_timestamp:
+            self.latest_timestamp = ts
+
+    def load(self, entity_id: Hashable, at=None) -> float:
+        """Decayed failure load of an entity as of ``at`` (default: latest seen timestamp)."""
+        state = self._state.get(entity_id)
+        if state is None:
+            return 0.0
+        load, last = state
+        at = self.latest_timestamp if at is None else _to_seconds(at)
+        return load * math.exp(-self.decay_rate * max(at - last, 0.0))
+
+    def score(self, entity_id: Hashable, at=None) -> float:
+        """Decayed health score of an entity (entities never seen score ``max_score``)."""
+        return self.rules.clamp(self.rules.max_score - self.failure_penalty * self.load(entity_id, at))
+
+    def scores(self, at=None) -> Dict[Hashable, float]:
+        """Decayed health of every tracked entity."""
+        return {entity_id: self.score(entity_id, at) for entity_id in self._state}
+
+
+# -----------------------
+# Vectorized window path
+# -----------------------
+def decay_loads(ts: np.ndarray, codes: np.ndarray, failures: np.ndarray, decay_rate: float,
+                load: Optional[np.ndarray] = None, last: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decayed failure load after each row, for rows sorted by ``ts`` (seconds)
+    with entity ``codes`` (at most one row per entity and timestamp, as in a
+    windowed aggregate). ``load`` / ``last`` are the load each entity carries
+    in and the time it applies at (default: none); both are updated in place.
+    """
+    n = int(codes.max()) + 1 if len(codes) else 0
+    load = np.zeros(n) if load is None else load
+    last = np.full(n, -np.inf) if last is None else last
+    out = np.empty(len(ts))
+    bounds = np.flatnonzero(np.diff(ts)) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(ts)]):
+        c = codes[start:end]
+        load[c] = load[c] * np.exp(-decay_rate * (ts[start] - last[c])) + failures[start:end]
+        last[c] = ts[start]
+        out[start:end] = load[c]
+    return out
+
+
+def decayed_health_score(agg: pd.DataFrame, id_col: str,
+                         rules: Optional[HealthRules] = None) -> pd.Series:
+    """
+    Decayed health for each row of a windowed aggregate (``id_col``, ``timestamp``,
+    ``failure_events``), carrying each entity's load forward between its windows.
+
+    Walks the distinct window timestamps once and updates every entity active in
+    a window with one vectorized step, so cost is O(rows) with no history rescans.
+    """
+    rules = rules or get_rules()
+    if agg.empty:
+        return pd.Series(dtype=float, index=agg.index)
+
+    decay_rate = math.log(2) / (rules.decay_half_life_hours * 3600.0)
+    order = np.argsort(agg["timestamp"].to_numpy(), kind="stable")
+    ts = agg["timestamp"].to_numpy()[order].astype("datetime64[ns]").astype(np.int64) / 1e9
+    codes, _ = pd.factorize(agg[id_col].to_numpy()[order])
+    failures = agg["failure_events"].to_numpy(dtype=float)[order]
+    out = decay_loads(ts, codes, failures, decay_rate)
+
+    health = rules.clamp_series(rules.max_score - rules.decay_failure_penalty * out)
+    result = np.empty(len(order))
+    result[order] = health
+    return pd.Series(result, index=agg.index)
@@ -0,0 +1,111 @@
+# src/health/event_index.py
+
+from typing import Dict, List, Optional
+
+from transformation.relational_model import Event
+from health.rules import HealthRules, get_rules
+from health.decay import DecayedHealthTracker
+
+
+# -----------------------
+# Event index
+# -----------------------
+class EventIndex:
+    """
+    Per-entity event and failure counters built in a single pass over all events.
+
+    Event types are normalized once (strip + lower) and stored as small integer
+    codes, so scorers never touch the raw strings again. Failure flags per code
+    come from the compiled health rules. With ``decay=True`` the same pass also
+    feeds time-decayed health trackers for devices and interfaces.
+    """
+
+    def __init__(self, rules: Optional[HealthRules] = None, decay: bool = False):
+        rules = rules or get_rules()
+        self.device_failure_types = rules.failure_types("device")
+        self.interface_failure_types = rules.failure_types("interface")
+
+        # Categorical event types: normalized name <-> code
+        self.type_codes: Dict[str, int] = {}
+        self.type_names: List[str] = []
+        self.type_counts: List[int] = []
+        self._raw_codes: Dict[str, int] = {}
+        self._device_failure_codes: List[bool] = []
+        self._interface_failure_codes: List[bool] = []
+
+        # Per-entity counters
+        self.device_totals: Dict[int, int] = {}
+        self.device_failures: Dict[int, int] = {}
+        self.interface_totals: Dict[int, int] = {}
+        self.interface_failures: Dict[int, int] = {}
+        self.total_events = 0
+
+        # Optional time-decayed health (only failures need an update)
+        self.device_decay = DecayedHealthTracker(rules) if decay else None
+        self.interface_decay = DecayedHealthTracker(rules) if decay else None
+        self.latest_event_time = None
+
+    @classmethod
+    def build(cls, events: Dict[int, Event], **kwargs) -> "EventIndex":
+        """Build the index with one pass over ``events``."""
+        index = cls(**kwargs)
+        for e in events.values():
+            index.add(e)
+        return index
+
+    def code_for(self, event_type: Optional[str]) -> int:
+        """Return the categorical code of a raw event type, normalizing it only once."""
+        raw = event_type or ""
+        code = self._raw_codes.get(raw)
+        if code is None:
+            name = raw.strip().lower()
+            code = self.type_codes.get(name)
+            if code is None:
+                code = len(self.type_names)
+                self.type_codes[name] = code
+                self.type_names.append(name)
+                self.type_counts.append(0)
+                self._device_failure_codes.append(name in self.device_failure_types)
+                self._interface_failure_codes.append(name in self.interface_failure_types)
+            self._raw_codes[raw] = code
+        return code
+
+    def add(self, event: Event):
+        """Count a single event against its device and interface."""
+        code = self.code_for(event.event_type)
+        self.type_counts[code] += 1
+        self.total_events += 1
+        if self.device_decay is not None and (
+                self.latest_event_time is None or event.event_timestamp > self.latest_event_time):
+            self.latest_event_time = event.event_timestamp
+
+        if event.device is not None:
+            device_id = event.device.device_id
+            self.device_totals[device_id] = self.device_totals.get(device_id, 0) + 1
+            if self._device_failure_codes[code]:
+                self.device_failures[device_id] = self.device_failures.get(device_id, 0) + 1
+                if self.device_decay is not None:
+                    self.device_decay.update(device_id, event.event_timestamp)
+
+        if event.interface is not None:
+            interface_id = event.interface.interface_id
+            self.interface_totals[interface_id] = self.interface_totals.get(interface_id, 0) + 1
+            if self._interface_failure_codes[code]:
+                self.interface_failures[interface_id] = self.interface_failures.get(interface_id, 0) + 1
+                if self.interface_decay is not None:
+                    self.interface_decay.update(interface_id, event.event_timestamp)
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def device_counts(self, device_id: int):
+        """Return ``(failure_events, total_events)`` for a device."""
+        return self.device_failures.get(device_id, 0), self.device_totals.get(device_id, 0)
+
+    def interface_counts(self, interface_id: int):
+        """Return ``(failure_events, total_events)`` for an interface."""
+        return self.interface_failures.get(interface_id, 0), self.interface_totals.get(interface_id, 0)
+
+    def event_type_counts(self) -> Dict[str, int]:
+        """Fleet-wide event counts per normalized event type."""
+        return dict(zip(self.type_names, self.type_counts))
@@ -0,0 +1,631 @@
+# src/health/event_ingest.py
+
+import argparse
+import json
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from health.decay import decay_loads
+from health.rules import HealthRules, get_rules
+from health.window_aggregation import WINDOW_FREQ, clean_events, compute_health_score, save_outputs
+from transformation.validation import SPECS, read_table_range
+from utils.config import get_section
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+
+logger = get_logger("event_ingest")
+
+# -----------------------
+# Config
+# -----------------------
+INGEST_CONFIG = get_section("ingest")
+INGEST_DIR = REPO_ROOT / INGEST_CONFIG.get("dir", "data/processed/ingest")
+EXACT_HOURS = INGEST_CONFIG.get("exact_hours", 24)
+MAX_LATENESS_HOURS = INGEST_CONFIG.get("max_lateness_hours", 168)
+BLOOM_FP_RATE = INGEST_CONFIG.get("bloom_fp_rate", 0.01)
+BATCH_EVENTS = INGEST_CONFIG.get("batch_events", 100_000)
+DATA_DIR = REPO_ROOT / "data" / "raw"
+
+# -----------------------
+# Layout
+# -----------------------
+# data/processed/ingest/
+#     manifest.json                        version, source offset, watermark, dedup buckets, partitions, totals
+#     dedup/exact-<bucket>-v3.npy          sorted event ids of a recent window (held in memory while ingesting)
+#     dedup/ids-<bucket>-v2.npy            sorted event ids of an older window (read only to confirm a Bloom hit)
+#     dedup/bloom-<bucket>-v2.npy          Bloom filter bits of that window
+#     device_id/day-20250714-v3.parquet    window aggregates of one day, written at version 3
+#     device_id/tail-v3.parquet            last window and decayed load of every device
+#
+# Files are copy-on-write, as in transformation/snapshots.py: a commit writes
+# new files for what changed and then swaps the manifest.
+ENTITIES = ("device_id", "interface_id")
+DAY_NS = 86_400 * 10**9
+ACCEPTED, DUPLICATE, TOO_LATE = 0, 1, 2
+AGG_COLUMNS = ["window", "total_events", "failure_events", "health_score", "decayed_health_score", "decay_load"]
+
+
+# -----------------------
+# Bloom filter
+# -----------------------
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: well-spread 64-bit hashes of integer ids."""
+    x = np.asarray(values, dtype=np.int64).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return x
+
+
+class BloomFilter:
+    """Bit-array Bloom filter over int64 ids; ``n_hashes`` probes by double hashing."""
+
+    def __init__(self, n_bits: int, n_hashes: int, bits: Optional[np.ndarray] = None):
+        self.n_bits = int(n_bits)
+        self.n_hashes = int(n_hashes)
+        self.bits = bits if bits is not None else np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    @classmethod
+    def for_capacity(cls, n: int, fp_rate: float) -> "BloomFilter":
+        n = max(int(n), 1)
+        n_bits = max(64, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(n_bits, max(1, round(n_bits / n * math.log(2))))
+
+    def _probes(self, ids: np.ndarray) -> np.ndarray:
+        h = _mix64(ids)
+        step = (h >> np.uint64(32)) | np.uint64(1)
+        k = np.arange(self.n_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h[:, None] + k[None, :] * step[:, None]) % np.uint64(self.n_bits)
+
+    def add(self, ids: np.ndarray):
+        probes = self._probes(ids).ravel()
+        np.bitwise_or.at(self.bits, probes >> np.uint64(3), np.left_shift(1, probes & np.uint64(7)).astype(np.uint8))
+
+    def might_contain(self, ids: np.ndarray) -> np.ndarray:
+        probes = self._probes(ids)
+        return ((self.bits[probes >> np.uint64(3)] >> (probes & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+
+
+def _contains(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Membership of ``ids`` in a sorted array (vectorized binary search)."""
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[pos] == ids
+
+
+# -----------------------
+# Deduplication
+# -----------------------
+class EventDeduplicator:
+    """
+    Exact ``event_id`` dedup with memory bounded by event time.
+
+    Ids are bucketed by the window their event falls in. The ``exact_windows``
+    newest buckets keep sorted id arrays in memory; older ones keep only a
+    Bloom filter, and ids it reports as possibly seen are confirmed against
+    the bucket's id file, so answers stay exact. Buckets more than
+    ``max_lateness`` windows behind the watermark are dropped and their events
+    rejected as too late. A redelivered event is assumed to carry its original
+    timestamp.
+    """
+
+    MAX_CHUNKS = 8      # sorted id chunks per exact bucket before they are merged
+
+    def __init__(self, root: Path, exact_windows: int, max_lateness: int, fp_rate: float = BLOOM_FP_RATE):
+        self.root = Path(root)
+        self.version = 1                                     # version of files written before the next commit
+        self.exact_windows = exact_windows
+        self.max_lateness = max_lateness
+        self.fp_rate = fp_rate
+        self.watermark: Optional[int] = None                 # newest window (bucket) seen
+        self.exact: Dict[int, List[np.ndarray]] = {}         # bucket -> sorted id chunks
+        self.exact_files: Dict[int, str] = {}                # bucket -> last saved id file
+        self.spilled: Dict[int, dict] = {}                   # bucket -> id file, Bloom filter and its file
+        self.dirty: set = set()                              # exact buckets changed since the last save
+        self.confirmations = 0                               # Bloom hits checked against an id file
+        self.false_positives = 0
+
+    # -----------------------
+    # Membership
+    # -----------------------
+    def _seen(self, bucket: int, ids: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(ids), dtype=bool)
+        for chunk in self.exact.get(bucket, ()):
+            seen |= _contains(chunk, ids)
+        spilled = self.spilled.get(bucket)
+        if spilled is not None:
+            maybe = ~seen & spilled["bloom"].might_contain(ids)
+            if maybe.any():
+                stored = np.load(self.root / spilled["ids"], mmap_mode="r")
+                confirmed = _contains(stored, ids[maybe])
+                seen[np.flatnonzero(maybe)[confirmed]] = True
+                self.confirmations += int(maybe.sum())
+                self.false_positives += int((~confirmed).sum())
+        return seen
+
+    def check(self, ids: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        """Status (ACCEPTED / DUPLICATE / TOO_LATE) of each event; accepted ids are remembered."""
+        status = np.full(len(ids), ACCEPTED, dtype=np.uint8)
+        if self.watermark is not None:
+            status[buckets < self.watermark - self.max_lateness] = TOO_LATE
+        first = np.zeros(len(ids), dtype=bool)
+        first[np.unique(ids, return_index=True)[1]] = True
+        status[(status == ACCEPTED) & ~first] = DUPLICATE
+
+        candidates = np.flatnonzero(status == ACCEPTED)
+        if len(candidates):
+            candidates = candidates[np.argsort(buckets[candidates], kind="stable")]
+            groups, starts = np.unique(buckets[candidates], return_index=True)
+            for bucket, idx in zip(groups.tolist(), np.split(candidates, starts[1:])):
+                seen = self._seen(bucket, ids[idx])
+                status[idx[seen]] = DUPLICATE
+                if (~seen).any():
+                    self._remember(bucket, np.sort(ids[idx[~seen]]))
+            newest = int(groups[-1])
+            self.watermark = newest if self.watermark is None else max(self.watermark, newest)
+            self._expire()
+        return status
+
+    def _remember(self, bucket: int, ids: np.ndarray):
+        chunks = self.exact.setdefault(bucket, [])
+        chunks.append(ids)
+        if len(chunks) > self.MAX_CHUNKS:
+            self.exact[bucket] = [np.sort(np.concatenate(chunks))]
+        self.dirty.add(bucket)
+
+    # -----------------------
+    # Retention
+    # -----------------------
+    def _expire(self):
+        """Spill buckets that left the exact horizon; drop those past the lateness horizon."""
+        for bucket in [b for b in self.exact if b <= self.watermark - self.exact_windows]:
+            self._spill(bucket)
+        for bucket in [b for b in self.spilled if b < self.watermark - self.max_lateness]:
+            del self.spilled[bucket]
+
+    def _spill(self, bucket: int):
+        """Replace a bucket's in-memory ids by an id file plus a Bloom filter sized for them."""
+        ids = np.concatenate(self.exact.pop(bucket))
+        self.exact_files.pop(bucket, None)
+        self.dirty.discard(bucket)
+        previous = self.spilled.get(bucket)
+        if previous is not None:
+            ids = np.concatenate([ids, np.load(self.root / previous["ids"])])
+        ids = np.sort(ids)
+        bloom = BloomFilter.for_capacity(len(ids), self.fp_rate)
+        bloom.add(ids)
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = f"ids-{bucket}-v{self.version}.npy"
+        np.save(self.root / name, ids)
+        self.spilled[bucket] = {"ids": name, "bloom": bloom, "bloom_file": None}    # bits are saved on commit
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Bytes held in memory by the exact id sets and by the Bloom filters."""
+        return {"exact_ids": sum(c.nbytes for chunks in self.exact.values() for c in chunks),
+                "bloom": sum(s["bloom"].bits.nbytes for s in self.spilled.values())}
+
+    # -----------------------
+    # Persistence
+    # -----------------------
+    def save(self) -> dict:
+        """Write the exact buckets changed since the last save; returns the manifest entry."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        for bucket in self.dirty:
+            chunks = self.exact[bucket]
+            self.exact[bucket] = [np.sort(np.concatenate(chunks))] if len(chunks) > 1 else chunks
+            self.exact_files[bucket] = f"exact-{bucket}-v{self.version}.npy"
+            np.save(self.root / self.exact_files[bucket], self.exact[bucket][0])
+        self.dirty = set()
+        for bucket, spilled in self.spilled.items():
+            if spilled["bloom_file"] is None:
+                spilled["bloom_file"] = f"bloom-{bucket}-v{self.version}.npy"
+                np.save(self.root / spilled["bloom_file"], spilled["bloom"].bits)
+        return {
+            "watermark": self.watermark,
+            "exact": {str(b): f for b, f in sorted(self.exact_files.items())},
+            "spilled": {str(b): {"ids": s["ids"], "bloom": s["bloom_file"], "n_bits": s["bloom"].n_bits,
+                                 "n_hashes": s["bloom"].n_hashes} for b, s in sorted(self.spilled.items())},
+        }
+
+    def load(self, state: dict):
+        self.watermark = state["watermark"]
+        for bucket, f in state["exact"].items():
+            self.exact[int(bucket)] = [np.load(self.root / f)]
+            self.exact_files[int(bucket)] = f
+        for bucket, s in state["spilled"].items():
+            bloom = BloomFilter(s["n_bits"], s["n_hashes"], np.load(self.root / s["bloom"]))
+            self.spilled[int(bucket)] = {"ids": s["ids"], "bloom": bloom, "bloom_file": s["bloom"]}
+
+    def files(self) -> set:
+        return set(self.exact_files.values()) | {f for s in self.spilled.values() for f in (s["ids"], s["bloom_file"]) if f}
+
+
+# -----------------------
+# Window aggregates
+# -----------------------
+class WindowAggregates:
+    """
+    Window aggregates of one entity column, as one parquet partition per day
+    plus each entity's last window and decayed load (its tail).
+
+    ``apply`` adds per-window counts and recomputes only the rows they change:
+    the touched windows' ratio scores and, per touched entity, the decayed
+    scores from its earliest touched window onwards, starting from the load
+    the entity carried into that window.
+    """
+
+    def __init__(self, id_col: str, root: Path, rules: HealthRules, state: Optional[dict] = None):
+        self.id_col = id_col
+        self.root = Path(root) / id_col
+        self.rules = rules
+        self.decay_rate = math.log(2) / (rules.decay_half_life_hours * 3600.0)   # per second
+        self.version = 1
+        state = state or {"partitions": {}, "tail": None}
+        self.partition_files: Dict[int, str] = {int(day): f for day, f in state["partitions"].items()}
+        self.frames: Dict[int, pd.DataFrame] = {}
+        self.dirty: set = set()
+        self._template: Optional[pd.DataFrame] = None
+        self.tail_file: Optional[str] = state["tail"]
+        if self.tail_file:
+            self.tail = pd.read_parquet(self.root / self.tail_file).set_index(id_col)
+        else:
+            self.tail = pd.DataFrame({"window": pd.Series(dtype=np.int64), "decay_load": pd.Series(dtype=float)},
+                                     index=pd.Index([], dtype=np.int64, name=id_col))
+        self.tail_dirty = False
+
+    def _empty(self) -> pd.DataFrame:
+        if self._template is None:
+            self._template = pd.DataFrame({self.id_col: pd.Series(dtype=np.int64), "window": pd.Series(dtype=np.int64),
+                                           **{c: pd.Series(dtype=np.int64) for c in ("total_events", "failure_events")},
+                                           **{c: pd.Series(dtype=float) for c in AGG_COLUMNS[3:]}})
+        return self._template.copy()
+
+    def _frame(self, day: int) -> pd.DataFrame:
+        if day not in self.frames:
+            if day in self.partition_files:
+                df = pd.read_parquet(self.root / self.partition_files[day])
+                df.insert(1, "window", df.pop("timestamp").to_numpy().astype("datetime64[ns]").astype(np.int64))
+                self.frames[day] = df
+            else:
+                self.frames[day] = self._empty()
+        return self.frames[day]
+
+    # -----------------------
+    # Incremental update
+    # -----------------------
+    def _carried(self, start: pd.Series, codes: np.ndarray, windows: np.ndarray, load_in: np.ndarray) -> np.ndarray:
+        """
+        Decayed load each touched entity carries into its first touched window
+        (before that window's failures): what its first row at or after that
+        window carried in (``codes`` / ``windows`` / ``load_in``), decayed back,
+        or else its tail decayed forward.
+        """
+        start_ns = start.to_numpy()
+        carried = np.zeros(len(start))
+        tail = self.tail.reindex(start.index)
+        known = tail["window"].notna().to_numpy()
+        elapsed = (start_ns[known] - tail["window"].to_numpy()[known]) / 1e9
+        carried[known] = tail["decay_load"].to_numpy()[known] * np.exp(-self.decay_rate * elapsed)
+        if len(codes):
+            order = np.lexsort((windows, codes))
+            first = order[np.r_[True, np.diff(codes[order]) != 0]]
+            at = codes[first]
+            carried[at] = load_in[first] * np.exp(self.decay_rate * (windows[first] - start_ns[at]) / 1e9)
+        return carried
+
+    def apply(self, delta: pd.DataFrame) -> int:
+        """Add ``delta`` (``id_col``, ``window``, counts; one row per pair); returns rows recomputed."""
+        id_col = self.id_col
+        delta_days = np.unique(delta["window"].to_numpy() // DAY_NS)
+        days = sorted({d for d in (*self.partition_files, *self.frames) if d >= delta_days[0]} | set(delta_days.tolist()))
+        rows = pd.concat([self._frame(d) for d in days], ignore_index=True)
+
+        # Touched entities and their existing rows from the first touched window on
+        start = delta.groupby(id_col)["window"].min()
+        row_codes = start.index.get_indexer(rows[id_col].to_numpy())
+        row_windows = rows["window"].to_numpy()
+        later = np.flatnonzero((row_codes >= 0) & (row_windows >= start.to_numpy()[row_codes]))
+        later_codes, later_windows = row_codes[later], row_windows[later]
+        load_in = rows["decay_load"].to_numpy()[later] - rows["failure_events"].to_numpy()[later]
+        carried = self._carried(start, later_codes, later_windows, load_in)
+
+        # Counts: existing (entity, window) rows in place, new windows appended
+        delta_codes = start.index.get_indexer(delta[id_col].to_numpy())
+        window_codes, windows = pd.factorize(np.r_[later_windows, delta["window"].to_numpy()])
+        pos = pd.Index(later_codes * len(windows) + window_codes[:len(later)]).get_indexer(
+            delta_codes * len(windows) + window_codes[len(later):])
+        hit = pos >= 0
+        counts = {}
+        for column in ("total_events", "failure_events"):
+            counts[column] = rows[column].to_numpy(copy=True)
+            counts[column][later[pos[hit]]] += delta[column].to_numpy()[hit]
+        rows = pd.concat([rows.assign(**counts), delta.loc[~hit]], ignore_index=True)
+        affected = np.r_[later, np.arange(len(row_codes), len(rows))]
+        codes = np.r_[later_codes, delta_codes[~hit]]
+
+        # Recompute them in time order: ratio scores and the decayed load walk
+        order = np.argsort(rows["window"].to_numpy()[affected], kind="stable")
+        affected, codes = affected[order], codes[order]
+        windows = rows["window"].to_numpy()[affected]
+        totals = rows["total_events"].to_numpy()[affected]
+        failures = rows["failure_events"].to_numpy()[affected]
+        loads = decay_loads(windows / 1e9, codes, failures.astype(float), self.decay_rate,
+                            load=carried, last=start.to_numpy() / 1e9)
+        scores = {
+            "health_score": compute_health_score(pd.DataFrame({"total_events": totals,
+                                                               "failure_events": failures})).to_numpy(),
+            "decayed_health_score": self.rules.clamp_series(
+                self.rules.max_score - self.rules.decay_failure_penalty * loads),
+            "decay_load": loads,
+        }
+        for column, values in scores.items():
+            out = rows[column].to_numpy(dtype=float, copy=True)
+            out[affected] = values
+            scores[column] = out
+        rows = rows.assign(**scores)
+
+        # Each touched entity's tail is its last recomputed row
+        by_entity = np.argsort(codes, kind="stable")
+        last = by_entity[np.r_[np.diff(codes[by_entity]) != 0, True]]
+        tail = pd.DataFrame({"window": windows[last], "decay_load": loads[last]},
+                            index=pd.Index(start.index.to_numpy()[codes[last]], name=id_col))
+        self.tail = pd.concat([self.tail.drop(tail.index, errors="ignore"), tail])
+        self.tail_dirty = True
+
+        # Back into the day partitions that changed
+        row_days = rows["window"].to_numpy() // DAY_NS
+        touched = np.unique(row_days[affected])
+        changed = np.isin(row_days, touched)
+        for day, frame in rows.loc[changed].groupby(row_days[changed], sort=False):
+            self.frames[int(day)] = frame.reset_index(drop=True)
+        self.dirty |= set(touched.tolist())
+        return len(affected)
+
+    # -----------------------
+    # Persistence / output
+    # -----------------------
+    def save(self) -> dict:
+        """Write changed day partitions and the tail; keep only the newest day in memory."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        for day in sorted(self.dirty):
+            df = self.frames[day].sort_values([self.id_col, "window"])
+            df.insert(1, "timestamp", df.pop("window").to_numpy().astype("datetime64[ns]"))
+            label = pd.Timestamp(day * DAY_NS).strftime("%Y%m%d")
+            self.partition_files[day] = f"day-{label}-v{self.version}.parquet"
+            df.to_parquet(self.root / self.partition_files[day], index=False)
+        if self.tail_dirty:
+            self.tail_file = f"tail-v{self.version}.parquet"
+            self.tail.reset_index().to_parquet(self.root / self.tail_file, index=False)
+        self.dirty, self.tail_dirty = set(), False
+        newest = max(self.partition_files, default=None)
+        self.frames = {day: df for day, df in self.frames.items() if day == newest}
+        return {"partitions": {str(d): f for d, f in sorted(self.partition_files.items())}, "tail": self.tail_file}
+
+    def files(self) -> set:
+        return set(self.partition_files.values()) | ({self.tail_file} if self.tail_file else set())
+
+    def frame(self) -> pd.DataFrame:
+        """All windows in the ``aggregate_entity`` layout, ordered by entity and time."""
+        days = sorted(set(self.partition_files) | set(self.frames))
+        df = pd.concat([self._empty()] + [self._frame(d) for d in days], ignore_index=True)
+        df = df.sort_values([self.id_col, "window"], ignore_index=True)
+        df.insert(1, "timestamp", df.pop("window").to_numpy().astype("datetime64[ns]"))
+        return df.drop(columns="decay_load")
+
+
+# -----------------------
+# Ingestion
+# -----------------------
+class EventIngestor:
+    """
+    Deduplicating, late-event-aware ingestion of events into device and
+    interface window aggregates.
+
+    ``ingest`` folds one batch of clean events: repeated ``event_id``s are
+    dropped, events behind the lateness horizon are rejected, and every other
+    event is counted in its own window however late it arrives. ``update``
+    consumes the events appended to the raw CSV since the last commit (byte
+    offsets, as in the snapshot store) and commits.
+    """
+
+    def __init__(self, root: Path = INGEST_DIR, data_dir: Path = DATA_DIR, freq: str = WINDOW_FREQ,
+                 exact_hours: float = EXACT_HOURS, max_lateness_hours: float = MAX_LATENESS_HOURS,
+                 fp_rate: float = BLOOM_FP_RATE, rules: Optional[HealthRules] = None):
+        self.root = Path(root)
+        self.data_dir = Path(data_dir)
+        self.freq = freq
+        self.window_ns = pd.Timedelta(freq).value
+        self.exact_windows = max(1, math.ceil(exact_hours * 3600e9 / self.window_ns))
+        self.max_lateness = max(self.exact_windows, math.ceil(max_lateness_hours * 3600e9 / self.window_ns))
+        self.fp_rate = fp_rate
+        self.rules = rules or get_rules()
+        manifest = self.manifest()
+        self.reset(manifest)
+        if manifest is not None:
+            self.dedup.load(manifest["dedup"])
+
+    def reset(self, manifest: Optional[dict] = None):
+        """In-memory state of ``manifest`` (default: empty); files are written at the next version."""
+        latest = manifest or self.manifest()
+        version = (latest["version"] if latest else 0) + 1
+        self.dedup = EventDeduplicator(self.root / "dedup", self.exact_windows, self.max_lateness, self.fp_rate)
+        self.aggregates = {id_col: WindowAggregates(id_col, self.root, self.rules,
+                                                    manifest["aggregates"][id_col] if manifest else None)
+                           for id_col in ENTITIES}
+        self.totals = dict(manifest["totals"]) if manifest else \
+            {"accepted": 0, "duplicates": 0, "too_late": 0, "late": 0, "invalid": 0, "rows_recomputed": 0}
+        self.version = version
+
+    @property
+    def version(self) -> int:
+        return self.dedup.version
+
+    @version.setter
+    def version(self, version: int):
+        self.dedup.version = version
+        for aggregates in self.aggregates.values():
+            aggregates.version = version
+
+    # -----------------------
+    # Manifest
+    # -----------------------
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def manifest(self) -> Optional[dict]:
+        if not self.manifest_path.exists():
+            return None
+        return json.loads(self.manifest_path.read_text())
+
+    def _source_state(self, offset: int, rows: int) -> dict:
+        path = self.data_dir / SPECS["events"].path
+        with open(path, "rb") as f:
+            header = f.readline()
+        return {"path": str(path), "offset": offset, "rows": rows, "header": header.decode("utf-8-sig").strip()}
+
+    def _rebuild_reason(self, manifest: dict) -> Optional[str]:
+        if manifest.get("window") != self.freq:
+            return "window changed"
+        state = manifest["source"]
+        if state is None:
+            return None
+        path = self.data_dir / SPECS["events"].path
+        if state["path"] != str(path) or path.stat().st_size < state["offset"]:
+            return f"{SPECS['events'].path} was replaced or truncated"
+        if self._source_state(0, 0)["header"] != state["header"]:
+            return f"{SPECS['events'].path} header changed"
+        return None
+
+    def commit(self, source: Optional[dict] = None) -> dict:
+        """Persist the state as the next version, then drop files it no longer references."""
+        previous = self.manifest()
+        manifest = {
+            "version": self.version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "window": self.freq,
+            "source": source if source is not None else (previous or {}).get("source"),
+            "dedup": self.dedup.save(),
+            "aggregates": {id_col: aggregates.save() for id_col, aggregates in self.aggregates.items()},
+            "totals": self.totals,
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / ".manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.manifest_path)
+
+        live = {self.dedup.root: self.dedup.files(),
+                **{aggregates.root: aggregates.files() for aggregates in self.aggregates.values()}}
+        for directory, files in live.items():
+            for path in directory.glob("*") if directory.exists() else ():
+                if path.name not in files:
+                    path.unlink()
+        self.version += 1
+        return manifest
+
+    # -----------------------
+    # Ingest
+    # -----------------------
+    def ingest(self, events: pd.DataFrame) -> np.ndarray:
+        """
+        Fold a batch of clean events (``event_id``, ``timestamp``, ``is_failure``,
+        ``device_id`` / ``interface_id``) into the aggregates; returns each
+        event's status (ACCEPTED, DUPLICATE or TOO_LATE).
+        """
+        ids = events["event_id"].to_numpy(dtype=np.int64)
+        buckets = events["timestamp"].to_numpy().astype("datetime64[ns]").astype(np.int64) // self.window_ns
+        watermark = self.dedup.watermark
+        status = self.dedup.check(ids, buckets)
+        accepted = status == ACCEPTED
+
+        windows = buckets[accepted] * self.window_ns
+        failures = events["is_failure"].to_numpy(dtype=np.int64)[accepted]
+        for id_col, aggregates in self.aggregates.items():
+            if id_col not in events.columns:
+                continue
+            entity = events[id_col].to_numpy(dtype=float, na_value=np.nan)[accepted]
+            present = ~np.isnan(entity)
+            if not present.any():
+                continue
+            delta = (
+                pd.DataFrame({id_col: entity[present].astype(np.int64), "window": windows[present],
+                              "is_failure": failures[present]})
+                .groupby([id_col, "window"], sort=False)
+                .agg(total_events=("is_failure", "size"), failure_events=("is_failure", "sum"))
+                .reset_index()
+            )
+            self.totals["rows_recomputed"] += aggregates.apply(delta)
+
+        self.totals["accepted"] += int(accepted.sum())
+        self.totals["duplicates"] += int((status == DUPLICATE).sum())
+        self.totals["too_late"] += int((status == TOO_LATE).sum())
+        if watermark is not None:
+            self.totals["late"] += int((accepted & (buckets < watermark)).sum())
+        return status
+
+    @timed("event_ingest.update")
+    def update(self, full: bool = False, batch_events: int = BATCH_EVENTS) -> dict:
+        """Ingest the events appended to the raw CSV since the last commit, oldest first, and commit."""
+        manifest = self.manifest()
+        reason = "forced" if full else "no ingest state yet" if manifest is None else self._rebuild_reason(manifest)
+        if reason:
+            logger.info(f"Full ingest: {reason}")
+            self.reset()
+            source = {"offset": 0, "rows": 0}
+        else:
+            source = manifest["source"] or {"offset": 0, "rows": 0}
+
+        before = dict(self.totals)
+        with stage("event_ingest.read") as s:
+            raw, end = read_table_range(SPECS["events"], self.data_dir, start=source["offset"], first_row=source["rows"])
+            events = clean_events(raw.rename(columns={"event_timestamp": "timestamp"}))
+            events = events.sort_values("timestamp", kind="stable", ignore_index=True)
+            self.totals["invalid"] += len(raw) - len(events)
+            s.rows = len(raw)
+        if not len(raw) and not reason:
+            return {name: 0 for name in self.totals}
+        with stage("event_ingest.fold", rows=len(events)):
+            for start in range(0, len(events), batch_events):
+                self.ingest(events.iloc[start:start + batch_events])
+        self.commit(self._source_state(end, source["rows"] + len(raw)))
+
+        summary = {name: self.totals[name] - before.get(name, 0) for name in self.totals}
+        if summary["duplicates"] or summary["too_late"]:
+            logger.warning(f"Dropped {summary['duplicates']} duplicate and {summary['too_late']} too-late events")
+        logger.info(f"Ingest v{self.version - 1}: {summary}, dedup memory {self.dedup.memory_bytes()}")
+        return summary
+
+    def export_csv(self):
+        """Rewrite ``aggregated_device_<freq>.csv`` / ``aggregated_interface_<freq>.csv`` for CSV consumers."""
+        save_outputs(self.aggregates["device_id"].frame(), self.aggregates["interface_id"].frame(), self.freq)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate appended events and fold them into the window aggregates.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--full", action="store_true", help="re-ingest every event from scratch")
+    parser.add_argument("--no-export", action="store_true",
+                        help="skip rewriting aggregated_device / aggregated_interface CSVs under data/processed")
+    args = parser.parse_args()
+
+    ingestor = EventIngestor(data_dir=args.data_dir)
+    ingestor.update(full=args.full)
+    if not args.no_export:
+        ingestor.export_csv()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# src/health/health_queries.py
+
+import heapq
+from operator import itemgetter
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+# -----------------------
+# Dict-based queries (object graph path)
+# -----------------------
+def lowest_k(scores: Dict[Hashable, float], k: int = 5) -> List[Tuple[Hashable, float]]:
+    """Return the ``k`` worst ``(entity_id, score)`` pairs in O(n log k)."""
+    return heapq.nsmallest(k, scores.items(), key=itemgetter(1))
+
+
+def highest_k(scores: Dict[Hashable, float], k: int = 5) -> List[Tuple[Hashable, float]]:
+    """Return the ``k`` best ``(entity_id, score)`` pairs in O(n log k)."""
+    return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+
+# -----------------------
+# Array-based queries (DataFrame path)
+# -----------------------
+def _partial_order(values: np.ndarray, k: int, largest: bool) -> np.ndarray:
+    """
+    Positions of the k smallest (or largest) values, sorted, via a partition.
+    Ties keep their original order, as in ``sort_values(kind="stable").head(k)``.
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    keys = -values if largest else values
+    if k < n:
+        kth = np.partition(keys, k - 1)[k - 1]
+        below = np.flatnonzero(keys < kth)
+        candidates = np.sort(np.r_[below, np.flatnonzero(keys == kth)[:k - len(below)]])
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(keys[candidates], kind="stable")]
+
+
+def lowest_k_series(series, k: int = 5):
+    """Return the ``k`` smallest values of a pandas Series without a full sort."""
+    values = series.to_numpy(dtype=float, na_value=np.inf)
+    return series.iloc[_partial_order(values, k, largest=False)]
+
+
+def highest_k_series(series, k: int = 5):
+    """Return the ``k`` largest values of a pandas Series without a full sort."""
+    values = series.to_numpy(dtype=float, na_value=-np.inf)
+    return series.iloc[_partial_order(values, k, largest=True)]
+
+
+def latest_per_entity(df, id_col: str, value_col: str = "health_score", time_col: str = "timestamp"):
+    """
+    Latest ``value_col`` per entity, indexed by ``id_col``.
+
+    Uses a groupby-idxmax (linear) rather than sorting the whole frame by time.
+    """
+    latest = df.loc[df.groupby(id_col)[time_col].idxmax(), [id_col, value_col]]
+    return latest.set_index(id_col)[value_col]
+
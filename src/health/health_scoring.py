@@ -3,7 +3,7 @@
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # -----------------------
 # Repo root & paths
@@ -21,26 +21,38 @@ logger = get_logger("health_scoring")
 # -----------------------
 from transformation.relational_model import Device, Interface, Event
 from transformation.load_relational_data import load_all_data
+from health.event_index import EventIndex
+from health.rules import get_rules
+from health.health_queries import lowest_k, lowest_k_series
+from health.rollup import HealthRollup
 
 # -----------------------
 # Constants
 # -----------------------
-MAX_SCORE = 100
-MIN_SCORE = 0
+RULES = get_rules()  # compiled from config.yaml
+MAX_SCORE = RULES.max_score
+MIN_SCORE = RULES.min_score
 
 # -----------------------
 # Health scoring functions
 # -----------------------
+def health_from_counts(failure_events: int, total_events: int) -> float:
+    """Convert failure/total event counts into a 0-100 health score."""
+    if not total_events:
+        return MAX_SCORE
+    health_score = MAX_SCORE - (failure_events / total_events * MAX_SCORE)
+    return RULES.clamp(health_score)
+
+
 def calculate_device_health(device: Device, events: List[Event]) -> float:
     """Compute a simple health score for a device based on its events."""
     func_name = "calculate_device_health"
     if not events:
         return MAX_SCORE
     total_events = len(events)
-    failure_events = sum(1 for e in events if e.event_type.lower() in ["error", "failure", "down"])
-    health_score = MAX_SCORE - (failure_events / total_events * MAX_SCORE)
-    logger.debug(f"{func_name} | Device {device.device_id}: {failure_events}/{total_events} failure events")
-    return max(MIN_SCORE, min(MAX_SCORE, health_score))
+    failure_events = sum(1 for e in events if RULES.is_failure(e.event_type, "device"))
+    logger.debug("%s | Device %s: %s/%s failure events", func_name, device.device_id, failure_events, total_events)
+    return health_from_counts(failure_events, total_events)
 
 
 def calculate_interface_health(interface: Interface, events: List[Event]) -> float:
@@ -49,39 +61,59 @@ def calculate_interface_health(interface: Interface, events: List[Event]) -> flo
     if not events:
         return MAX_SCORE
     total_events = len(events)
-    down_events = sum(1 for e in events if e.event_type.lower() in ["down", "link_down", "error"])
-    health_score = MAX_SCORE - (down_events / total_events * MAX_SCORE)
-    logger.debug(f"{func_name} | Interface {interface.interface_id}: {down_events}/{total_events} down events")
-    return max(MIN_SCORE, min(MAX_SCORE, health_score))
+    down_events = sum(1 for e in events if RULES.is_failure(e.event_type, "interface"))
+    logger.debug("%s | Interface %s: %s/%s down events", func_name, interface.interface_id, down_events, total_events)
+    return health_from_counts(down_events, total_events)
 
 
-def score_all_devices(devices: Dict[int, Device], events: Dict[int, Event]) -> Dict[int, float]:
-    """Compute health scores for all devices."""
+def score_all_devices(devices: Dict[int, Device], events: Dict[int, Event],
+                      index: Optional[EventIndex] = None) -> Dict[int, float]:
+    """Compute health scores for all devices from the shared event index."""
     func_name = "score_all_devices"
-    device_scores = {}
-    device_events_map: Dict[int, List[Event]] = {}
-    for e in events.values():
-        device_events_map.setdefault(e.device.device_id, []).append(e)
-
-    for device_id, device in devices.items():
-        device_scores[device_id] = calculate_device_health(device, device_events_map.get(device_id, []))
+    if index is None:
+        index = EventIndex.build(events)
+    device_scores = {
+        device_id: health_from_counts(*index.device_counts(device_id))
+        for device_id in devices
+    }
     logger.info(f"{func_name} | Scored {len(device_scores)} devices")
     return device_scores
 
 
-def score_all_interfaces(interfaces: Dict[int, Interface], events: Dict[int, Event]) -> Dict[int, float]:
-    """Compute health scores for all interfaces."""
+def score_all_interfaces(interfaces: Dict[int, Interface], events: Dict[int, Event],
+                         index: Optional[EventIndex] = None) -> Dict[int, float]:
+    """Compute health scores for all interfaces from the shared event index."""
     func_name = "score_all_interfaces"
-    interface_scores = {}
-    interface_events_map: Dict[int, List[Event]] = {}
-    for e in events.values():
-        if e.interface:
-            interface_events_map.setdefault(e.interface.interface_id, []).append(e)
-
-    for interface_id, interface in interfaces.items():
-        interface_scores[interface_id] = calculate_interface_health(
-            interface, interface_events_map.get(interface_id, [])
-        )
+    if index is None:
+        index = EventIndex.build(events)
+    interface_scores = {
+        interface_id: health_from_counts(*index.interface_counts(interface_id))
+        for interface_id in interfaces
+    }
+    logger.info(f"{func_name} | Scored {len(interface_scores)} interfaces")
+    return interface_scores
+
+
+def score_all_devices_decayed(devices: Dict[int, Device], index: EventIndex,
+                              at: Optional[datetime] = None) -> Dict[int, float]:
+    """Time-decayed device health as of ``at`` (default: latest indexed event)."""
+    func_name = "score_all_devices_decayed"
+    if index.device_decay is None:
+        raise ValueError("EventIndex was built without decay=True")
+    at = at or index.latest_event_time
+    device_scores = {device_id: index.device_decay.score(device_id, at) for device_id in devices}
+    logger.info(f"{func_name} | Scored {len(device_scores)} devices")
+    return device_scores
+
+
+def score_all_interfaces_decayed(interfaces: Dict[int, Interface], index: EventIndex,
+                                 at: Optional[datetime] = None) -> Dict[int, float]:
+    """Time-decayed interface health as of ``at`` (default: latest indexed event)."""
+    func_name = "score_all_interfaces_decayed"
+    if index.interface_decay is None:
+        raise ValueError("EventIndex was built without decay=True")
+    at = at or index.latest_event_time
+    interface_scores = {interface_id: index.interface_decay.score(interface_id, at) for interface_id in interfaces}
     logger.info(f"{func_name} | Scored {len(interface_scores)} interfaces")
     return interface_scores
 
@@ -90,25 +122,38 @@ def print_health_summary(
     device_scores: Dict[int, float],
     interface_scores: Dict[int, float],
     devices: Dict[int, Device],
-    interfaces: Dict[int, Interface]
+    interfaces: Dict[int, Interface],
+    index: Optional[EventIndex] = None
 ):
-    """Log a summary of health scores."""
+    """Log a summary of health scores (and event counters when an index is given)."""
     func_name = "print_health_summary"
     avg_device_health = sum(device_scores.values()) / len(device_scores) if device_scores else 0
     avg_interface_health = sum(interface_scores.values()) / len(interface_scores) if interface_scores else 0
 
     logger.info(f"{func_name} | Devices scored: {len(device_scores)} | Avg health: {avg_device_health:.2f}")
     logger.info(f"{func_name} | Interfaces scored: {len(interface_scores)} | Avg health: {avg_interface_health:.2f}")
+    if index is not None:
+        logger.info(
+            f"{func_name} | Events indexed: {index.total_events} | "
+            f"Device failure events: {sum(index.device_failures.values())} | "
+            f"Interface failure events: {sum(index.interface_failures.values())}"
+        )
 
     logger.info(f"{func_name} | Top 5 lowest device health:")
-    for device_id in sorted(device_scores, key=device_scores.get)[:5]:
+    for device_id, _ in lowest_k(device_scores, 5):
         d = devices[device_id]
-        logger.info(f"{func_name} | Device {d.device_id} ({d.device_ip}): Health {device_scores[device_id]:.2f}")
+        counts = ""
+        if index is not None:
+            counts = " ({}/{} failure events)".format(*index.device_counts(device_id))
+        logger.info(f"{func_name} | Device {d.device_id} ({d.device_ip}): Health {device_scores[device_id]:.2f}{counts}")
 
     logger.info(f"{func_name} | Top 5 lowest interface health:")
-    for interface_id in sorted(interface_scores, key=interface_scores.get)[:5]:
+    for interface_id, _ in lowest_k(interface_scores, 5):
         i = interfaces[interface_id]
-        logger.info(f"{func_name} | Interface {i.interface_id} ({i.interface_name}): Health {interface_scores[interface_id]:.2f}")
+        counts = ""
+        if index is not None:
+            counts = " ({}/{} down events)".format(*index.interface_counts(interface_id))
+        logger.info(f"{func_name} | Interface {i.interface_id} ({i.interface_name}): Health {interface_scores[interface_id]:.2f}{counts}")
 
 
 # -----------------------
@@ -123,11 +168,29 @@ if __name__ == "__main__":
     interfaces = db.get("interfaces", {})
     events = db.get("events", {})
 
+    # Index events once, shared by both scorers and the summary
+    index = EventIndex.build(events, decay=True)
+
     # Compute health scores
-    device_scores = score_all_devices(devices, events)
-    interface_scores = score_all_interfaces(interfaces, events)
+    device_scores = score_all_devices(devices, events, index)
+    interface_scores = score_all_interfaces(interfaces, events, index)
+
+    # Time-decayed scores (recent failures weigh more than old ones)
+    decayed_device_scores = score_all_devices_decayed(devices, index)
+    decayed_interface_scores = score_all_interfaces_decayed(interfaces, index)
+    if decayed_device_scores and decayed_interface_scores:
+        avg_decayed_device = sum(decayed_device_scores.values()) / len(decayed_device_scores)
+        avg_decayed_interface = sum(decayed_interface_scores.values()) / len(decayed_interface_scores)
+        logger.info(f"Avg decayed health | devices: {avg_decayed_device:.2f} | interfaces: {avg_decayed_interface:.2f}")
 
     # Log summary
-    print_health_summary(device_scores, interface_scores, devices, interfaces)
+    print_health_summary(device_scores, interface_scores, devices, interfaces, index)
+
+    # Roll device/interface health up to assets, organizations and countries
+    rollup = HealthRollup.from_relational(db)
+    rollup.set_health("device", device_scores, rollup=False)
+    rollup.set_health("interface", interface_scores, rollup=False)
+    rollup.set_leaf("device", "failure_events", index.device_failures)
+    logger.info("Lowest avg device health by country:\n" + str(lowest_k_series(rollup.avg_health("country"), 5)))
 
     logger.info("Health scoring pipeline complete.")
\ No newline at end of file
@@ -0,0 +1,186 @@
+# src/health/rollup.py
+
+from typing import Dict, Hashable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Hierarchy
+# -----------------------
+LEVELS = ("interface", "device", "asset", "organization", "country")
+UNKNOWN_COUNTRY = "Unknown"
+
+# Entity counters seeded at their own level (rolled up like any other metric)
+COUNT_METRICS = {
+    "interface": "interfaces",
+    "device": "devices",
+    "asset": "assets",
+    "organization": "organizations",
+}
+
+
+class HealthRollup:
+    """
+    Aggregates leaf metrics up interface -> device -> asset -> organization -> country.
+
+    Each level holds its entity ids in positional order plus a parent-position
+    array into the next level (-1 for orphans). ``rollup`` recomputes every
+    total with one ``np.bincount`` per metric per level; ``update`` applies a
+    single leaf change by walking its ancestor chain, O(depth).
+    """
+
+    def __init__(self, ids: Mapping[str, Sequence[Hashable]], parents: Mapping[str, np.ndarray]):
+        self.ids: Dict[str, pd.Index] = {level: pd.Index(ids.get(level, [])) for level in LEVELS}
+        self.parents: Dict[str, np.ndarray] = {
+            level: np.asarray(parents.get(level, np.full(len(self.ids[level]), -1)), dtype=np.int64)
+            for level in LEVELS[:-1]
+        }
+        self._leaf: Dict[str, Dict[str, np.ndarray]] = {level: {} for level in LEVELS}
+        self._totals: Dict[str, Dict[str, np.ndarray]] = {level: {} for level in LEVELS}
+        for level, name in COUNT_METRICS.items():
+            self.set_leaf(level, name, np.ones(len(self.ids[level])), rollup=False)
+        self.rollup()
+
+    # -----------------------
+    # Builders
+    # -----------------------
+    @staticmethod
+    def _positions(index: pd.Index, parent_ids) -> np.ndarray:
+        return index.get_indexer(pd.Index(parent_ids)).astype(np.int64)
+
+    @classmethod
+    def from_frames(cls, orgs: pd.DataFrame, assets: pd.DataFrame, devices: pd.DataFrame,
+                    interfaces: Optional[pd.DataFrame] = None,
+                    country_col: str = "country") -> "HealthRollup":
+        """Build the hierarchy from the raw CSV frames used by the dashboard."""
+        interfaces = interfaces if interfaces is not None else pd.DataFrame(columns=["interface_id", "device_id"])
+        countries = orgs[country_col].fillna(UNKNOWN_COUNTRY) if country_col in orgs.columns \
+            else pd.Series(UNKNOWN_COUNTRY, index=orgs.index)
+
+        ids = {
+            "interface": interfaces["interface_id"].to_numpy(),
+            "device": devices["device_id"].to_numpy(),
+            "asset": assets["asset_id"].to_numpy(),
+            "organization": orgs["organization_id"].to_numpy(),
+            "country": pd.unique(countries.to_numpy()),
+        }
+        index = {level: pd.Index(values) for level, values in ids.items()}
+        parents = {
+            "interface": cls._positions(index["device"], interfaces["device_id"]),
+            "device": cls._positions(index["asset"], devices["asset_id"]),
+            "asset": cls._positions(index["organization"], assets["organization_id"]),
+            "organization": cls._positions(index["country"], countries),
+        }
+        return cls(ids, parents)
+
+    @classmethod
+    def from_relational(cls, db: dict) -> "HealthRollup":
+        """Build the hierarchy from the object graph returned by ``load_all_data``."""
+        interfaces, devices = db.get("interfaces", {}), db.get("devices", {})
+        assets, organizations = db.get("assets", {}), db.get("organizations", {})
+
+        def parent_id(obj, attr, key):
+            parent = getattr(obj, attr, None)
+            return getattr(parent, key, None) if parent is not None else None
+
+        countries = [org.org_country or UNKNOWN_COUNTRY for org in organizations.values()]
+        ids = {
+            "interface": list(interfaces),
+            "device": list(devices),
+            "asset": list(assets),
+            "organization": list(organizations),
+            "country": list(dict.fromkeys(countries)),
+        }
+        index = {level: pd.Index(values) for level, values in ids.items()}
+        parents = {
+            "interface": cls._positions(index["device"],
+                                        [parent_id(i, "device", "device_id") for i in interfaces.values()]),
+            "device": cls._positions(index["asset"],
+                                     [parent_id(d, "asset", "asset_id") for d in devices.values()]),
+            "asset": cls._positions(index["organization"],
+                                    [parent_id(a, "organization", "organization_id") for a in assets.values()]),
+            "organization": cls._positions(index["country"], countries),
+        }
+        return cls(ids, parents)
+
+    # -----------------------
+    # Leaf metrics
+    # -----------------------
+    def set_leaf(self, level: str, name: str, values, rollup: bool = True):
+        """Set a metric for every entity of ``level`` (positional order, or a dict/Series keyed by id)."""
+        if isinstance(values, (dict, pd.Series)):
+            values = pd.Series(values, dtype=float).reindex(self.ids[level], fill_value=0.0).to_numpy()
+        self._leaf[level][name] = np.asarray(values, dtype=float).copy()
+        if rollup:
+            self.rollup()
+
+    def set_health(self, level: str, scores, rollup: bool = True):
+        """Set per-entity health scores for ``level`` (rolled up as ``<level>_health_sum``)."""
+        self.set_leaf(level, f"{level}_health_sum", scores, rollup=rollup)
+
+    def rollup(self):
+        """Recompute all totals in one bottom-up pass."""
+        names = list(dict.fromkeys(name for level in LEVELS for name in self._leaf[level]))
+        carried: Dict[str, np.ndarray] = {}
+        for depth, level in enumerate(LEVELS):
+            n = len(self.ids[level])
+            totals = {}
+            for name in names:
+                total = np.zeros(n)
+                if name in carried:
+                    total += carried[name]
+                if name in self._leaf[level]:
+                    total += self._leaf[level][name]
+                totals[name] = total
+            self._totals[level] = totals
+
+            if depth + 1 < len(LEVELS):
+                parent = self.parents[level]
+                valid = parent >= 0
+                n_parent = len(self.ids[LEVELS[depth + 1]])
+                carried = {
+                    name: np.bincount(parent[valid], weights=total[valid], minlength=n_parent)
+                    for name, total in totals.items()
+                }
+
+    def update(self, level: str, entity_id: Hashable, name: str, value: float):
+        """Change one leaf value and propagate the delta to its ancestors."""
+        pos = self.ids[level].get_loc(entity_id)
+        leaf = self._leaf[level].setdefault(name, np.zeros(len(self.ids[level])))
+        if name not in self._totals[level]:
+            for lvl in LEVELS:
+                self._totals[lvl].setdefault(name, np.zeros(len(self.ids[lvl])))
+        delta = value - leaf[pos]
+        leaf[pos] = value
+
+        depth = LEVELS.index(level)
+        while pos >= 0:
+            self._totals[LEVELS[depth]][name][pos] += delta
+            if depth + 1 >= len(LEVELS):
+                break
+            pos = self.parents[LEVELS[depth]][pos]
+            depth += 1
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    def totals(self, level: str, name: str) -> pd.Series:
+        return pd.Series(self._totals[level][name], index=self.ids[level], name=name)
+
+    def mean(self, level: str, sum_name: str, count_name: str) -> pd.Series:
+        """Ratio of two rolled-up metrics (e.g. summed device health / devices)."""
+        totals = self._totals[level]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = totals[sum_name] / totals[count_name]
+        return pd.Series(values, index=self.ids[level], name=sum_name)
+
+    def avg_health(self, level: str, of: str = "device") -> pd.Series:
+        """Mean health of the ``of`` entities under each node of ``level``."""
+        return self.mean(level, f"{of}_health_sum", COUNT_METRICS[of]).rename(f"avg_{of}_health")
+
+    def frame(self, level: str) -> pd.DataFrame:
+        """All rolled-up metrics of a level as a DataFrame indexed by entity id."""
+        df = pd.DataFrame(self._totals[level], index=self.ids[level])
+        df.index.name = level
+        return df
@@ -0,0 +1,149 @@
+# src/health/rules.py
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.config import get_section
+
+# -----------------------
+# Defaults (used when config.yaml has no health section)
+# -----------------------
+DEFAULT_RULES = {
+    "max_score": 100,
+    "min_score": 0,
+    "failure_types": {
+        "device": ["error", "failure", "down"],
+        "interface": ["down", "link_down", "error"],
+        "window": ["error", "failure", "down", "link_down"],
+    },
+    "penalties": {
+        "high_cpu": 5,
+        "high_memory": 0,
+        "interface_down": 5,
+        "critical_error": 10,
+    },
+    "status_thresholds": {
+        "Healthy": 80,
+        "Warning": 50,
+        "Critical": 0,
+    },
+    "decay": {
+        "half_life_hours": 24,
+        "failure_penalty": 10,
+    },
+}
+
+
+def _normalize(event_type) -> str:
+    return str(event_type).strip().lower() if event_type is not None else ""
+
+
+# -----------------------
+# Rule engine
+# -----------------------
+class HealthRules:
+    """
+    Health scoring rules compiled once into lookup tables.
+
+    Scalar helpers serve the object-graph path (``health_scoring``); the
+    ``*_series`` helpers serve the DataFrame paths and evaluate each rule only
+    on the distinct values of a column, then broadcast the result back.
+    """
+
+    def __init__(self,
+                 failure_types: Mapping[str, Iterable[str]],
+                 penalties: Mapping[str, float],
+                 status_thresholds: Mapping[str, float],
+                 max_score: float = 100,
+                 min_score: float = 0,
+                 decay: Optional[Mapping[str, float]] = None):
+        self.max_score = max_score
+        self.min_score = min_score
+        decay = {**DEFAULT_RULES["decay"], **(decay or {})}
+        self.decay_half_life_hours = float(decay["half_life_hours"])
+        self.decay_failure_penalty = float(decay["failure_penalty"])
+        self._failure_types: Dict[str, frozenset] = {
+            kind: frozenset(_normalize(t) for t in types) for kind, types in failure_types.items()
+        }
+        self.penalties: Dict[str, float] = {_normalize(t): float(p) for t, p in penalties.items()}
+
+        # Status bands sorted ascending by threshold for bisect / searchsorted
+        bands = sorted(status_thresholds.items(), key=lambda item: item[1])
+        self._band_thresholds = np.array([threshold for _, threshold in bands], dtype=float)
+        self._band_statuses = [status for status, _ in bands]
+        self.statuses = list(reversed(self._band_statuses))  # best first
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "HealthRules":
+        """Build rules from a ``health`` config section, falling back to defaults per key."""
+        config = config or {}
+        merged = {key: config.get(key, default) for key, default in DEFAULT_RULES.items()}
+        return cls(**merged)
+
+    # -----------------------
+    # Object-graph path
+    # -----------------------
+    def failure_types(self, kind: str) -> frozenset:
+        """Normalized failure event types for ``device``, ``interface`` or ``window``."""
+        return self._failure_types.get(kind, frozenset())
+
+    def is_failure(self, event_type, kind: str) -> bool:
+        return _normalize(event_type) in self.failure_types(kind)
+
+    def penalty(self, event_type) -> float:
+        return self.penalties.get(_normalize(event_type), 0.0)
+
+    def clamp(self, score: float) -> float:
+        return max(self.min_score, min(self.max_score, score))
+
+    def classify(self, score: float) -> str:
+        """Map a score onto its status band."""
+        pos = bisect_right(self._band_thresholds, score) - 1
+        return self._band_statuses[max(pos, 0)]
+
+    # -----------------------
+    # DataFrame path
+    # -----------------------
+    @staticmethod
+    def _map_distinct(series: pd.Series, lookup, dtype) -> np.ndarray:
+        """Apply ``lookup`` to each distinct value of ``series`` and broadcast back."""
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        values = np.array([lookup(u) for u in uniques], dtype=dtype)
+        out = np.zeros(len(series), dtype=dtype)
+        valid = codes >= 0
+        out[valid] = values[codes[valid]]
+        return out
+
+    def failure_mask(self, event_types: pd.Series, kind: str) -> np.ndarray:
+        """Boolean array marking failure events of ``kind``."""
+        failures = self.failure_types(kind)
+        return self._map_distinct(event_types, lambda t: _normalize(t) in failures, bool)
+
+    def penalty_series(self, event_types: pd.Series) -> np.ndarray:
+        """Per-event penalty points."""
+        return self._map_distinct(event_types, self.penalty, float)
+
+    def clamp_series(self, scores) -> np.ndarray:
+        return np.clip(np.asarray(scores, dtype=float), self.min_score, self.max_score)
+
+    def classify_series(self, scores) -> np.ndarray:
+        """Vectorized ``classify`` over an array of scores."""
+        pos = np.searchsorted(self._band_thresholds, np.asarray(scores, dtype=float), side="right") - 1
+        return np.asarray(self._band_statuses, dtype=object)[np.maximum(pos, 0)]
+
+    def status_counts(self, statuses: Iterable[str]) -> Dict[str, int]:
+        """Count statuses, always including every configured band."""
+        counts = {status: 0 for status in self.statuses}
+        values, n = np.unique(np.asarray(statuses, dtype=object), return_counts=True)
+        counts.update(zip(values.tolist(), n.tolist()))
+        return counts
+
+
+@lru_cache(maxsize=None)
+def get_rules() -> HealthRules:
+    """Process-wide rules compiled from the ``health`` section of config.yaml."""
+    return HealthRules.from_config(get_section("health"))
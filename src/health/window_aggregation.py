@@ -1,6 +1,5 @@
 # src/health/window_aggregation.py
 
-import sys
 from pathlib import Path
 from typing import Tuple, Optional
 import pandas as pd
@@ -9,12 +8,15 @@ import pandas as pd
 # Path setup
 # -----------------------
 REPO_ROOT = Path(__file__).resolve().parents[2]  # repo root
-sys.path.append(str(REPO_ROOT / "src"))  # so we can import utils
 
 # -----------------------
 # Logger
 # -----------------------
 from utils.logger import get_logger
+from utils.metrics import stage
+from health.health_queries import latest_per_entity, lowest_k_series
+from health.rules import get_rules
+from health.decay import decayed_health_score
 
 logger = get_logger("window_aggregation")
 
@@ -26,8 +28,6 @@ OUTPUT_DIR = REPO_ROOT / "data" / "processed"
 WINDOW_FREQ = "1h"   # Options: '1h', '6h', '1D'
 MAX_ROWS = None      # None = full CSV, or set for testing (e.g., 10000)
 
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 # ------------------------
 # Load and prepare data
 # ------------------------
@@ -43,6 +43,10 @@ def load_events(csv_path: Path, max_rows: Optional[int] = None) -> pd.DataFrame:
     if df.empty:
         logger.warning("Loaded dataframe is empty.")
 
+    return drop_duplicate_events(clean_events(df))
+
+def clean_events(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse timestamps and ids, drop unusable rows and flag failure events."""
     df.columns = df.columns.str.strip()
 
     if "event_timestamp" in df.columns:
@@ -52,56 +56,66 @@ def load_events(csv_path: Path, max_rows: Optional[int] = None) -> pd.DataFrame:
         logger.error("Missing required column: 'timestamp'")
         raise ValueError("Missing required column: 'timestamp'")
 
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True).dt.tz_localize(None)
     df = df.dropna(subset=["timestamp"])
 
     df["event_id"] = pd.to_numeric(df.get("event_id", 1), errors="coerce")
+    missing_ids = int(df["event_id"].isna().sum())
+    if missing_ids:
+        logger.warning(f"Dropped {missing_ids} events without an event_id")
+        df = df.dropna(subset=["event_id"])
+    for id_col in ("device_id", "interface_id"):
+        if id_col in df.columns:
+            df[id_col] = pd.to_numeric(df[id_col], errors="coerce")
     df["event_type"] = df.get("event_type", "").fillna("").astype(str).str.lower()
 
-    FAILURE_TYPES = {"error", "failure", "down", "link_down"}
-    df["is_failure"] = df["event_type"].isin(FAILURE_TYPES).astype(int)
+    df["is_failure"] = get_rules().failure_mask(df["event_type"], "window").astype(int)
 
     return df
 
+def drop_duplicate_events(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep the first row of each ``event_id`` (redelivered events are counted once)."""
+    duplicated = df["event_id"].duplicated(keep="first")
+    if duplicated.any():
+        logger.warning(f"Dropped {int(duplicated.sum())} duplicate events")
+        df = df.loc[~duplicated]
+    return df
+
 # ------------------------
 # Aggregation
 # ------------------------
 def compute_health_score(df: pd.DataFrame) -> pd.Series:
+    rules = get_rules()
     ratio = df["failure_events"] / df["total_events"]
     ratio = ratio.fillna(0)
-    health = 100 - (ratio * 100)
-    return health.clip(0, 100)
+    health = rules.max_score - (ratio * rules.max_score)
+    return health.clip(rules.min_score, rules.max_score)
+
+def aggregate_entity(df: pd.DataFrame, id_col: str, freq: str) -> pd.DataFrame:
+    """Per-``id_col`` windowed event counts with ratio and decayed health scores."""
+    agg = pd.DataFrame()
+    if id_col in df.columns:
+        df_entity = df.dropna(subset=[id_col])
+        if not df_entity.empty:
+            agg = (
+                df_entity
+                .groupby([id_col, pd.Grouper(key="timestamp", freq=freq)])
+                .agg(total_events=("event_id", "count"),
+                     failure_events=("is_failure", "sum"))
+                .reset_index()
+            )
+            agg["health_score"] = compute_health_score(agg)
+            agg["decayed_health_score"] = decayed_health_score(agg, id_col)
+    return agg
 
 def aggregate_events_vectorized(df: pd.DataFrame, freq: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
     logger.info(f"Aggregating events with frequency: {freq}")
 
     # Device aggregation
-    device_agg = pd.DataFrame()
-    if "device_id" in df.columns:
-        df_device = df.dropna(subset=["device_id"])
-        if not df_device.empty:
-            device_agg = (
-                df_device
-                .groupby(["device_id", pd.Grouper(key="timestamp", freq=freq)])
-                .agg(total_events=("event_id", "count"),
-                     failure_events=("is_failure", "sum"))
-                .reset_index()
-            )
-            device_agg["health_score"] = compute_health_score(device_agg)
+    device_agg = aggregate_entity(df, "device_id", freq)
 
     # Interface aggregation
-    interface_agg = pd.DataFrame()
-    if "interface_id" in df.columns:
-        df_interface = df.dropna(subset=["interface_id"])
-        if not df_interface.empty:
-            interface_agg = (
-                df_interface
-                .groupby(["interface_id", pd.Grouper(key="timestamp", freq=freq)])
-                .agg(total_events=("event_id", "count"),
-                     failure_events=("is_failure", "sum"))
-                .reset_index()
-            )
-            interface_agg["health_score"] = compute_health_score(interface_agg)
+    interface_agg = aggregate_entity(df, "interface_id", freq)
 
     return device_agg, interface_agg
 
@@ -113,6 +127,7 @@ def aggregate_events_vectorized(df: pd.DataFrame, freq: str) -> Tuple[pd.DataFra
 # ------------------------
 def save_outputs(device_agg: pd.DataFrame, interface_agg: pd.DataFrame, freq: str):
     freq_label = freq.replace(" ", "").lower()
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     device_path = OUTPUT_DIR / f"aggregated_device_{freq_label}.csv"
     interface_path = OUTPUT_DIR / f"aggregated_interface_{freq_label}.csv"
@@ -129,36 +144,30 @@ def save_outputs(device_agg: pd.DataFrame, interface_agg: pd.DataFrame, freq: st
 # Main
 # ------------------------
 def main():
-    df_events = load_events(EVENTS_CSV, max_rows=MAX_ROWS)
+    with stage("window_aggregation.load_events") as s:
+        df_events = load_events(EVENTS_CSV, max_rows=MAX_ROWS)
+        s.rows = len(df_events)
 
-    device_agg, interface_agg = aggregate_events_vectorized(df_events, WINDOW_FREQ)
+    with stage("window_aggregation.aggregate", rows=len(df_events)) as s:
+        device_agg, interface_agg = aggregate_events_vectorized(df_events, WINDOW_FREQ)
+        s.extra["output_rows"] = len(device_agg) + len(interface_agg)
 
     if not device_agg.empty:
         logger.info("Device Health Summary (Lowest 5):")
         logger.info(
-            "\n" + str(
-                device_agg.sort_values("timestamp")
-                          .groupby("device_id")["health_score"]
-                          .last()
-                          .sort_values()
-                          .head(5)
-            )
+            "\n" + str(lowest_k_series(latest_per_entity(device_agg, "device_id"), 5))
         )
 
     if not interface_agg.empty:
         logger.info("Interface Health Summary (Lowest 5):")
         logger.info(
-            "\n" + str(
-                interface_agg.sort_values("timestamp")
-                             .groupby("interface_id")["health_score"]
-                             .last()
-                             .sort_values()
-                             .head(5)
-            )
+            "\n" + str(lowest_k_series(latest_per_entity(interface_agg, "interface_id"), 5))
         )
 
     logger.info(f"Aggregation complete! Device rows: {len(device_agg)}, Interface rows: {len(interface_agg)}")
-    save_outputs(device_agg, interface_agg, WINDOW_FREQ)
+    with stage("window_aggregation.save_outputs", rows=len(device_agg) + len(interface_agg)):
+        save_outputs(device_agg, interface_agg, WINDOW_FREQ)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with stage("window_aggregation"):
+        main()
\ No newline at end of file
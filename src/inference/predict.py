@@ -1,23 +1,22 @@
 # src/inference/predict.py
 
-import sys
 from pathlib import Path
-import pandas as pd
 
 # -----------------------
-# Set up paths
+# Paths
 # -----------------------
 REPO_ROOT = Path(__file__).resolve().parents[2]
-MODELS_PATH = REPO_ROOT / "src" / "models"
-sys.path.append(str(REPO_ROOT))
-sys.path.append(str(MODELS_PATH))  # so we can import failure_prediction.py
 
-from failure_prediction import FailurePredictionModel
+from features.feature_engineering import FEATURE_COLS
+from features.feature_matrix import load_features
+from models.failure_prediction import load_latest_model
+from models import sharded
 
 # -----------------------
 # Logger
 # -----------------------
-from src.utils.logger import get_logger
+from utils.logger import get_logger
+from utils.metrics import stage, timed
 logger = get_logger("predict")
 
 # -----------------------
@@ -30,35 +29,40 @@ OUTPUT_PREDICTIONS_PATH = REPO_ROOT / "data" / "processed" / "device" / "device_
 # -----------------------
 # Inference
 # -----------------------
+@timed("predict")
 def main():
     logger.info("Starting device failure prediction inference...")
 
-    # Load model
-    model = FailurePredictionModel()
-    if not MODEL_PATH.exists():
-        logger.warning(f"Model file not found at {MODEL_PATH}")
-        logger.warning("Please run train.py first.")
+    # Load model (registry first, legacy pickle as fallback)
+    use_shards = sharded.sharding_enabled()
+    model = sharded.load_latest_sharded_model() if use_shards else load_latest_model(MODEL_PATH)
+    if model is None:
         return
-    model.load_model(MODEL_PATH)
 
-    # Load input features
-    if not INPUT_FEATURES_PATH.exists():
+    # Load input features (float32 matrix, memory-mapped when the features stage persisted it)
+    matrix = load_features(INPUT_FEATURES_PATH, FEATURE_COLS)
+    if matrix is None:
         logger.warning(f"Input feature file not found at {INPUT_FEATURES_PATH}")
         logger.warning("Please run feature_engineering_simple.py first.")
         return
-
-    df = pd.read_csv(INPUT_FEATURES_PATH)
-    X = df.drop(columns=["target", "timestamp", "device_id"], errors='ignore')
+    matrix.schema.check(model.feature_columns)
+    X = matrix.X
     logger.info(f"Loaded input features: {X.shape[0]} rows, {X.shape[1]} columns")
 
     # Predict failures
-    preds, probs = model.predict(X)
+    with stage("predict.score", rows=len(X)):
+        if use_shards:
+            preds, probs = model.predict(X, sharded.device_classes(matrix.keys["device_id"]))
+        else:
+            preds, probs = model.predict(X)
+    df = matrix.to_frame()
     df["predicted_failure"] = preds
     df["failure_probability"] = probs
 
     # Save predictions
     OUTPUT_PREDICTIONS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(OUTPUT_PREDICTIONS_PATH, index=False)
+    with stage("predict.save", rows=len(df)):
+        df.to_csv(OUTPUT_PREDICTIONS_PATH, index=False)
     logger.info(f"Predictions saved to: {OUTPUT_PREDICTIONS_PATH}")
     logger.info("Inference complete.")
 
@@ -0,0 +1,352 @@
+# src/models/anomaly_detection.py
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# -----------------------
+# Logger
+# -----------------------
+from utils.logger import get_logger
+logger = get_logger("anomaly_detection")
+
+# -----------------------
+# Configurable paths
+# -----------------------
+AGGREGATED_DEVICE_PATH = REPO_ROOT / "data" / "processed" / "aggregated_device_1h.csv"
+AGGREGATED_INTERFACE_PATH = REPO_ROOT / "data" / "processed" / "aggregated_interface_1h.csv"
+DEVICES_SNAPSHOT_PATH = REPO_ROOT / "data" / "processed" / "devices_snapshot.csv"
+INTERFACES_PATH = REPO_ROOT / "data" / "processed" / "interface" / "interfaces.csv"
+ANOMALY_OUTPUT_DIR = REPO_ROOT / "data" / "processed" / "anomaly"
+METRICS = ("total_events", "failure_events")
+UNKNOWN_CLASS = -1
+
+
+# -----------------------
+# Streaming (online) detection
+# -----------------------
+class StreamingAnomalyDetector:
+    """
+    Online per-device anomaly detection over windowed event counts.
+
+    Keeps an exponentially weighted mean and variance per device and metric
+    (constant memory per device). Each call to ``update`` scores one window for
+    all devices present in it with array operations, then folds the window into
+    the statistics. Devices absent from a window are left untouched.
+    """
+
+    def __init__(self, metrics: Sequence[str] = METRICS, alpha: float = 0.1,
+                 z_threshold: float = 4.0, warmup: int = 5, min_std: float = 0.5,
+                 two_sided: bool = False):
+        self.metrics = list(metrics)
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self.two_sided = two_sided
+
+        self._size = 0
+        self._index = pd.Index(np.empty(0, dtype=np.int64))  # device_id -> row, via get_indexer
+        self._device_ids = np.empty(0, dtype=np.int64)
+        self._mean = np.zeros((0, len(self.metrics)))
+        self._var = np.zeros((0, len(self.metrics)))
+        self._count = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def device_ids(self) -> np.ndarray:
+        return self._device_ids[:self._size]
+
+    def _reserve(self, capacity: int):
+        """Grow state arrays geometrically so new devices cost amortized O(1)."""
+        if capacity <= len(self._count):
+            return
+        capacity = max(capacity, 2 * len(self._count))
+        for name in ("_device_ids", "_mean", "_var", "_count"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def _positions(self, device_ids: np.ndarray) -> np.ndarray:
+        """Row of each device in the state arrays, allocating rows for new devices."""
+        device_ids = np.asarray(device_ids, dtype=np.int64)
+        pos = self._index.get_indexer(device_ids)
+        new_ids = np.unique(device_ids[pos < 0])
+        if len(new_ids):
+            start = self._size
+            self._reserve(start + len(new_ids))
+            self._device_ids[start:start + len(new_ids)] = new_ids
+            self._size += len(new_ids)
+            self._index = self._index.append(pd.Index(new_ids))
+            pos = self._index.get_indexer(device_ids)
+        return pos
+
+    def update(self, device_ids, values) -> dict:
+        """
+        Score one window and fold it into the running statistics.
+
+        ``device_ids`` must be unique within the window; ``values`` has one
+        column per metric. Returns z-scores (n, metrics) and an anomaly flag per row.
+        """
+        values = np.asarray(values, dtype=float).reshape(len(device_ids), len(self.metrics))
+        pos = self._positions(device_ids)
+        mean, var, count = self._mean[pos], self._var[pos], self._count[pos]
+
+        # The EWMA variance starts at 0 and underestimates for early windows;
+        # rescale by the weight it has accumulated so far (bias correction)
+        weight = 1.0 - (1.0 - self.alpha) ** np.maximum(count - 1, 1)
+        # Counts are at least Poisson-noisy, so never trust a std below sqrt(mean)
+        floor = np.maximum(np.maximum(mean, 0.0), self.min_std ** 2)
+        std = np.sqrt(np.maximum(var / weight[:, None], floor))
+        z = (values - mean) / std
+        exceeded = np.abs(z) > self.z_threshold if self.two_sided else z > self.z_threshold
+        is_anomaly = (count >= self.warmup) & exceeded.any(axis=1)
+
+        # Incremental EWMA mean/variance; the first observation seeds the mean
+        first = count == 0
+        diff = values - mean
+        incr = self.alpha * diff
+        new_mean = np.where(first[:, None], values, mean + incr)
+        new_var = np.where(first[:, None], 0.0, (1 - self.alpha) * (var + diff * incr))
+
+        self._mean[pos], self._var[pos], self._count[pos] = new_mean, new_var, count + 1
+        return {"z": np.where(first[:, None], 0.0, z), "is_anomaly": is_anomaly}
+
+    def update_frame(self, window: pd.DataFrame, id_col: str = "device_id") -> pd.DataFrame:
+        """``update`` for a DataFrame holding one window; returns it with z-scores and flags."""
+        result = self.update(window[id_col].to_numpy(), window[self.metrics].to_numpy())
+        out = window.copy()
+        for i, metric in enumerate(self.metrics):
+            out[f"z_{metric}"] = result["z"][:, i]
+        out["is_anomaly"] = result["is_anomaly"]
+        return out
+
+    def state_frame(self) -> pd.DataFrame:
+        """Current per-device statistics."""
+        n = self._size
+        df = pd.DataFrame({"device_id": self.device_ids, "windows_seen": self._count[:n]})
+        for i, metric in enumerate(self.metrics):
+            df[f"mean_{metric}"] = self._mean[:n, i]
+            df[f"std_{metric}"] = np.sqrt(self._var[:n, i])
+        return df
+
+
+def replay(agg: pd.DataFrame, detector: Optional[StreamingAnomalyDetector] = None,
+           id_col: str = "device_id") -> pd.DataFrame:
+    """Feed an aggregated history through a streaming detector window by window."""
+    detector = detector or StreamingAnomalyDetector()
+    agg = agg.sort_values("timestamp", kind="stable")
+    scored = [detector.update_frame(window, id_col) for _, window in agg.groupby("timestamp", sort=False)]
+    return pd.concat(scored) if scored else agg.assign(is_anomaly=False)
+
+
+# -----------------------
+# Batch (backfill) scoring
+# -----------------------
+def attach_device_class(agg: pd.DataFrame, id_col: str = "device_id") -> pd.DataFrame:
+    """Add ``device_class_id`` to an aggregate (via interfaces.csv for interface aggregates)."""
+    classes = pd.read_csv(DEVICES_SNAPSHOT_PATH, usecols=["device_id", "device_class_id"])
+    class_by_device = classes.set_index("device_id")["device_class_id"]
+
+    device_ids = agg[id_col]
+    if id_col == "interface_id":
+        interfaces = pd.read_csv(INTERFACES_PATH, usecols=["interface_id", "device_id"])
+        device_ids = device_ids.map(interfaces.set_index("interface_id")["device_id"])
+
+    out = agg.copy()
+    out["device_class_id"] = device_ids.map(class_by_device).fillna(UNKNOWN_CLASS).astype(np.int64)
+    return out
+
+
+def window_features(df: pd.DataFrame) -> np.ndarray:
+    """Per-window model inputs: log counts and failure rate."""
+    total = df["total_events"].to_numpy(dtype=float)
+    failures = df["failure_events"].to_numpy(dtype=float)
+    rate = np.divide(failures, total, out=np.zeros_like(total), where=total > 0)
+    return np.column_stack([np.log1p(total), np.log1p(failures), rate])
+
+
+def _robust_chunk(features, class_pos, medians, scales):
+    """Max upper-tail robust z over features, looked up per row's class."""
+    return ((features - medians[class_pos]) / scales[class_pos]).max(axis=1)
+
+
+def _isolation_chunk(features, classes, models):
+    scores = np.zeros(len(features))
+    for cls in np.unique(classes):
+        rows = classes == cls
+        scores[rows] = -models[cls].score_samples(features[rows])
+    return scores
+
+
+class BatchAnomalyScorer:
+    """
+    Backfills anomaly scores over an aggregated history with one model per
+    device class.
+
+    ``method="robust"`` fits a per-class median / MAD on the window features
+    (one vectorized groupby) and scores rows as the largest robust z-score.
+    ``method="isolation_forest"`` fits a scikit-learn IsolationForest per class
+    on a bounded sample. Classes with fewer than ``min_class_rows`` windows fall
+    back to a fleet-wide model. Scoring runs over fixed-size row chunks in
+    parallel, so runtime grows linearly with rows.
+    """
+
+    def __init__(self, method: str = "robust", z_threshold: float = 6.0,
+                 contamination: float = 0.01, min_class_rows: int = 100,
+                 chunk_size: int = 500_000, n_jobs: int = -1,
+                 max_fit_rows: int = 100_000, random_state: int = 42):
+        if method not in ("robust", "isolation_forest"):
+            raise ValueError(f"Unknown method: {method}")
+        self.method = method
+        self.z_threshold = z_threshold
+        self.contamination = contamination
+        self.min_class_rows = min_class_rows
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.max_fit_rows = max_fit_rows
+        self.random_state = random_state
+        self.classes_ = None
+        self.threshold_ = None
+
+    def _class_positions(self, classes: np.ndarray) -> np.ndarray:
+        """Map device_class_id to model row; unseen/small classes -> fleet-wide row 0."""
+        pos = self.classes_.get_indexer(classes) + 1
+        return np.where(pos > 0, pos, 0)
+
+    def fit(self, df: pd.DataFrame) -> "BatchAnomalyScorer":
+        features = window_features(df)
+        classes = df["device_class_id"].to_numpy()
+        sizes = pd.Series(classes).value_counts()
+        self.classes_ = pd.Index(sorted(sizes[sizes >= self.min_class_rows].index))
+
+        if self.method == "robust":
+            frame = pd.DataFrame(features)
+            frame["cls"] = self._class_positions(classes)
+            global_median = frame.drop(columns="cls").median()
+            medians = frame.groupby("cls").median().reindex(range(len(self.classes_) + 1))
+            medians.iloc[0] = global_median
+            abs_dev = (frame.drop(columns="cls") - medians.to_numpy()[frame["cls"]]).abs()
+            abs_dev["cls"] = frame["cls"]
+            global_abs_dev = (frame.drop(columns="cls") - global_median).abs()
+            mads = abs_dev.groupby("cls").median().reindex(range(len(self.classes_) + 1))
+            mads.iloc[0] = global_abs_dev.median()
+            mean_abs = abs_dev.groupby("cls").mean().reindex(range(len(self.classes_) + 1))
+            mean_abs.iloc[0] = global_abs_dev.mean()
+            self.medians_ = medians.to_numpy()
+            # 1.4826 * MAD estimates sigma; sparse count features often have MAD == 0,
+            # in which case fall back to 1.2533 * mean absolute deviation
+            scales = np.where(mads.to_numpy() > 0, 1.4826 * mads.to_numpy(), 1.2533 * mean_abs.to_numpy())
+            self.scales_ = np.maximum(np.nan_to_num(scales), 1e-3)
+            self.threshold_ = self.z_threshold
+        else:
+            from sklearn.ensemble import IsolationForest
+
+            rng = np.random.default_rng(self.random_state)
+            pos = self._class_positions(classes)
+            self.models_ = {}
+            for cls in range(len(self.classes_) + 1):
+                rows = np.arange(len(features)) if cls == 0 else np.flatnonzero(pos == cls)
+                if len(rows) > self.max_fit_rows:
+                    rows = rng.choice(rows, self.max_fit_rows, replace=False)
+                self.models_[cls] = IsolationForest(
+                    contamination=self.contamination, random_state=self.random_state
+                ).fit(features[rows])
+            # score_samples is higher-is-normal; offset_ is the fitted decision boundary
+            self.threshold_ = {cls: -m.offset_ for cls, m in self.models_.items()}
+
+        logger.info(f"Fitted {self.method} anomaly models for {len(self.classes_)} device classes "
+                    f"(+ fleet-wide fallback) on {len(df)} windows")
+        return self
+
+    def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return ``df`` with ``anomaly_score`` and ``is_anomaly`` columns."""
+        from joblib import Parallel, delayed
+
+        features = window_features(df)
+        pos = self._class_positions(df["device_class_id"].to_numpy())
+        bounds = range(0, len(df), self.chunk_size)
+
+        if self.method == "robust":
+            # numpy releases the GIL, so threads avoid copying chunks to workers
+            parts = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+                delayed(_robust_chunk)(features[i:i + self.chunk_size], pos[i:i + self.chunk_size],
+                                       self.medians_, self.scales_)
+                for i in bounds
+            )
+            scores = np.concatenate(parts) if parts else np.empty(0)
+            thresholds = np.full(len(scores), self.threshold_)
+        else:
+            parts = Parallel(n_jobs=self.n_jobs)(
+                delayed(_isolation_chunk)(features[i:i + self.chunk_size], pos[i:i + self.chunk_size],
+                                          self.models_)
+                for i in bounds
+            )
+            scores = np.concatenate(parts) if parts else np.empty(0)
+            thresholds = pd.Series(pos).map(self.threshold_).to_numpy()
+
+        out = df.copy()
+        out["anomaly_score"] = scores
+        out["is_anomaly"] = scores > thresholds
+        return out
+
+
+def backfill(entity: str = "device", method: str = "robust", n_jobs: int = -1) -> Optional[Path]:
+    """Score a full aggregated history and write it to the processed Parquet store."""
+    id_col = f"{entity}_id"
+    path = AGGREGATED_DEVICE_PATH if entity == "device" else AGGREGATED_INTERFACE_PATH
+    if not path.exists():
+        logger.warning(f"Aggregated {entity} file not found at {path}")
+        logger.warning("Please run window_aggregation.py first.")
+        return None
+
+    agg = attach_device_class(pd.read_csv(path, parse_dates=["timestamp"]), id_col)
+    scorer = BatchAnomalyScorer(method=method, n_jobs=n_jobs).fit(agg)
+    scored = scorer.score(agg)
+
+    ANOMALY_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = ANOMALY_OUTPUT_DIR / f"{entity}_anomalies_{method}.parquet"
+    scored.to_parquet(output_path, index=False)
+    logger.info(f"Flagged {int(scored['is_anomaly'].sum())} of {len(scored)} {entity} windows "
+                f"-> {output_path}")
+    return output_path
+
+
+# -----------------------
+# Main execution
+# -----------------------
+def main():
+    logger.info("Starting streaming anomaly detection replay...")
+    if not AGGREGATED_DEVICE_PATH.exists():
+        logger.warning(f"Aggregated device file not found at {AGGREGATED_DEVICE_PATH}")
+        logger.warning("Please run window_aggregation.py first.")
+        return
+
+    agg = pd.read_csv(AGGREGATED_DEVICE_PATH, parse_dates=["timestamp"])
+    scored = replay(agg)
+    anomalies = scored[scored["is_anomaly"]]
+    logger.info(f"Scored {len(scored)} device windows, flagged {len(anomalies)} anomalies")
+    if not anomalies.empty:
+        logger.info("\n" + str(anomalies.nlargest(5, "z_total_events")))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Device/interface anomaly detection")
+    parser.add_argument("--mode", choices=["stream", "batch"], default="stream")
+    parser.add_argument("--entity", choices=["device", "interface"], default="device")
+    parser.add_argument("--method", choices=["robust", "isolation_forest"], default="robust")
+    args = parser.parse_args()
+
+    if args.mode == "batch":
+        backfill(args.entity, args.method)
+    else:
+        main()
@@ -0,0 +1,235 @@
+# src/models/backtest.py
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from features.feature_engineering import FEATURE_COLS
+from features.feature_matrix import FEATURE_MATRIX_DIR, load_features
+from models.binary_metrics import binary_metrics, precision_recall_f1
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+
+logger = get_logger("backtest")
+
+# -----------------------
+# Configurable paths
+# -----------------------
+PROCESSED_DATA_PATH = REPO_ROOT / "data" / "processed" / "device" / "device_features.csv"
+RESULTS_PATH = REPO_ROOT / "data" / "processed" / "backtest" / "backtest_results.parquet"
+
+
+# -----------------------
+# Models (chosen by name so worker processes can build them)
+# -----------------------
+def make_model(kind: str, y_train: np.ndarray):
+    if kind == "xgboost":
+        from models.failure_prediction import default_classifier
+        model = default_classifier(n_jobs=1)
+        model.scale_pos_weight = (len(y_train) - y_train.sum()) / max(y_train.sum(), 1)
+        return model
+    if kind == "forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=100, max_depth=8, class_weight="balanced",
+                                      n_jobs=1, random_state=42)
+    raise ValueError(f"Unknown backtest model: {kind}")
+
+
+# -----------------------
+# Cut-points
+# -----------------------
+def cut_points(timestamps: np.ndarray, step: str, min_train_fraction: float = 0.2,
+               max_cuts: Optional[int] = None) -> np.ndarray:
+    """Every ``step`` from the point where ``min_train_fraction`` of rows are history to the last window."""
+    times = np.sort(np.asarray(timestamps, dtype="datetime64[ns]"))
+    start = pd.Timestamp(times[int(len(times) * min_train_fraction)]).ceil(step)
+    cuts = pd.date_range(start, pd.Timestamp(times[-1]), freq=step).to_numpy()
+    if max_cuts and len(cuts) > max_cuts:
+        cuts = cuts[-max_cuts:]
+    return cuts
+
+
+def label_times(keys: dict) -> np.ndarray:
+    """
+    When each row's target becomes known: the timestamp of the device's next
+    window, which the ``shift(-1)`` target is read from and which can lie
+    arbitrarily far ahead. Rows without a next window are labelled 0 from
+    their own window, so their label time is their own timestamp.
+    """
+    ts = pd.Series(np.asarray(keys["timestamp"], dtype="datetime64[ns]"))
+    if "device_id" not in keys:
+        return ts.to_numpy()
+    frame = pd.DataFrame({"device_id": np.asarray(keys["device_id"]), "timestamp": ts})
+    following = frame.sort_values(["device_id", "timestamp"], kind="stable").groupby("device_id")["timestamp"].shift(-1)
+    return following.sort_index().fillna(ts).to_numpy()
+
+
+# -----------------------
+# Worker side (time-sorted arrays are memory-mapped once per process)
+# -----------------------
+_arrays = {}
+
+
+def _init_worker(directory: str):
+    for name in ("X", "y", "timestamp", "label_time"):
+        _arrays[name] = np.load(Path(directory) / f"{name}.npy", mmap_mode="r")
+
+
+def _run_cuts(task):
+    """Fit once at the first cut of the group, then score every cut in it."""
+    cuts, horizon, train_window, embargo, kind, threshold = task
+    ts, X, y = _arrays["timestamp"], _arrays["X"], _arrays["y"]
+    fit_cut = np.datetime64(cuts[0], "ns")
+    lo = np.searchsorted(ts, fit_cut - train_window) if train_window is not None else 0
+    hi = np.searchsorted(ts, fit_cut - embargo)
+    known = np.asarray(_arrays["label_time"][lo:hi]) < fit_cut
+    if known.all():
+        X_train, y_train = X[lo:hi], np.asarray(y[lo:hi])   # contiguous slices of the mapped arrays
+    else:
+        X_train, y_train = X[lo:hi][known], np.asarray(y[lo:hi])[known]
+
+    model, fit_seconds = None, 0.0
+    if len(np.unique(y_train)) == 2:
+        started = time.perf_counter()
+        model = make_model(kind, y_train)
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - started
+
+    rows = []
+    for cut in cuts:
+        cut = np.datetime64(cut, "ns")
+        test_lo, test_hi = np.searchsorted(ts, cut), np.searchsorted(ts, cut + horizon)
+        row = {"cut": cut, "fit_cut": fit_cut, "train_rows": len(y_train), "test_rows": int(test_hi - test_lo)}
+        if model is None or test_hi == test_lo:
+            rows.append({**row, "status": "skipped"})
+            continue
+        probs = model.predict_proba(X[test_lo:test_hi])[:, 1]
+        y_test = np.asarray(y[test_lo:test_hi])
+        rows.append({**row, "status": "ok", "positives": int(y_test.sum()), "fit_seconds": fit_seconds,
+                     **binary_metrics(y_test, probs, threshold)})
+        fit_seconds = 0.0                        # charged to the first cut of the group only
+    return rows
+
+
+# -----------------------
+# Harness
+# -----------------------
+@timed("backtest", rows=len)
+def run_backtest(matrix, step: str = "24h", horizon: str = "1h", train_window: Optional[str] = None,
+                 embargo: str = "1h", model: str = "xgboost", threshold: float = 0.5,
+                 workers: Optional[int] = None, max_cuts: Optional[int] = None,
+                 refit_every: int = 1) -> pd.DataFrame:
+    """
+    Walk-forward backtest: at each cut-point T, score rows in ``[T, T + horizon)``
+    with a model fit on rows in ``[F - train_window, F - embargo)`` (all history
+    when no window), where F is T itself or, with ``refit_every`` > 1, the first
+    cut of T's group of consecutive cuts. Training rows whose target is read
+    from a window at or past F (see ``label_times``) are masked out; the
+    embargo only adds a further gap. One result row per cut-point.
+    """
+    order = np.argsort(matrix.keys["timestamp"], kind="stable")
+    cuts = cut_points(matrix.keys["timestamp"], step, max_cuts=max_cuts)
+    workers = min(workers or os.cpu_count() or 1, max(len(cuts), 1))
+    logger.info(f"Backtesting {len(cuts)} cut-points every {step}, refit every {refit_every} "
+                f"({model}, {workers} workers)")
+
+    scratch = Path(tempfile.mkdtemp(prefix="backtest-"))
+    try:
+        # Time-sorted copies, written once and shared by every worker through the page cache
+        with stage("backtest.sort", rows=len(order)):
+            np.save(scratch / "X.npy", np.ascontiguousarray(matrix.X[order]))
+            np.save(scratch / "y.npy", np.asarray(matrix.y)[order])
+            np.save(scratch / "timestamp.npy", np.asarray(matrix.keys["timestamp"], dtype="datetime64[ns]")[order])
+            np.save(scratch / "label_time.npy", label_times(matrix.keys)[order])
+
+        to_delta = lambda value: np.timedelta64(pd.Timedelta(value).value, "ns") if value else None
+        tasks = [(cuts[i:i + refit_every], to_delta(horizon), to_delta(train_window),
+                  to_delta(embargo) or np.timedelta64(0, "ns"), model, threshold)
+                 for i in range(0, len(cuts), refit_every)]
+        # spawn: forking a process that already runs pyarrow / BLAS threads can deadlock the workers
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(scratch),),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            groups = pool.map(_run_cuts, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+            rows = [row for group in groups for row in group]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return compact(pd.DataFrame(rows))
+
+
+def compact(results: pd.DataFrame) -> pd.DataFrame:
+    """Narrow dtypes for the stored table (one row per cut-point)."""
+    results = results.copy()
+    results["status"] = results["status"].astype("category")
+    for column in ("train_rows", "test_rows", "positives", "tp", "fp", "fn", "tn"):
+        if column in results:
+            results[column] = results[column].fillna(0).astype(np.int32)
+    for column in ("fit_seconds", "precision", "recall", "f1_score", "accuracy", "roc_auc"):
+        if column in results:
+            results[column] = results[column].astype(np.float32)
+    return results
+
+
+def summarize(results: pd.DataFrame) -> dict:
+    """Pooled counts across cut-points plus the per-cut medians."""
+    ok = results[results["status"] == "ok"]
+    if ok.empty:
+        return {"cuts": len(results), "scored_cuts": 0}
+    tp, fp, fn = (int(ok[c].sum()) for c in ("tp", "fp", "fn"))
+    precision, recall, f1 = precision_recall_f1(tp, fp, fn)
+    return {
+        "cuts": len(results),
+        "scored_cuts": len(ok),
+        "pooled_precision": float(precision),
+        "pooled_recall": float(recall),
+        "pooled_f1": float(f1),
+        "median_f1": float(ok["f1_score"].median()),
+        "mean_roc_auc": float(ok["roc_auc"].mean()),
+        "fit_seconds": float(ok["fit_seconds"].sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the failure prediction model.")
+    parser.add_argument("--step", default="24h", help="spacing between cut-points (pandas offset)")
+    parser.add_argument("--horizon", default="1h", help="scored window after each cut-point")
+    parser.add_argument("--train-window", default=None, help="rolling training window (default: all history)")
+    parser.add_argument("--embargo", default="1h", help="gap between training rows and the cut-point")
+    parser.add_argument("--model", choices=["xgboost", "forest"], default="xgboost")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-cuts", type=int, default=None, help="keep only the most recent N cut-points")
+    parser.add_argument("--refit-every", type=int, default=1,
+                        help="fit one model per N consecutive cut-points (e.g. 24 with --step 1h)")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    matrix = load_features(PROCESSED_DATA_PATH, FEATURE_COLS, FEATURE_MATRIX_DIR)
+    if matrix is None or matrix.y is None or "timestamp" not in matrix.keys:
+        logger.warning("No labeled feature data available. Please run the features stage first.")
+        return
+
+    results = run_backtest(matrix, step=args.step, horizon=args.horizon, train_window=args.train_window,
+                           embargo=args.embargo, model=args.model, threshold=args.threshold,
+                           workers=args.workers, max_cuts=args.max_cuts, refit_every=args.refit_every)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    results.to_parquet(args.output, index=False)
+    logger.info(f"Backtest results ({len(results)} cut-points) saved to: {args.output}")
+    logger.info(f"Backtest summary: {summarize(results)}")
+
+
+if __name__ == "__main__":
+    # Run through the importable module so worker processes can unpickle _run_cuts
+    from models.backtest import main as backtest_main
+    backtest_main()
@@ -0,0 +1,74 @@
+# src/models/binary_metrics.py
+
+import numpy as np
+
+# -----------------------
+# Vectorized binary-classification metrics
+# -----------------------
+# NumPy equivalents of the sklearn metrics the models report, computed from
+# one sort / bincount instead of Python loops, so scoring thousands of
+# backtest cut-points or a full threshold sweep stays cheap.
+
+
+def confusion_counts(y_true, y_pred):
+    """(tp, fp, fn, tn) for 0/1 labels and predictions."""
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    tn, fp, fn, tp = np.bincount(y_true * 2 + y_pred, minlength=4)[:4]
+    return int(tp), int(fp), int(fn), int(tn)
+
+
+def precision_recall_f1(tp, fp, fn):
+    """Element-wise precision, recall and F1 (0 where undefined, like sklearn's zero_division=0)."""
+    tp, fp, fn = (np.asarray(v, dtype=np.float64) for v in (tp, fp, fn))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    return precision, recall, f1
+
+
+def roc_auc(y_true, scores) -> float:
+    """ROC AUC via the rank-sum statistic (ties averaged); NaN when only one class is present."""
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.asarray(scores)
+    positives = int(y_true.sum())
+    negatives = len(y_true) - positives
+    if positives == 0 or negatives == 0:
+        return float("nan")
+    order = np.argsort(scores, kind="mergesort")
+    _, inverse, counts = np.unique(scores[order], return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    ranks = (ends - (counts - 1) / 2.0)[inverse]     # 1-based average rank of each sorted score
+    rank_sum = ranks[y_true[order]].sum()
+    return float((rank_sum - positives * (positives + 1) / 2.0) / (positives * negatives))
+
+
+def threshold_curve(y_true, scores, thresholds):
+    """
+    Precision, recall and F1 at every threshold (predict 1 when ``score >= t``),
+    from one descending sort and cumulative positive counts.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.asarray(scores)
+    order = np.argsort(-scores, kind="mergesort")
+    sorted_scores = -scores[order]
+    true_pos = np.concatenate([[0], np.cumsum(y_true[order])])
+    predicted = np.searchsorted(sorted_scores, -np.asarray(thresholds), side="right")
+    tp = true_pos[predicted]
+    fp = predicted - tp
+    fn = int(y_true.sum()) - tp
+    return precision_recall_f1(tp, fp, fn)
+
+
+def binary_metrics(y_true, scores, threshold: float) -> dict:
+    """Counts, precision/recall/F1/accuracy at ``threshold`` and ROC AUC."""
+    tp, fp, fn, tn = confusion_counts(y_true, np.asarray(scores) >= threshold)
+    precision, recall, f1 = precision_recall_f1(tp, fp, fn)
+    total = tp + fp + fn + tn
+    return {
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": float(precision), "recall": float(recall), "f1_score": float(f1),
+        "accuracy": (tp + tn) / total if total else float("nan"),
+        "roc_auc": roc_auc(y_true, scores),
+    }
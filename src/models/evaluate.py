@@ -1,23 +1,18 @@
 # src/models/evaluate.py
 
-import sys
 from pathlib import Path
-import pandas as pd
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
-import matplotlib.pyplot as plt
-from failure_prediction import FailurePredictionModel
 import numpy as np
+from features.feature_engineering import FEATURE_COLS
+from features.feature_matrix import load_features
+from models.binary_metrics import binary_metrics, threshold_curve
+from models.failure_prediction import load_latest_model
 
-# -----------------------
-# Add repo root to sys.path
-# -----------------------
 REPO_ROOT = Path(__file__).resolve().parents[2]
-sys.path.append(str(REPO_ROOT))
 
 # -----------------------
 # Logger
 # -----------------------
-from src.utils.logger import get_logger
+from utils.logger import get_logger
 logger = get_logger("evaluate")
 
 # -----------------------
@@ -26,65 +21,79 @@ logger = get_logger("evaluate")
 PROCESSED_DATA_PATH = REPO_ROOT / "data" / "processed" / "device" / "device_features.csv"
 MODEL_PATH = REPO_ROOT / "models" / "failure_model_xgb.pkl"
 
-def plot_f1_vs_threshold(y_true, y_probs, best_threshold):
+PLOT_PATH = REPO_ROOT / "reports" / "f1_vs_threshold.png"
+
+def plot_f1_vs_threshold(y_true, y_probs, best_threshold, path=PLOT_PATH, show=False):
+    """Save the F1 curve to ``path``; only opens a window (and blocks) when ``show``."""
     thresholds = np.arange(0.0, 1.0, 0.01)
-    f1_scores = [f1_score(y_true, (y_probs >= t).astype(int)) for t in thresholds]
-    
-    plt.figure(figsize=(8,5))
-    plt.plot(thresholds, f1_scores, color='darkorange', label='F1-score')
-    plt.axvline(best_threshold, color='blue', linestyle='--', label=f'Best threshold: {best_threshold:.2f}')
-    plt.xlabel("Probability Threshold")
-    plt.ylabel("F1-score")
-    plt.title("F1-score vs Probability Threshold")
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-    logger.info("F1-score vs threshold plot displayed")
-
-def main():
+    _, _, f1_scores = threshold_curve(y_true, y_probs, thresholds)
+
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(8,5))
+    else:
+        from matplotlib.figure import Figure  # no GUI backend, never blocks
+        fig = Figure(figsize=(8,5))
+    ax = fig.add_subplot()
+    ax.plot(thresholds, f1_scores, color='darkorange', label='F1-score')
+    ax.axvline(best_threshold, color='blue', linestyle='--', label=f'Best threshold: {best_threshold:.2f}')
+    ax.set_xlabel("Probability Threshold")
+    ax.set_ylabel("F1-score")
+    ax.set_title("F1-score vs Probability Threshold")
+    ax.grid(True)
+    ax.legend()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path)
+    logger.info(f"F1-score vs threshold plot saved to: {path}")
+    if show:
+        plt.show()
+
+def main(show=False):
     logger.info("Starting model evaluation...")
 
-    # Load features
-    if not PROCESSED_DATA_PATH.exists():
+    # Load features (float32 matrix, memory-mapped when the features stage persisted it)
+    matrix = load_features(PROCESSED_DATA_PATH, FEATURE_COLS)
+    if matrix is None:
         logger.warning(f"Feature file not found at {PROCESSED_DATA_PATH}")
         logger.warning("Please run feature_engineering_simple.py first.")
         return
-
-    df = pd.read_csv(PROCESSED_DATA_PATH)
-    if 'target' not in df.columns:
+    if matrix.y is None:
         logger.warning("Target column not found in features.")
         return
 
-    X = df.drop(columns=["target", "timestamp", "device_id"], errors='ignore')
-    y = df["target"]
-    logger.info(f"Loaded feature data with {len(df)} rows and {len(X.columns)} columns")
+    X, y = matrix.X, matrix.y
+    logger.info(f"Loaded feature data with {len(matrix)} rows and {len(matrix.columns)} columns")
 
-    # Load trained model
-    if not MODEL_PATH.exists():
-        logger.warning(f"Model not found at {MODEL_PATH}")
-        logger.warning("Please run train.py first.")
+    # Load trained model (registry keeps the tuned threshold; legacy pickle falls back to 0.5)
+    model = load_latest_model(MODEL_PATH)
+    if model is None:
         return
-
-    model = FailurePredictionModel()
-    model.load_model(MODEL_PATH)
+    matrix.schema.check(model.feature_columns)
 
     # Predict probabilities and labels
-    y_probs = model.model.predict_proba(X)[:, 1]
-    y_pred = (y_probs >= model.best_threshold).astype(int)
+    _, y_probs = model.predict(X)
 
     # Metrics
+    scores = binary_metrics(y, y_probs, model.best_threshold)
     metrics = {
-        "accuracy": accuracy_score(y, y_pred),
-        "f1_score": f1_score(y, y_pred),
-        "roc_auc": roc_auc_score(y, y_probs),
+        "accuracy": scores["accuracy"],
+        "f1_score": scores["f1_score"],
+        "roc_auc": scores["roc_auc"],
         "threshold": model.best_threshold
     }
     logger.info(f"Evaluation metrics on full dataset: {metrics}")
 
     # Plot F1 vs threshold
-    plot_f1_vs_threshold(y, y_probs, model.best_threshold)
+    try:
+        plot_f1_vs_threshold(y, y_probs, model.best_threshold, show=show)
+    except ImportError:
+        logger.warning("matplotlib not installed; skipping the F1-score vs threshold plot")
 
     logger.info("Evaluation complete.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate the trained failure model on the feature set.")
+    parser.add_argument("--show", action="store_true", help="also open the F1 plot in a window (blocks)")
+    main(show=parser.parse_args().show)
\ No newline at end of file
@@ -1,28 +1,24 @@
 # src/models/failure_prediction.py
 
-import sys
 from pathlib import Path
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
-import joblib
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-from xgboost import XGBClassifier
 from warnings import filterwarnings
 filterwarnings('ignore')
 
-# -----------------------
-# Add repo root to sys.path
-# -----------------------
+# sklearn, xgboost, joblib and matplotlib are imported where they are used, so
+# loading a saved model for inference does not pay for the training stack.
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
-sys.path.append(str(REPO_ROOT))
 
 # -----------------------
 # Logger
 # -----------------------
-from src.utils.logger import get_logger
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+from features.feature_engineering import FEATURE_COLS
+from features.feature_matrix import FEATURE_MATRIX_DIR, load_features
 logger = get_logger("failure_prediction")
 
 # -----------------------
@@ -30,51 +26,63 @@ logger = get_logger("failure_prediction")
 # -----------------------
 PROCESSED_DATA_PATH = REPO_ROOT / "data" / "processed" / "device" / "device_features.csv"
 MODEL_SAVE_PATH = REPO_ROOT / "models" / "failure_model_xgb.pkl"
+REGISTRY_NAME = "failure_model"
+TRAIN_PLOT_PATH = REPO_ROOT / "reports" / "f1_vs_threshold_train.png"
+
+def default_classifier(n_jobs=None):
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(
+        n_estimators=200,
+        max_depth=5,
+        learning_rate=0.1,
+        random_state=42,
+        use_label_encoder=False,
+        eval_metric='logloss',
+        scale_pos_weight=1,
+        n_jobs=n_jobs
+    )
+
 
 class FailurePredictionModel:
     def __init__(self, model=None):
-        self.model = model if model else XGBClassifier(
-            n_estimators=200,
-            max_depth=5,
-            learning_rate=0.1,
-            random_state=42,
-            use_label_encoder=False,
-            eval_metric='logloss',
-            scale_pos_weight=1
-        )
+        self.model = model  # default XGBClassifier is built on first train()
         self.best_threshold = 0.5
+        self.feature_columns = None
+        self.metrics = {}
 
-    def load_data(self, path=PROCESSED_DATA_PATH):
-        if not Path(path).exists():
+    def load_data(self, path=PROCESSED_DATA_PATH, matrix_dir=FEATURE_MATRIX_DIR):
+        """Float32 feature matrix (memory-mapped when persisted) and target."""
+        matrix = load_features(path, FEATURE_COLS, matrix_dir)
+        if matrix is None:
             logger.warning(f"Feature file not found at {path}")
             logger.warning("Please run feature_engineering_simple.py first to generate the CSV.")
             return None, None
-        
-        df = pd.read_csv(path)
-        if 'target' not in df.columns:
+        if matrix.y is None:
             raise ValueError("Target column 'target' not found in the data")
-        
-        X = df.drop(columns=["target", "timestamp", "device_id"], errors='ignore')
-        y = df["target"]
-        logger.info(f"Loaded feature data with {len(df)} rows and {len(X.columns)} columns")
-        return X, y
-
-    def plot_f1_vs_threshold(self, y_true, y_probs):
-        thresholds = np.arange(0.0, 1.0, 0.01)
-        f1_scores = [(f1_score(y_true, (y_probs >= t).astype(int))) for t in thresholds]
-        
-        plt.figure(figsize=(8,5))
-        plt.plot(thresholds, f1_scores, label='F1-score', color='darkorange')
-        plt.axvline(self.best_threshold, color='blue', linestyle='--', label=f'Best threshold: {self.best_threshold:.2f}')
-        plt.xlabel('Probability Threshold')
-        plt.ylabel('F1-score')
-        plt.title('F1-score vs Probability Threshold')
-        plt.legend()
-        plt.grid(True)
-        plt.show()
-        logger.info("F1-score vs threshold plot displayed")
+
+        self.feature_columns = matrix.columns
+        logger.info(f"Loaded feature data with {len(matrix)} rows and {len(matrix.columns)} columns")
+        return matrix.X, matrix.y
+
+    def _model_input(self, X):
+        """Column-aligned input; plain matrices are named for models fitted on DataFrames."""
+        if hasattr(X, "columns"):
+            return X[self.feature_columns] if self.feature_columns is not None else X
+        names = getattr(self.model, "feature_names_in_", None)
+        if names is not None:
+            return pd.DataFrame(X, columns=list(names))
+        return X
+
+    def plot_f1_vs_threshold(self, y_true, y_probs, path=TRAIN_PLOT_PATH):
+        """Save the validation-split F1 curve to ``path`` (never opens a window)."""
+        from models.evaluate import plot_f1_vs_threshold
+
+        plot_f1_vs_threshold(y_true, y_probs, self.best_threshold, path)
 
     def tune_threshold(self, y_true, y_probs):
+        from sklearn.metrics import f1_score
+
         best_f1 = 0
         best_thresh = 0.5
         for thresh in np.arange(0.05, 0.95, 0.01):
@@ -87,13 +95,21 @@ class FailurePredictionModel:
         self.best_threshold = best_thresh
         return best_thresh, best_f1
 
-    def train(self, X, y, test_size=0.2, random_state=42):
+    @timed("FailurePredictionModel.train")
+    def train(self, X, y, test_size=0.2, random_state=42, plot=True):
         if X is None or y is None:
             logger.warning("Training skipped: No data loaded.")
             return None
-        
-        pos = sum(y==1)
-        neg = sum(y==0)
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+
+        if self.model is None:
+            self.model = default_classifier()
+        if hasattr(X, "columns"):
+            self.feature_columns = list(X.columns)
+
+        pos = int((y == 1).sum())
+        neg = int((y == 0).sum())
         if hasattr(self.model, "scale_pos_weight"):
             self.model.scale_pos_weight = neg / max(pos,1)
             logger.info(f"Set scale_pos_weight={self.model.scale_pos_weight:.2f}")
@@ -102,11 +118,15 @@ class FailurePredictionModel:
             X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
-        self.model.fit(X_train, y_train)
-        y_probs = self.model.predict_proba(X_test)[:, 1]
+        with stage("FailurePredictionModel.fit", rows=len(X_train)):
+            self.model.fit(X_train, y_train)
+        with stage("FailurePredictionModel.predict_proba", rows=len(X_test)):
+            y_probs = self.model.predict_proba(X_test)[:, 1]
         
-        self.tune_threshold(y_test, y_probs)
-        self.plot_f1_vs_threshold(y_test, y_probs)
+        with stage("FailurePredictionModel.tune_threshold", rows=len(X_test)):
+            self.tune_threshold(y_test, y_probs)
+        if plot:
+            self.plot_f1_vs_threshold(y_test, y_probs)
         
         y_pred = (y_probs >= self.best_threshold).astype(int)
         metrics = {
@@ -116,18 +136,21 @@ class FailurePredictionModel:
             "threshold": self.best_threshold
         }
         logger.info(f"Training metrics: {metrics}")
+        self.metrics = metrics
         return metrics
 
     def predict(self, X_new):
         if X_new is None:
             logger.warning("Prediction skipped: No input data provided.")
             return None, None
-        probs = self.model.predict_proba(X_new)[:, 1]
+        probs = self.model.predict_proba(self._model_input(X_new))[:, 1]
         preds = (probs >= self.best_threshold).astype(int)
         logger.info(f"Predicted {len(preds)} rows")
         return preds, probs
 
     def save_model(self, path=MODEL_SAVE_PATH):
+        import joblib
+
         os.makedirs(os.path.dirname(path), exist_ok=True)
         joblib.dump(self.model, path)
         logger.info(f"Model saved to: {path}")
@@ -136,9 +159,49 @@ class FailurePredictionModel:
         if not os.path.exists(path):
             logger.warning(f"Model not found at {path}")
             return
+        import joblib
+
         self.model = joblib.load(path)
         logger.info(f"Model loaded from: {path}")
 
+    # -----------------------
+    # Model registry (threshold, feature columns and metrics travel with the model)
+    # -----------------------
+    def register(self, name=REGISTRY_NAME, registry=None):
+        from models.registry import ModelRegistry
+
+        registry = registry or ModelRegistry()
+        return registry.register(name, self.model, self.best_threshold,
+                                 self.feature_columns or [], metrics=self.metrics)
+
+    @classmethod
+    def from_registry(cls, name=REGISTRY_NAME, version=None, registry=None):
+        """Latest (or given) registered version; scoring uses its memory-mapped trees."""
+        from models.registry import ModelRegistry
+
+        registered = (registry or ModelRegistry()).load(name, version)
+        instance = cls(model=registered)
+        instance.best_threshold = registered.threshold
+        instance.feature_columns = registered.feature_columns
+        instance.metrics = registered.metrics
+        logger.info(f"Model {name} v{registered.version} loaded from registry "
+                    f"(threshold={registered.threshold:.2f})")
+        return instance
+
+def load_latest_model(legacy_path=MODEL_SAVE_PATH, name=REGISTRY_NAME):
+    """Latest registered model, else the legacy pickle (threshold 0.5), else None."""
+    try:
+        return FailurePredictionModel.from_registry(name)
+    except FileNotFoundError:
+        pass
+    if not Path(legacy_path).exists():
+        logger.warning(f"Model file not found at {legacy_path}")
+        logger.warning("Please run train.py first.")
+        return None
+    model = FailurePredictionModel()
+    model.load_model(legacy_path)
+    return model
+
 # -----------------------
 # Example usage
 # -----------------------
@@ -149,4 +212,5 @@ if __name__ == "__main__":
         metrics = fp_model.train(X, y)
         if metrics:
             logger.info(f"Model metrics: {metrics}")
-            fp_model.save_model()
\ No newline at end of file
+            fp_model.save_model()
+            fp_model.register()
\ No newline at end of file
@@ -0,0 +1,376 @@
+# src/models/registry.py
+
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger("model_registry")
+
+# -----------------------
+# Layout
+# -----------------------
+# models/registry/<name>/<version>/
+#     metadata.json      threshold, feature columns, metrics, params, format
+#     booster.ubj        XGBoost native binary (or estimator.joblib for sklearn models)
+#     trees/*.npy        flat node arrays, np.load(mmap_mode="r") -> pages shared across processes
+#     shards/<key>/      sharded versions: one booster/estimator + trees/ per shard
+REPO_ROOT = Path(__file__).resolve().parents[2]
+REGISTRY_ROOT = REPO_ROOT / "models" / "registry"
+TREE_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "value", "roots")
+ROWS_PER_CHUNK = 1 << 16   # rows traversed together per tree
+
+
+# -----------------------
+# Flat tree ensemble
+# -----------------------
+class TreeEnsemble:
+    """
+    A binary-classification tree ensemble stored as flat node arrays.
+
+    ``kind="xgboost"``: probability = sigmoid(base_margin + sum of leaf values),
+    splits go left when ``x < threshold``. ``kind="forest"``: probability = mean
+    of per-tree leaf probabilities, splits go left when ``x <= threshold``.
+    Leaves have ``feature == -1``. Inputs are compared as float32, like both
+    libraries do.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], kind: str, base_margin: float = 0.0):
+        self.arrays = arrays
+        self.kind = kind
+        self.base_margin = base_margin
+        for name in TREE_ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    # ---- builders ----
+    @classmethod
+    def from_xgboost(cls, booster, feature_names: Sequence[str]) -> "TreeEnsemble":
+        config = json.loads(booster.save_config())
+        objective = config["learner"]["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Flat evaluation supports binary:logistic only, not {objective}")
+        base_score = float(str(config["learner"]["learner_model_param"]["base_score"]).strip("[]"))
+        index = {name: i for i, name in enumerate(feature_names)}
+
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        for dump in booster.get_dump(dump_format="json"):
+            tree = json.loads(dump)
+            nodes, stack = [], [tree]
+            while stack:
+                node = stack.pop()
+                nodes.append(node)
+                stack.extend(node.get("children", []))
+            offset = len(feature)
+            position = {node["nodeid"]: offset + i for i, node in enumerate(nodes)}
+            roots.append(position[tree["nodeid"]])
+            for node in nodes:
+                if "leaf" in node:
+                    feature.append(-1)
+                    threshold.append(0.0)
+                    left.append(-1)
+                    right.append(-1)
+                    default_left.append(False)
+                    value.append(node["leaf"])
+                else:
+                    split = node["split"]
+                    feature.append(index[split] if split in index else int(split.lstrip("f")))
+                    threshold.append(node["split_condition"])
+                    left.append(position[node["yes"]])
+                    right.append(position[node["no"]])
+                    default_left.append(node["missing"] == node["yes"])
+                    value.append(0.0)
+
+        return cls({
+            "feature": np.asarray(feature, dtype=np.int32),
+            "threshold": np.asarray(threshold, dtype=np.float32),
+            "left": np.asarray(left, dtype=np.int32),
+            "right": np.asarray(right, dtype=np.int32),
+            "default_left": np.asarray(default_left, dtype=bool),
+            "value": np.asarray(value, dtype=np.float32),
+            "roots": np.asarray(roots, dtype=np.int32),
+        }, kind="xgboost", base_margin=float(np.log(base_score / (1 - base_score))))
+
+    @classmethod
+    def from_sklearn_forest(cls, model) -> "TreeEnsemble":
+        positive = list(model.classes_).index(1) if 1 in list(model.classes_) else len(model.classes_) - 1
+        parts = {name: [] for name in TREE_ARRAYS}
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            counts = tree.value[:, 0, :]
+            parts["feature"].append(np.where(is_leaf, -1, tree.feature).astype(np.int32))
+            parts["threshold"].append(tree.threshold.astype(np.float64))
+            parts["left"].append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+            parts["right"].append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+            parts["default_left"].append(np.zeros(tree.node_count, dtype=bool))
+            parts["value"].append((counts[:, positive] / counts.sum(axis=1)).astype(np.float64))
+            parts["roots"].append(np.array([offset], dtype=np.int32))
+            offset += tree.node_count
+        return cls({name: np.concatenate(chunks) for name, chunks in parts.items()}, kind="forest")
+
+    # ---- persistence ----
+    def save(self, directory: Path) -> dict:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in TREE_ARRAYS:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(self.arrays[name]))
+        return {"kind": self.kind, "base_margin": self.base_margin,
+                "n_trees": self.n_trees, "n_nodes": int(len(self.feature))}
+
+    @classmethod
+    def load(cls, directory: Path, meta: dict, mmap: bool = True) -> "TreeEnsemble":
+        mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mode) for name in TREE_ARRAYS}
+        return cls(arrays, kind=meta["kind"], base_margin=meta.get("base_margin", 0.0))
+
+    # ---- inference ----
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """(rows, trees) leaf values; one tree at a time so its nodes stay cache-resident."""
+        n_rows, n_features = X.shape
+        flat_x = X.ravel()
+        feature, threshold = np.asarray(self.feature), np.asarray(self.threshold)
+        left, right, value = np.asarray(self.left), np.asarray(self.right), np.asarray(self.value)
+        check_missing = bool(np.isnan(flat_x).any())
+        row_base = np.arange(n_rows, dtype=np.int64) * n_features
+        out = np.empty((n_rows, self.n_trees), dtype=value.dtype)
+        for t, root in enumerate(np.asarray(self.roots)):
+            node = np.full(n_rows, root, dtype=np.int64)
+            active = np.arange(n_rows) if feature[root] >= 0 else np.empty(0, dtype=np.int64)
+            while active.size:
+                current = node[active]
+                x = flat_x[row_base[active] + feature[current]]
+                go_left = (x < threshold[current]) if self.kind == "xgboost" else (x <= threshold[current])
+                if check_missing:
+                    go_left = np.where(np.isnan(x), self.default_left[current], go_left)
+                current = np.where(go_left, left[current], right[current])
+                node[active] = current
+                active = active[feature[current] >= 0]
+            out[:, t] = value[node]
+        return out
+
+    def predict_positive(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        step = ROWS_PER_CHUNK
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], step):
+            leaves = self._leaf_values(X[start:start + step])
+            if self.kind == "xgboost":
+                margin = self.base_margin + leaves.sum(axis=1, dtype=np.float64)
+                out[start:start + step] = 1.0 / (1.0 + np.exp(-margin))
+            else:
+                out[start:start + step] = leaves.mean(axis=1)
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+
+# -----------------------
+# Registered model
+# -----------------------
+class RegisteredModel:
+    """
+    One loaded registry version. ``predict_proba`` uses the memory-mapped flat
+    trees when the version has them, else the native estimator (loaded lazily).
+    """
+
+    def __init__(self, directory: Path, meta: dict, mmap: bool = True):
+        self.directory = directory
+        self.meta = meta
+        self.name = meta["name"]
+        self.version = meta["version"]
+        self.threshold = meta["threshold"]
+        self.feature_columns: List[str] = meta["feature_columns"]
+        self.metrics = meta.get("metrics", {})
+        self.ensemble = (TreeEnsemble.load(directory / "trees", meta["trees"], mmap)
+                         if meta.get("trees") else None)
+        self._native = None
+
+    @property
+    def native(self):
+        """The original estimator (XGBClassifier from booster.ubj, or the joblib estimator)."""
+        if self._native is None:
+            if self.meta["format"] == "xgboost":
+                from xgboost import XGBClassifier
+                self._native = XGBClassifier()
+                self._native.load_model(str(self.directory / "booster.ubj"))
+            else:
+                import joblib
+                self._native = joblib.load(self.directory / "estimator.joblib", mmap_mode="r")
+        return self._native
+
+    def _matrix(self, X):
+        if hasattr(X, "columns"):
+            X = X[self.feature_columns]
+        return X
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._matrix(X)
+        if self.ensemble is not None:
+            return self.ensemble.predict_proba(X)
+        return self.native.predict_proba(X)
+
+
+# -----------------------
+# Registry
+# -----------------------
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class ModelRegistry:
+    """Versioned model artifacts under ``root/<name>/<version>/``."""
+
+    def __init__(self, root: Path = REGISTRY_ROOT):
+        self.root = Path(root)
+
+    def versions(self, name: str) -> List[int]:
+        directory = self.root / name
+        if not directory.exists():
+            return []
+        return sorted(int(p.name) for p in directory.iterdir()
+                      if p.name.isdigit() and (p / "metadata.json").exists())
+
+    def _resolve(self, name: str, version: Optional[int]) -> Path:
+        versions = self.versions(name)
+        if not versions:
+            raise FileNotFoundError(f"No registered versions of {name!r} under {self.root}")
+        version = versions[-1] if version is None else version
+        if version not in versions:
+            raise FileNotFoundError(f"{name!r} has no version {version} (have {versions})")
+        return self.root / name / str(version)
+
+    def metadata(self, name: str, version: Optional[int] = None) -> dict:
+        return json.loads((self._resolve(name, version) / "metadata.json").read_text())
+
+    def _staging(self, name: str):
+        version = (self.versions(name) or [0])[-1] + 1
+        staging = self.root / name / f".staging-{version}-{os.getpid()}"
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        return version, staging
+
+    def _publish(self, name: str, version: int, staging: Path, meta: dict):
+        meta = {"name": name, "version": version,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(), **meta}
+        (staging / "metadata.json").write_text(json.dumps(meta, indent=2, default=str))
+        staging.rename(self.root / name / str(version))
+
+    @staticmethod
+    def _write_artifact(directory: Path, estimator, feature_columns: List[str], label: str) -> dict:
+        """Native artifact plus flat trees for one estimator; returns its metadata fields."""
+        directory.mkdir(parents=True, exist_ok=True)
+        if hasattr(estimator, "get_booster"):
+            fmt = "xgboost"
+            estimator.save_model(str(directory / "booster.ubj"))
+            try:
+                ensemble = TreeEnsemble.from_xgboost(estimator.get_booster(), feature_columns)
+            except ValueError as e:
+                logger.warning("Storing %s without flat trees: %s", label, e)
+                ensemble = None
+        else:
+            import joblib
+            fmt = "joblib"
+            joblib.dump(estimator, directory / "estimator.joblib")  # uncompressed so arrays can be mmapped
+            ensemble = (TreeEnsemble.from_sklearn_forest(estimator)
+                        if hasattr(estimator, "estimators_") and hasattr(estimator, "classes_") else None)
+        return {
+            "format": fmt,
+            "estimator": type(estimator).__name__,
+            "trees": ensemble.save(directory / "trees") if ensemble is not None else None,
+        }
+
+    def register(self, name: str, estimator, threshold: float, feature_columns: Sequence[str],
+                 metrics: Optional[dict] = None, params: Optional[dict] = None) -> int:
+        """Write a new version (atomically) and return its number."""
+        version, staging = self._staging(name)
+        feature_columns = [str(c) for c in feature_columns]
+        artifact = self._write_artifact(staging, estimator, feature_columns, f"{name} v{version}")
+        self._publish(name, version, staging, {
+            **artifact,
+            "threshold": float(threshold),
+            "feature_columns": feature_columns,
+            "metrics": _floats(metrics),
+            "params": params if params is not None else _safe_params(estimator),
+        })
+        logger.info("Registered %s v%d (%s, threshold=%.2f)", name, version, artifact["format"], threshold)
+        return version
+
+    def register_sharded(self, name: str, shards: Dict[str, dict], routing: Dict[str, str],
+                         fallback: str, feature_columns: Sequence[str],
+                         metrics: Optional[dict] = None, params: Optional[dict] = None) -> int:
+        """
+        One version holding several models under ``shards/<key>/``. ``shards`` maps
+        key -> {"estimator", "threshold", "metrics"}; ``routing`` maps a routing value
+        (e.g. a device class id) to its shard key, unknown values go to ``fallback``.
+        """
+        version, staging = self._staging(name)
+        feature_columns = [str(c) for c in feature_columns]
+        entries = {}
+        for key, shard in shards.items():
+            artifact = self._write_artifact(staging / "shards" / key, shard["estimator"],
+                                            feature_columns, f"{name} v{version} shard {key}")
+            entries[key] = {**artifact, "threshold": float(shard["threshold"]),
+                            "metrics": _floats(shard.get("metrics"))}
+        self._publish(name, version, staging, {
+            "format": "sharded",
+            "threshold": None,
+            "feature_columns": feature_columns,
+            "metrics": _floats(metrics),
+            "params": params or {},
+            "shards": entries,
+            "routing": {str(k): v for k, v in routing.items()},
+            "fallback": fallback,
+        })
+        logger.info("Registered %s v%d (%d shards)", name, version, len(entries))
+        return version
+
+    def load(self, name: str, version: Optional[int] = None, mmap: bool = True) -> RegisteredModel:
+        directory = self._resolve(name, version)
+        return RegisteredModel(directory, json.loads((directory / "metadata.json").read_text()), mmap)
+
+    def load_shards(self, name: str, version: Optional[int] = None,
+                    mmap: bool = True) -> Tuple[dict, Dict[str, RegisteredModel]]:
+        """Metadata and per-shard models of a version written by ``register_sharded``."""
+        directory = self._resolve(name, version)
+        meta = json.loads((directory / "metadata.json").read_text())
+        if meta.get("format") != "sharded":
+            raise ValueError(f"{name!r} v{meta['version']} is not a sharded model")
+        shards = {
+            key: RegisteredModel(directory / "shards" / key,
+                                 {**entry, "name": f"{name}/{key}", "version": meta["version"],
+                                  "feature_columns": meta["feature_columns"]}, mmap)
+            for key, entry in meta["shards"].items()
+        }
+        return meta, shards
+
+
+def _floats(metrics: Optional[dict]) -> dict:
+    return {k: float(v) for k, v in (metrics or {}).items()}
+
+
+def _safe_params(estimator) -> dict:
+    try:
+        params = estimator.get_params()
+    except AttributeError:
+        return {}
+    return {k: v for k, v in params.items() if isinstance(v, (int, float, str, bool, type(None)))}
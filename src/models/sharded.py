@@ -0,0 +1,256 @@
+# src/models/sharded.py
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from models.failure_prediction import FailurePredictionModel, default_classifier
+from utils.config import get_section
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+
+logger = get_logger("sharded_model")
+
+# -----------------------
+# Configurable paths and settings (config.yaml "model" section)
+# -----------------------
+DEVICES_PATH = REPO_ROOT / "data" / "raw" / "device" / "devices.csv"
+SHARDED_MODEL_PATH = REPO_ROOT / "models" / "failure_model_sharded.pkl"
+REGISTRY_NAME = "failure_model_sharded"
+OTHER_SHARD = "other"   # classes too small (or too clean) for a model of their own
+MODEL_CONFIG = get_section("model")
+
+
+# -----------------------
+# Routing inputs
+# -----------------------
+def device_classes(device_ids, devices_path=DEVICES_PATH) -> np.ndarray:
+    """``device_class_id`` per row of ``device_ids`` (-1 for devices missing from the table)."""
+    devices = pd.read_csv(devices_path, usecols=["device_id", "device_class_id"])
+    lookup = devices.drop_duplicates("device_id").set_index("device_id")["device_class_id"]
+    pos = lookup.index.get_indexer(np.asarray(device_ids))
+    return np.where(pos >= 0, lookup.to_numpy()[pos], -1).astype(np.int64)
+
+
+def plan_shards(classes: np.ndarray, y, min_rows: int, min_positives: int,
+                groups: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+    """
+    Shard key per device class: ``groups[class]`` or ``class_<id>``. Shards with
+    fewer than ``min_rows`` rows or ``min_positives`` failures are pooled into
+    ``other``; a pool that is itself too small joins the largest shard.
+    """
+    frame = pd.DataFrame({"cls": classes, "y": np.asarray(y)})
+    frame["key"] = "class_" + frame["cls"].astype(str)
+    if groups:
+        frame["key"] = frame["cls"].map(groups).fillna(frame["key"])
+    sizes = frame.groupby("key")["y"].agg(["size", "sum"])
+    keep = sizes[(sizes["size"] >= min_rows) & (sizes["sum"] >= min_positives)].index
+    frame["key"] = frame["key"].where(frame["key"].isin(keep), OTHER_SHARD)
+
+    pooled = frame[frame["key"] == OTHER_SHARD]
+    if len(keep) and 0 < len(pooled) and (len(pooled) < min_rows or pooled["y"].sum() < min_positives):
+        largest = sizes.loc[keep, "size"].idxmax()
+        frame.loc[pooled.index, "key"] = largest
+    return frame.drop_duplicates("cls").set_index("cls")["key"].to_dict()
+
+
+def _take(data, rows: np.ndarray):
+    return data.iloc[rows] if hasattr(data, "iloc") else data[rows]
+
+
+# -----------------------
+# Shard training (runs in worker processes)
+# -----------------------
+def _train_shard(key: str, X, y, model_factory: Optional[Callable], n_jobs: int):
+    started = time.perf_counter()
+    model = FailurePredictionModel(model_factory() if model_factory else default_classifier(n_jobs=n_jobs))
+    metrics = model.train(X, y, plot=False)
+    return key, {
+        "estimator": model.model,
+        "threshold": model.best_threshold,
+        "metrics": {**metrics, "rows": len(y), "seconds": time.perf_counter() - started},
+    }
+
+
+# -----------------------
+# Sharded model
+# -----------------------
+class ShardedFailureModel:
+    """
+    One failure model per device class (or class group), trained in parallel
+    worker processes. Rows are routed to their shard by ``device_class_id``;
+    classes not seen in training go to the ``fallback`` shard.
+    """
+
+    def __init__(self, model_factory: Optional[Callable] = None, min_rows: int = 500,
+                 min_positives: int = 20, groups: Optional[Dict[int, str]] = None,
+                 max_workers: Optional[int] = None):
+        self.model_factory = model_factory   # must be picklable (module-level callable or partial)
+        self.min_rows = min_rows
+        self.min_positives = min_positives
+        self.groups = groups
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shards: Dict[str, object] = {}
+        self.thresholds: Dict[str, float] = {}
+        self.shard_metrics: Dict[str, dict] = {}
+        self.routing: Dict[int, str] = {}
+        self.fallback: Optional[str] = None
+        self.feature_columns = None
+        self.metrics = {}
+
+    # ---- routing ----
+    def _codes(self):
+        keys = sorted(self.shards)
+        return keys, {key: i for i, key in enumerate(keys)}
+
+    def route(self, classes) -> np.ndarray:
+        """Shard index (into ``sorted(self.shards)``) per row, vectorized."""
+        keys, code = self._codes()
+        class_ids = np.fromiter(self.routing, dtype=np.int64, count=len(self.routing))
+        class_codes = np.array([code[self.routing[c]] for c in class_ids], dtype=np.int64)
+        pos = pd.Index(class_ids).get_indexer(np.asarray(classes, dtype=np.int64))
+        return np.where(pos >= 0, class_codes[pos], code[self.fallback])
+
+    # ---- training ----
+    @timed("ShardedFailureModel.train")
+    def train(self, X, y, classes, feature_columns=None) -> dict:
+        classes = np.asarray(classes, dtype=np.int64)
+        self.routing = plan_shards(classes, y, self.min_rows, self.min_positives, self.groups)
+        self.feature_columns = list(X.columns) if hasattr(X, "columns") else feature_columns
+        shard_of_row = pd.Series(classes).map(self.routing).to_numpy()
+        keys, counts = np.unique(shard_of_row, return_counts=True)
+        self.fallback = OTHER_SHARD if OTHER_SHARD in keys else str(keys[np.argmax(counts)])
+
+        workers = min(self.max_workers, len(keys))
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        logger.info(f"Training {len(keys)} shards on {workers} processes ({n_jobs} threads each)")
+        # spawn: forking a process that already runs BLAS / joblib threads can deadlock the workers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = []
+            for key in keys[np.argsort(-counts)]:           # biggest shards first
+                rows = np.flatnonzero(shard_of_row == key)
+                futures.append(pool.submit(_train_shard, str(key), _take(X, rows), _take(y, rows),
+                                           self.model_factory, n_jobs))
+            for future in futures:
+                key, result = future.result()
+                self.shards[key] = result["estimator"]
+                self.thresholds[key] = result["threshold"]
+                self.shard_metrics[key] = result["metrics"]
+
+        weights = pd.Series({k: m["rows"] for k, m in self.shard_metrics.items()})
+        self.metrics = {
+            f"weighted_{name}": float(sum(self.shard_metrics[k][name] * w for k, w in weights.items()) / weights.sum())
+            for name in ("accuracy", "f1_score", "roc_auc")
+        }
+        self.metrics["shards"] = len(self.shards)
+        logger.info(f"Sharded training metrics: {self.metrics}")
+        return self.metrics
+
+    # ---- inference ----
+    def predict_proba(self, X, classes) -> np.ndarray:
+        """Positive-class probability per row; each shard scores its rows in one batch."""
+        if self.feature_columns is not None and hasattr(X, "columns"):
+            X = X[self.feature_columns]
+        keys, _ = self._codes()
+        codes = self.route(classes)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        probs = np.empty(len(codes), dtype=np.float64)
+        for rows in np.split(order, bounds):
+            if not len(rows):
+                continue
+            batch = _take(X, rows)
+            probs[rows] = self.shards[keys[codes[rows[0]]]].predict_proba(batch)[:, 1]
+        return probs
+
+    def predict(self, X, classes):
+        if X is None:
+            logger.warning("Prediction skipped: No input data provided.")
+            return None, None
+        keys, _ = self._codes()
+        with stage("ShardedFailureModel.predict", rows=len(X)):
+            probs = self.predict_proba(X, classes)
+            thresholds = np.array([self.thresholds[k] for k in keys])
+            preds = (probs >= thresholds[self.route(classes)]).astype(int)
+        logger.info(f"Predicted {len(preds)} rows across {len(keys)} shards")
+        return preds, probs
+
+    # ---- persistence ----
+    def save_model(self, path=SHARDED_MODEL_PATH):
+        import joblib
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({"shards": self.shards, "thresholds": self.thresholds, "routing": self.routing,
+                     "fallback": self.fallback, "feature_columns": self.feature_columns}, path)
+        logger.info(f"Sharded model saved to: {path}")
+
+    @classmethod
+    def load_model(cls, path=SHARDED_MODEL_PATH):
+        import joblib
+
+        instance = cls()
+        for name, value in joblib.load(path).items():
+            setattr(instance, name, value)
+        logger.info(f"Sharded model loaded from: {path}")
+        return instance
+
+    def register(self, name=REGISTRY_NAME, registry=None):
+        from models.registry import ModelRegistry
+
+        shards = {key: {"estimator": self.shards[key], "threshold": self.thresholds[key],
+                        "metrics": self.shard_metrics.get(key)} for key in self.shards}
+        return (registry or ModelRegistry()).register_sharded(
+            name, shards, self.routing, self.fallback, self.feature_columns,
+            metrics=self.metrics, params={"min_rows": self.min_rows, "min_positives": self.min_positives})
+
+    @classmethod
+    def from_registry(cls, name=REGISTRY_NAME, version=None, registry=None):
+        from models.registry import ModelRegistry
+
+        meta, shards = (registry or ModelRegistry()).load_shards(name, version)
+        instance = cls()
+        instance.shards = shards
+        instance.thresholds = {key: model.threshold for key, model in shards.items()}
+        instance.shard_metrics = {key: model.metrics for key, model in shards.items()}
+        instance.routing = {int(c): key for c, key in meta["routing"].items()}
+        instance.fallback = meta["fallback"]
+        instance.feature_columns = meta["feature_columns"]
+        instance.metrics = meta["metrics"]
+        logger.info(f"Sharded model {name} v{meta['version']} loaded from registry ({len(shards)} shards)")
+        return instance
+
+
+def sharding_enabled() -> bool:
+    return MODEL_CONFIG.get("sharding", "none") == "device_class"
+
+
+def from_config(**overrides) -> ShardedFailureModel:
+    """A ``ShardedFailureModel`` with the config.yaml shard settings."""
+    settings = {
+        "min_rows": MODEL_CONFIG.get("min_shard_rows", 500),
+        "min_positives": MODEL_CONFIG.get("min_shard_positives", 20),
+        "groups": {int(c): str(g) for c, g in (MODEL_CONFIG.get("shard_groups") or {}).items()},
+        "max_workers": MODEL_CONFIG.get("shard_workers"),
+    }
+    return ShardedFailureModel(**{**settings, **overrides})
+
+
+def load_latest_sharded_model(legacy_path=SHARDED_MODEL_PATH, name=REGISTRY_NAME):
+    """Latest registered sharded model, else the pickle, else None."""
+    try:
+        return ShardedFailureModel.from_registry(name)
+    except FileNotFoundError:
+        pass
+    if not Path(legacy_path).exists():
+        logger.warning(f"Sharded model not found at {legacy_path}")
+        logger.warning("Please run train.py with model.sharding: device_class first.")
+        return None
+    return ShardedFailureModel.load_model(legacy_path)
@@ -1,36 +1,46 @@
 # src/models/train.py
 
-import sys
-from pathlib import Path
-
-# -----------------------
-# Repo root and paths
-# -----------------------
-REPO_ROOT = Path(__file__).resolve().parents[2]  # repo root
-SRC_PATH = REPO_ROOT / "src"
-MODELS_PATH = SRC_PATH / "models"
-
-sys.path.append(str(SRC_PATH))
-sys.path.append(str(MODELS_PATH))
-sys.path.append(str(REPO_ROOT))
-
 # -----------------------
 # Imports
 # -----------------------
-from src.utils.logger import get_logger
-from failure_prediction import FailurePredictionModel
+from utils.logger import get_logger
+from features.feature_engineering import FEATURE_COLS
+from features.feature_matrix import load_features
+from models.failure_prediction import FailurePredictionModel, PROCESSED_DATA_PATH
+from models import sharded
 
 # -----------------------
 # Logger setup (consolidated log)
 # -----------------------
 logger = get_logger("train")  # logs go to logs/pipeline.log with rollover
 
+# -----------------------
+# Sharded training (config.yaml model.sharding: device_class)
+# -----------------------
+def train_sharded():
+    matrix = load_features(PROCESSED_DATA_PATH, FEATURE_COLS)
+    if matrix is None or matrix.y is None:
+        logger.warning("No feature data available. Please run feature_engineering_simple.py first.")
+        return
+    model = sharded.from_config()
+    metrics = model.train(matrix.X, matrix.y, sharded.device_classes(matrix.keys["device_id"]),
+                          feature_columns=matrix.columns)
+    logger.info(f"Sharded model metrics: {metrics}")
+    model.save_model()
+    version = model.register()
+    logger.info(f"Registered sharded model version {version}")
+
 # -----------------------
 # Main training orchestrator
 # -----------------------
 def main():
     logger.info("Starting device failure prediction training pipeline...")
 
+    if sharded.sharding_enabled():
+        train_sharded()
+        logger.info("Pipeline finished successfully.")
+        return
+
     # Initialize model
     model = FailurePredictionModel()
 
@@ -48,6 +58,8 @@ def main():
 
         # Save trained model
         model.save_model()
+        version = model.register()
+        logger.info(f"Registered model version {version}")
         logger.info("Pipeline finished successfully.")
 
 
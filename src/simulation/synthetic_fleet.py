@@ -0,0 +1,254 @@
+# src/simulation/synthetic_fleet.py
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Repo root and paths
+# -----------------------
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from utils.logger import get_logger
+
+logger = get_logger("synthetic_fleet")
+
+OUTPUT_ROOT = REPO_ROOT / "data" / "synthetic"
+
+# -----------------------
+# Fleet shape at scale 1x (matches the shipped sample data)
+# -----------------------
+BASE_COUNTS = {
+    "organizations": 100,
+    "assets": 200,
+    "devices": 10_000,
+    "events": 100_000,
+}
+DEVICE_CLASSES = 50            # fixed catalogue, does not scale
+INTERFACES_PER_DEVICE = 10
+EVENT_DAYS = 30
+EVENT_START = pd.Timestamp("2025-07-14")
+CHUNK_ROWS = 1_000_000         # rows generated and written per chunk
+
+# Event-type mix for a healthy device; the sample's five types dominate,
+# with a tail of the failure types the health rules penalize.
+EVENT_TYPE_MIX = {
+    "link_up": 0.20,
+    "link_down": 0.18,
+    "high_cpu": 0.18,
+    "config_change": 0.17,
+    "reboot": 0.15,
+    "high_memory": 0.05,
+    "interface_down": 0.04,
+    "error": 0.02,
+    "critical_error": 0.008,
+    "failure": 0.002,
+}
+FAILURE_TYPES = ("link_down", "interface_down", "error", "critical_error", "failure")
+FLAKY_DEVICE_SHARE = 0.05      # devices whose failure types are FLAKY_MULTIPLIER x more likely
+FLAKY_MULTIPLIER = 8
+
+COUNTRY_WEIGHTS = {
+    "USA": 22, "Canada": 7, "India": 7, "Australia": 6, "United Kingdom": 5, "Germany": 5,
+    "UAE": 4, "Singapore": 4, "South Africa": 3, "Qatar": 2, "France": 2, "Spain": 2,
+    "New Zealand": 2, "Italy": 2, "Hong Kong": 2, "Switzerland": 2, "Malaysia": 2,
+    "Netherlands": 2, "Japan": 1, "Brazil": 1, "Mexico": 1, "Sweden": 1, "Norway": 1,
+}
+INDUSTRIES = ["Healthcare", "Banking", "Logistics", "Cloud Services", "Telecommunications",
+              "Retail", "Manufacturing", "Information Technology", "Energy", "Education"]
+DEVICE_CLASS_NAMES = ["Edge Device", "Application Service", "Worker Node / Agent", "Infrastructure Component",
+                      "Wearable / IoT Device", "Unmanaged Device", "Network Path / Route", "Data Source",
+                      "Process / Runtime", "Always-On Service"]
+INTERFACE_STATUSES = ["up", "down", "unknown"]
+MANUFACTURERS = ["Cisco", "Juniper", "Arista", "HPE", "Dell", "Fortinet", "Palo Alto Networks", "Ubiquiti"]
+
+
+# -----------------------
+# Helpers
+# -----------------------
+def fleet_counts(scale: float) -> Dict[str, int]:
+    counts = {name: max(1, int(round(n * scale))) for name, n in BASE_COUNTS.items()}
+    counts["device_classes"] = DEVICE_CLASSES
+    counts["interfaces"] = counts["devices"] * INTERFACES_PER_DEVICE
+    return counts
+
+
+def _weights(values) -> np.ndarray:
+    w = np.asarray(values, dtype=float)
+    return w / w.sum()
+
+
+def _pick(rng: np.random.Generator, options, size: int, p=None) -> np.ndarray:
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=size, p=p)]
+
+
+def _ipv4(rng: np.random.Generator, n: int) -> pd.Series:
+    octets = pd.DataFrame(rng.integers(1, 255, size=(n, 4))).astype(str)
+    return octets[0] + "." + octets[1] + "." + octets[2] + "." + octets[3]
+
+
+def _hex_strings(rng: np.random.Generator, n: int, n_bytes: int) -> pd.Series:
+    raw = rng.integers(0, 256, size=(n, n_bytes), dtype=np.uint8)
+    return pd.Series([row.tobytes().hex() for row in raw])
+
+
+def _uuid(rng: np.random.Generator, n: int) -> pd.Series:
+    h = _hex_strings(rng, n, 16)
+    return h.str[:8] + "-" + h.str[8:12] + "-" + h.str[12:16] + "-" + h.str[16:20] + "-" + h.str[20:]
+
+
+def _mac(rng: np.random.Generator, n: int) -> pd.Series:
+    h = _hex_strings(rng, n, 6)
+    return h.str[0:2] + ":" + h.str[2:4] + ":" + h.str[4:6] + ":" + h.str[6:8] + ":" + h.str[8:10] + ":" + h.str[10:12]
+
+
+def _write(df: pd.DataFrame, path: Path, first_chunk: bool):
+    df.to_csv(path, mode="w" if first_chunk else "a", header=first_chunk, index=False)
+
+
+def _chunks(total: int):
+    for start in range(0, total, CHUNK_ROWS):
+        yield start, min(start + CHUNK_ROWS, total)
+
+
+# -----------------------
+# Generator
+# -----------------------
+def generate_fleet(scale: float = 1.0, out_dir: Optional[Path] = None, seed: int = 42) -> Path:
+    """
+    Write a synthetic fleet in the ``data/raw`` CSV layout under ``out_dir``.
+
+    Scale 1x matches the sample data (100 orgs, 200 assets, 10k devices, 100k
+    interfaces, 100k events over 30 days); every table except device classes
+    scales linearly. Large tables are generated and appended in chunks, so
+    memory stays flat as the scale grows.
+    """
+    counts = fleet_counts(scale)
+    out_dir = Path(out_dir) if out_dir else OUTPUT_ROOT / f"x{scale:g}"
+    rng = np.random.default_rng(seed)
+    for table in ("organization", "device_class", "asset", "device", "interface", "event"):
+        (out_dir / table).mkdir(parents=True, exist_ok=True)
+    logger.info("Generating synthetic fleet x%g into %s: %s", scale, out_dir, counts)
+
+    # Organizations
+    n_orgs = counts["organizations"]
+    countries = _pick(rng, list(COUNTRY_WEIGHTS), n_orgs, p=_weights(list(COUNTRY_WEIGHTS.values())))
+    org_ids = np.arange(1, n_orgs + 1)
+    pd.DataFrame({
+        "organization_id": org_ids,
+        "name": [f"Synthetic Org {i}" for i in org_ids],
+        "industry": _pick(rng, INDUSTRIES, n_orgs),
+        "address": [f"{i} Example St" for i in org_ids],
+        "contact_email": [f"noc@org{i}.example.com" for i in org_ids],
+        "contact_phone": [f"555-{i:07d}" for i in org_ids],
+        "country": countries,
+    }).to_csv(out_dir / "organization" / "organization.csv", index=False)
+
+    # Device classes
+    class_ids = np.arange(1, DEVICE_CLASSES + 1)
+    pd.DataFrame({
+        "device_class_id": class_ids,
+        "name": [f"{DEVICE_CLASS_NAMES[(i - 1) % len(DEVICE_CLASS_NAMES)]} {i}" for i in class_ids],
+        "description": "Synthetic device class",
+    }).to_csv(out_dir / "device_class" / "device_class.csv", index=False)
+
+    # Assets
+    n_assets = counts["assets"]
+    asset_org = rng.integers(1, n_orgs + 1, size=n_assets)
+    pd.DataFrame({
+        "asset_id": np.arange(1, n_assets + 1),
+        "name": [f"asset-{i}.example.com" for i in range(1, n_assets + 1)],
+        "organization_id": asset_org,
+        "location": _pick(rng, list(COUNTRY_WEIGHTS), n_assets),
+        "purchase_date": (pd.Timestamp("2020-01-01")
+                          + pd.to_timedelta(rng.integers(0, 2000, size=n_assets), unit="D")).strftime("%Y-%m-%d"),
+        "owner": [f"Owner {i}" for i in range(1, n_assets + 1)],
+    }).to_csv(out_dir / "asset" / "assets.csv", index=False)
+
+    # Devices (+ per-device attributes reused by the event generator)
+    n_devices = counts["devices"]
+    device_asset = rng.integers(1, n_assets + 1, size=n_devices)
+    device_country_code = pd.Categorical(countries).codes[asset_org[device_asset - 1] - 1]
+    country_names = np.asarray(pd.Categorical(countries).categories, dtype=object)
+    activity = rng.lognormal(mean=0.0, sigma=1.0, size=n_devices)   # a few devices are much noisier
+    flaky = rng.random(n_devices) < FLAKY_DEVICE_SHARE
+    for first, (start, stop) in enumerate(_chunks(n_devices)):
+        n = stop - start
+        _write(pd.DataFrame({
+            "device_id": np.arange(start + 1, stop + 1),
+            "asset_id": device_asset[start:stop],
+            "device_class_id": rng.integers(1, DEVICE_CLASSES + 1, size=n),
+            "ip_address": _ipv4(rng, n),
+            "serial_number": _uuid(rng, n),
+            "manufacturer": _pick(rng, MANUFACTURERS, n),
+        }), out_dir / "device" / "devices.csv", first == 0)
+
+    # Interfaces: device d owns ids (d-1)*INTERFACES_PER_DEVICE + 1 .. d*INTERFACES_PER_DEVICE
+    for first, (start, stop) in enumerate(_chunks(counts["interfaces"])):
+        ids = np.arange(start + 1, stop + 1)
+        _write(pd.DataFrame({
+            "interface_id": ids,
+            "device_id": (ids - 1) // INTERFACES_PER_DEVICE + 1,
+            "name": "eth" + pd.Series(rng.integers(0, 4, size=len(ids))).astype(str),
+            "mac_address": _mac(rng, len(ids)),
+            "status": _pick(rng, INTERFACE_STATUSES, len(ids)),
+        }), out_dir / "interface" / "interfaces.csv", first == 0)
+
+    # Events
+    types = np.asarray(list(EVENT_TYPE_MIX), dtype=object)
+    base_mix = _weights(list(EVENT_TYPE_MIX.values()))
+    flaky_mix = _weights([w * (FLAKY_MULTIPLIER if t in FAILURE_TYPES else 1) for t, w in EVENT_TYPE_MIX.items()])
+    base_cdf, flaky_cdf = np.cumsum(base_mix), np.cumsum(flaky_mix)
+    device_p = activity / activity.sum()
+    span_seconds = EVENT_DAYS * 24 * 3600
+    for first, (start, stop) in enumerate(_chunks(counts["events"])):
+        n = stop - start
+        device = rng.choice(n_devices, size=n, p=device_p)        # 0-based
+        u = rng.random(n)
+        type_code = np.where(flaky[device],
+                             np.searchsorted(flaky_cdf, u, side="right"),
+                             np.searchsorted(base_cdf, u, side="right"))
+        type_code = np.minimum(type_code, len(types) - 1)
+        timestamps = EVENT_START + pd.to_timedelta(rng.integers(0, span_seconds, size=n), unit="s")
+        _write(pd.DataFrame({
+            "event_id": np.arange(start + 1, stop + 1),
+            "event_timestamp": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+            "device_id": device + 1,
+            "interface_id": device * INTERFACES_PER_DEVICE + rng.integers(1, INTERFACES_PER_DEVICE + 1, size=n),
+            "org_country": country_names[device_country_code[device]],
+            "event_type": types[type_code],
+            "event_description": "",
+        }), out_dir / "event" / "events.csv", first == 0)
+
+    manifest = {"scale": scale, "seed": seed, "counts": counts}
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    logger.info("Synthetic fleet x%g written to %s", scale, out_dir)
+    return out_dir
+
+
+def ensure_fleet(scale: float, out_dir: Optional[Path] = None, seed: int = 42) -> Path:
+    """Reuse a previously generated fleet with the same scale and seed, else generate it."""
+    out_dir = Path(out_dir) if out_dir else OUTPUT_ROOT / f"x{scale:g}"
+    manifest = out_dir / "manifest.json"
+    if manifest.exists():
+        meta = json.loads(manifest.read_text())
+        if meta.get("scale") == scale and meta.get("seed") == seed:
+            return out_dir
+    return generate_fleet(scale, out_dir, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic device fleet in the data/raw CSV layout.")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = sample size (10k devices, 100k events)")
+    parser.add_argument("--out", type=Path, default=None, help="output dir (default data/synthetic/x<scale>)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate_fleet(args.scale, args.out, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# src/transformation/encoding.py
+
+import re
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+logger = get_logger("encoding")
+
+# -----------------------
+# Compact encodings
+# -----------------------
+# Identifiers are held in their binary form and only turned back into text
+# for display:
+#     ipv4      "10.0.0.1"                               -> uint32
+#     mac       "72:49:ab:d9:98:75"                      -> uint64 (low 48 bits)
+#     uuid      "ca736c01-915e-4d81-aed4-953eaa0cacbf"   -> 16 bytes
+#     category  low-cardinality text (interned / pandas categorical)
+# Zero (0.0.0.0, 00:00:00:00:00:00, the nil UUID) stands for a missing value
+# and decodes to "".
+
+MISSING_IP = 0
+MISSING_MAC = 0
+MISSING_UUID = bytes(16)
+
+# Column name -> encoding, for the raw CSVs and the processed snapshots
+COLUMN_KINDS: Dict[str, str] = {
+    "ip_address": "ipv4",
+    "device_ip": "ipv4",
+    "mac_address": "mac",
+    "interface_mac": "mac",
+    "serial_number": "uuid",
+    "device_serial": "uuid",
+    "manufacturer": "category",
+    "device_manufacturer": "category",
+    "status": "category",
+    "interface_status": "category",
+    "event_type": "category",
+    "org_country": "category",
+    "country": "category",
+}
+
+_IPV4_RE = r"^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$"
+_IPV4 = re.compile(_IPV4_RE)
+_SEPARATORS = r"[:\-.{}]"
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_NIBBLE = np.full(256, 255, dtype=np.uint8)
+_NIBBLE[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_NIBBLE[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_NIBBLE[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+_OCTETS = np.array([str(i) for i in range(256)])
+
+# Positions of the hex digits in the formatted text
+_MAC_DIGITS = np.array([i for i in range(17) if i % 3 != 2])
+_UUID_DIGITS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+# -----------------------
+# Scalar codecs (relational objects)
+# -----------------------
+def ip_to_int(value: str) -> int:
+    """Dotted-quad IPv4 to its uint32 value ("" -> 0)."""
+    if not value:
+        return MISSING_IP
+    match = _IPV4.match(value.strip())
+    octets = [int(part) for part in match.groups()] if match else []
+    if not octets or max(octets) > 255:
+        raise ValueError(f"Invalid IPv4 address: {value!r}")
+    return (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+
+
+def int_to_ip(code: int) -> str:
+    if not code:
+        return ""
+    return f"{code >> 24 & 255}.{code >> 16 & 255}.{code >> 8 & 255}.{code & 255}"
+
+
+def _hex_to_bytes(value: str, size: int, kind: str) -> bytes:
+    digits = re.sub(_SEPARATORS, "", value.strip())
+    try:
+        if len(digits) != 2 * size:
+            raise ValueError
+        return bytes.fromhex(digits)
+    except ValueError:
+        raise ValueError(f"Invalid {kind}: {value!r}") from None
+
+
+def mac_to_int(value: str) -> int:
+    """MAC address (':', '-' or '.' separated) to its 48-bit value ("" -> 0)."""
+    if not value:
+        return MISSING_MAC
+    return int.from_bytes(_hex_to_bytes(value, 6, "MAC address"), "big")
+
+
+def int_to_mac(code: int) -> str:
+    if not code:
+        return ""
+    return code.to_bytes(6, "big").hex(":")
+
+
+def uuid_to_bytes(value: str) -> bytes:
+    """UUID text to its 16 raw bytes ("" -> the nil UUID)."""
+    if not value:
+        return MISSING_UUID
+    return _hex_to_bytes(value, 16, "UUID")
+
+
+def bytes_to_uuid(code: bytes) -> str:
+    if not code or code == MISSING_UUID:
+        return ""
+    h = code.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def intern_str(value: Optional[str]) -> str:
+    """One shared string object per distinct value (for low-cardinality attributes)."""
+    return sys.intern(value) if value else ""
+
+
+# -----------------------
+# Vectorized codecs (pandas frames)
+# -----------------------
+def _text(values) -> pd.Series:
+    return pd.Series(values, copy=False).astype("string").fillna("").str.strip()
+
+
+def _ipv4_octets(text: pd.Series):
+    octets = text.str.extract(_IPV4_RE).astype(float).to_numpy()
+    valid = ~np.isnan(octets).any(axis=1) & (np.nan_to_num(octets) <= 255).all(axis=1)
+    return octets, valid
+
+
+def encode_ipv4(values) -> np.ndarray:
+    """uint32 codes; missing and malformed addresses become 0."""
+    text = _text(values)
+    octets, valid = _ipv4_octets(text)
+    codes = np.zeros(len(text), dtype=np.uint32)
+    codes[valid] = octets[valid] @ np.array([1 << 24, 1 << 16, 1 << 8, 1], dtype=float)
+    _report_invalid("IPv4", text, valid)
+    return codes
+
+
+def decode_ipv4(codes) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.uint32)
+    octets = codes.astype(">u4").view(np.uint8).reshape(-1, 4)
+    text = _OCTETS[octets[:, 0]]
+    for k in (1, 2, 3):
+        text = np.strings.add(np.strings.add(text, "."), _OCTETS[octets[:, k]])
+    text[codes == MISSING_IP] = ""
+    return text.astype(object)
+
+
+def _hex_bytes(values, size: int, kind: str, report: bool = True):
+    """(rows, size) uint8 array parsed from hex text, and the row validity mask."""
+    text = _text(values).str.replace(_SEPARATORS, "", regex=True)
+    valid = (text.str.len() == 2 * size).to_numpy() & text.map(str.isascii).to_numpy(dtype=bool)
+    digits = np.where(valid, text.to_numpy(dtype=object), "0" * 2 * size).astype(f"S{2 * size}")
+    nibbles = _NIBBLE[digits.view(np.uint8).reshape(-1, 2 * size)]
+    valid &= (nibbles != 255).all(axis=1)
+    nibbles[~valid] = 0
+    if report:
+        _report_invalid(kind, text, valid)
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2], valid
+
+
+def _format_hex(raw: np.ndarray, digits: np.ndarray, width: int, separator: bytes) -> np.ndarray:
+    """Lower-case hex text of each row of ``raw`` with ``separator`` between digit groups."""
+    chars = np.full((len(raw), width), separator[0], dtype=np.uint8)
+    hex_digits = np.empty((len(raw), 2 * raw.shape[1]), dtype=np.uint8)
+    hex_digits[:, 0::2] = _HEX[raw >> 4]
+    hex_digits[:, 1::2] = _HEX[raw & 15]
+    chars[:, digits] = hex_digits
+    return chars.view(f"S{width}").ravel().astype(str).astype(object)
+
+
+def encode_mac(values) -> np.ndarray:
+    """uint64 codes (48 significant bits); missing and malformed addresses become 0."""
+    raw, _ = _hex_bytes(values, 6, "MAC address")
+    padded = np.zeros((len(raw), 8), dtype=np.uint8)
+    padded[:, 2:] = raw
+    return padded.view(">u8").ravel().astype(np.uint64)
+
+
+def decode_mac(codes) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.uint64)
+    raw = codes.astype(">u8").view(np.uint8).reshape(-1, 8)[:, 2:]
+    text = _format_hex(raw, _MAC_DIGITS, 17, b":")
+    text[codes == MISSING_MAC] = ""
+    return text
+
+
+def encode_uuid(values) -> pd.Series:
+    """16-byte values in an Arrow ``fixed_size_binary[16]`` column; missing / malformed -> nil UUID."""
+    import pyarrow as pa
+
+    index = values.index if isinstance(values, pd.Series) else None
+    raw, _ = _hex_bytes(values, 16, "UUID")
+    array = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(raw), [None, pa.py_buffer(raw.tobytes())])
+    return pd.Series(pd.arrays.ArrowExtensionArray(array), index=index)
+
+
+def decode_uuid(codes) -> np.ndarray:
+    import pyarrow as pa
+
+    array = pa.array(codes, type=pa.binary(16))
+    raw = np.frombuffer(array.buffers()[1], dtype=np.uint8, count=16 * len(array),
+                        offset=16 * array.offset).reshape(-1, 16)
+    text = _format_hex(raw, _UUID_DIGITS, 36, b"-")
+    text[~raw.any(axis=1)] = ""
+    return text
+
+
+def is_valid(values, kind: str) -> np.ndarray:
+    """Rows of ``values`` that are empty or well-formed for ``kind`` (no warnings logged)."""
+    text = _text(values)
+    if kind == "ipv4":
+        valid = _ipv4_octets(text)[1]
+    elif kind in ("mac", "uuid"):
+        valid = _hex_bytes(text, 6 if kind == "mac" else 16, kind, report=False)[1]
+    else:
+        return np.ones(len(text), dtype=bool)
+    return valid | (text == "").to_numpy()
+
+
+def _report_invalid(kind: str, text: pd.Series, valid: np.ndarray):
+    bad = int((~np.asarray(valid) & (text != "").to_numpy()).sum())
+    if bad:
+        logger.warning(f"{bad} malformed {kind} values stored as missing")
+
+
+# -----------------------
+# Frames
+# -----------------------
+_ENCODED_DTYPES = {"ipv4": np.dtype(np.uint32), "mac": np.dtype(np.uint64)}
+
+
+def is_encoded(series: pd.Series, kind: str) -> bool:
+    if kind == "uuid":
+        return str(series.dtype) == "fixed_size_binary[16][pyarrow]"
+    if kind == "category":
+        return isinstance(series.dtype, pd.CategoricalDtype)
+    return series.dtype == _ENCODED_DTYPES[kind]
+
+
+def encode_series(series: pd.Series, kind: str) -> pd.Series:
+    if is_encoded(series, kind):
+        return series
+    if kind == "category":
+        return series.astype("category")
+    if kind == "uuid":
+        return encode_uuid(series).rename(series.name)
+    codes = encode_ipv4(series) if kind == "ipv4" else encode_mac(series)
+    return pd.Series(codes, index=series.index, name=series.name)
+
+
+def decode_series(series: pd.Series, kind: str) -> pd.Series:
+    """Display text for an encoded column (categoricals are left as they are)."""
+    if kind == "category" or not is_encoded(series, kind):
+        return series
+    decode = {"ipv4": decode_ipv4, "mac": decode_mac, "uuid": decode_uuid}[kind]
+    return pd.Series(decode(series.to_numpy() if kind != "uuid" else series.array),
+                     index=series.index, name=series.name)
+
+
+def encode_value(value, kind: str):
+    """A display value in the encoded domain of ``kind`` (raises ValueError if malformed)."""
+    if kind == "ipv4":
+        return ip_to_int(str(value))
+    if kind == "mac":
+        return mac_to_int(str(value))
+    if kind == "uuid":
+        return uuid_to_bytes(str(value))
+    return value
+
+
+def encode_frame(df: pd.DataFrame, kinds: Dict[str, str] = COLUMN_KINDS) -> pd.DataFrame:
+    """Copy of ``df`` with every column named in ``kinds`` stored compactly."""
+    columns = {c: encode_series(df[c], kind) for c, kind in kinds.items() if c in df.columns}
+    return df.assign(**columns) if columns else df
+
+
+def decode_frame(df: pd.DataFrame, kinds: Dict[str, str] = COLUMN_KINDS) -> pd.DataFrame:
+    """Copy of ``df`` with encoded identifier columns turned back into text, for display."""
+    columns = {c: decode_series(df[c], kind) for c, kind in kinds.items()
+               if c in df.columns and kind != "category"}
+    return df.assign(**columns) if columns else df
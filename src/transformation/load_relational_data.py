@@ -1,27 +1,22 @@
 # src/transformation/load_relational_data.py
 
-import sys
 from pathlib import Path
-import csv
-from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
+
+import pandas as pd
 
 # -----------------------
 # Repo root and paths
 # -----------------------
 REPO_ROOT = Path(__file__).resolve().parents[2]  # repo root
-SRC_PATH = REPO_ROOT / "src"
-TRANS_PATH = SRC_PATH / "transformation"
-
-sys.path.append(str(SRC_PATH))
-sys.path.append(str(TRANS_PATH))
-sys.path.append(str(REPO_ROOT))
 
 # -----------------------
 # Imports
 # -----------------------
-from src.utils.logger import get_logger
+from utils.logger import get_logger
+from utils.metrics import stage, timed
 from transformation.relational_model import Organization, Asset, DeviceClass, Device, Interface, Event
+from transformation.validation import QUARANTINE_DIR, validate_tables
 
 # -----------------------
 # Logger setup
@@ -36,194 +31,133 @@ DATA_DIR = REPO_ROOT / "data" / "raw"
 # -----------------------
 # Utility
 # -----------------------
-def clean_row(row: dict) -> dict:
-    """Strip whitespace from keys and values."""
-    return {k.strip(): v.strip() if isinstance(v, str) else v for k, v in row.items()}
+def columns(table: pd.DataFrame, *names: str):
+    """Row tuples of ``names`` as plain Python values (NA -> None)."""
+    values = [table[n].astype(object).where(table[n].notna(), None).tolist() for n in names]
+    return zip(*values)
 
 # -----------------------
-# Loaders
+# Builders (rows are already validated by transformation.validation)
 # -----------------------
-def load_organizations() -> Dict[int, Organization]:
-    file = DATA_DIR / "organization" / "organization.csv"
+def build_organizations(table: pd.DataFrame) -> Dict[int, Organization]:
     organizations = {}
-    logger.info("Loading organizations from: %s", file)
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-        for row in reader:
-            row = clean_row(row)
-            org = Organization(
-                organization_id=int(row.get("organization_id") or 0),
-                org_name=row.get("name") or row.get("org_name") or "",
-                org_industry=row.get("industry") or row.get("org_industry") or "",
-                org_address=row.get("address") or row.get("org_address") or "",
-                org_email=row.get("contact_email") or row.get("org_email") or "",
-                org_phone=row.get("contact_phone") or row.get("org_phone") or "",
-                org_country=row.get("country") or ""  # new
-            )
-            organizations[org.organization_id] = org
+    for org_id, name, industry, address, email, phone, country in columns(
+            table, "organization_id", "name", "industry", "address", "contact_email", "contact_phone", "country"):
+        organizations[org_id] = Organization(
+            organization_id=org_id,
+            org_name=name,
+            org_industry=industry,
+            org_address=address,
+            org_email=email,
+            org_phone=phone,
+            org_country=country
+        )
     return organizations
 
 
-def load_device_classes() -> Dict[int, DeviceClass]:
-    file = DATA_DIR / "device_class" / "device_class.csv"
+def build_device_classes(table: pd.DataFrame) -> Dict[int, DeviceClass]:
     device_classes = {}
-    logger.info("Loading device_classes from: %s", file)
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-        for row in reader:
-            row = clean_row(row)
-            dc = DeviceClass(
-                device_class_id=int(row.get("device_class_id") or 0),
-                device_class_name=row.get("device_class_name") or row.get("name") or "",
-                device_class_description=row.get("device_class_description") or row.get("description") or ""
-            )
-            device_classes[dc.device_class_id] = dc
+    for dc_id, name, description in columns(table, "device_class_id", "name", "description"):
+        device_classes[dc_id] = DeviceClass(
+            device_class_id=dc_id,
+            device_class_name=name,
+            device_class_description=description
+        )
     return device_classes
 
 
-def load_assets(organizations: Dict[int, Organization]) -> Dict[int, Asset]:
-    file = DATA_DIR / "asset" / "assets.csv"
+def build_assets(table: pd.DataFrame, organizations: Dict[int, Organization]) -> Dict[int, Asset]:
     assets = {}
-    logger.info("Loading assets from: %s", file)
-
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-
-        for row in reader:
-            row = clean_row(row)
-            org_id = int(row.get("organization_id") or 0)
-            org = organizations.get(org_id)
-
-            purchase_raw = row.get("purchase_date", "")
-            asset_purchase_date = None
-            if purchase_raw:
-                try:
-                    asset_purchase_date = datetime.strptime(purchase_raw, "%Y-%m-%d").date()
-                except ValueError:
-                    logger.warning(
-                        "Invalid date format for asset_id %s: %s",
-                        row.get("asset_id"),
-                        purchase_raw
-                    )
-
-            asset = Asset(
-                asset_id=int(row.get("asset_id") or 0),
-                asset_name=row.get("name") or "",
-                organization=org,
-                asset_location=row.get("location") or "",
-                asset_purchase_date=asset_purchase_date,
-                asset_owner=row.get("owner") or ""
-            )
-            assets[asset.asset_id] = asset
-
+    for asset_id, name, org_id, location, purchased, owner in columns(
+            table, "asset_id", "name", "organization_id", "location", "purchase_date", "owner"):
+        assets[asset_id] = Asset(
+            asset_id=asset_id,
+            asset_name=name,
+            organization=organizations[org_id],
+            asset_location=location,
+            asset_purchase_date=purchased.date() if purchased is not None else None,
+            asset_owner=owner
+        )
     return assets
 
 
-def load_devices(assets: Dict[int, Asset], device_classes: Dict[int, DeviceClass]) -> Dict[int, Device]:
-    file = DATA_DIR / "device" / "devices.csv"
+def build_devices(table: pd.DataFrame, assets: Dict[int, Asset],
+                  device_classes: Dict[int, DeviceClass]) -> Dict[int, Device]:
     devices = {}
-    logger.info("Loading devices from: %s", file)
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-
-        for row in reader:
-            row = clean_row(row)
-            asset_id = int(row.get("asset_id") or 0)
-            device_class_id = int(row.get("device_class_id") or 0)
-
-            device_class = device_classes.get(device_class_id)
-            if device_class is None:
-                logger.error(
-                    "Missing device_class_id %s for device_id %s. Skipping.",
-                    device_class_id, row.get("device_id")
-                )
-                continue  # skip invalid device
-
-            device = Device(
-                device_id=int(row.get("device_id") or 0),
-                device_ip=row.get("ip_address") or "",
-                asset=assets.get(asset_id),
-                device_class=device_class,
-                device_serial=row.get("serial_number") or "",
-                device_manufacturer=row.get("manufacturer") or ""
-            )
-            devices[device.device_id] = device
+    for device_id, asset_id, dc_id, ip, serial, manufacturer in columns(
+            table, "device_id", "asset_id", "device_class_id", "ip_address", "serial_number", "manufacturer"):
+        devices[device_id] = Device(
+            device_id=device_id,
+            device_ip=ip,
+            asset=assets[asset_id],
+            device_class=device_classes[dc_id],
+            device_serial=serial,
+            device_manufacturer=manufacturer
+        )
     return devices
 
 
-def load_interfaces(devices: Dict[int, Device]) -> Dict[int, Interface]:
-    file = DATA_DIR / "interface" / "interfaces.csv"
+def build_interfaces(table: pd.DataFrame, devices: Dict[int, Device]) -> Dict[int, Interface]:
     interfaces = {}
-    logger.info("Loading interfaces from: %s", file)
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-
-        for row in reader:
-            row = clean_row(row)
-            device_id = int(row.get("device_id") or 0)
-            interface = Interface(
-                interface_id=int(row.get("interface_id") or 0),
-                interface_name=row.get("interface_name") or "",
-                device=devices.get(device_id),
-                interface_status=row.get("interface_status") or "",
-                interface_mac=row.get("interface_mac") or ""
-            )
-            interfaces[interface.interface_id] = interface
+    for interface_id, device_id, name, mac, status in columns(
+            table, "interface_id", "device_id", "name", "mac_address", "status"):
+        interfaces[interface_id] = Interface(
+            interface_id=interface_id,
+            interface_name=name,
+            device=devices[device_id],
+            interface_status=status,
+            interface_mac=mac
+        )
     return interfaces
 
 
-def load_events(devices: Dict[int, Device], interfaces: Dict[int, Interface]) -> Dict[int, Event]:
-    file = DATA_DIR / "event" / "events.csv"
+def build_events(table: pd.DataFrame, devices: Dict[int, Device],
+                 interfaces: Dict[int, Interface]) -> Dict[int, Event]:
     events = {}
-    logger.info("Loading events from: %s", file)
-    with open(file, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        reader.fieldnames = [h.strip() for h in reader.fieldnames]
-
-        for row in reader:
-            row = clean_row(row)
-            device_id = int(row.get("device_id") or 0)
-            interface_id = row.get("interface_id")
-            device = devices.get(device_id)
-            interface = interfaces.get(int(interface_id)) if interface_id else None
-
-            timestamp_str = row.get("event_timestamp") or row.get("timestamp") or ""
-            try:
-                if "T" in timestamp_str:
-                    event_timestamp = datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%S")
-                else:
-                    event_timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            except (ValueError, TypeError):
-                logger.warning(
-                    "Invalid timestamp for event_id %s: %s",
-                    row.get("event_id"), timestamp_str
-                )
-                event_timestamp = datetime.now()
-
-            event = Event(
-                event_id=int(row.get("event_id") or 0),
-                event_timestamp=event_timestamp,
-                device=device,
-                interface=interface,
-                event_type=row.get("event_type") or "",
-                event_description=row.get("event_description") or ""
-            )
-            events[event.event_id] = event
+    timestamps = table["event_timestamp"].dt.to_pydatetime().tolist()
+    for (event_id, device_id, interface_id, event_type, description), timestamp in zip(columns(
+            table, "event_id", "device_id", "interface_id", "event_type", "event_description"), timestamps):
+        events[event_id] = Event(
+            event_id=event_id,
+            event_timestamp=timestamp,
+            device=devices[device_id],
+            interface=interfaces[interface_id] if interface_id is not None else None,
+            event_type=event_type,
+            event_description=description
+        )
     return events
 
 
-def load_all_data():
-    organizations = load_organizations()
-    device_classes = load_device_classes()
-    assets = load_assets(organizations)
-    devices = load_devices(assets, device_classes)
-    interfaces = load_interfaces(devices)
-    events = load_events(devices, interfaces)
+@timed("load_all_data", rows=lambda db: sum(len(table) for table in db.values()))
+def load_all_data(data_dir: Path = DATA_DIR, quarantine_dir: Optional[Path] = QUARANTINE_DIR):
+    """
+    Validate the raw CSVs under ``data_dir`` (default ``data/raw``) and link the
+    accepted rows into objects. Rejected rows go to ``quarantine_dir``
+    (``None`` to skip writing it).
+    """
+    report = validate_tables(data_dir)
+    if quarantine_dir is not None:
+        report.write_quarantine(quarantine_dir)
+    tables = report.tables
+
+    with stage("load_all_data.organizations") as s:
+        organizations = build_organizations(tables["organizations"])
+        s.rows = len(organizations)
+    with stage("load_all_data.device_classes") as s:
+        device_classes = build_device_classes(tables["device_classes"])
+        s.rows = len(device_classes)
+    with stage("load_all_data.assets") as s:
+        assets = build_assets(tables["assets"], organizations)
+        s.rows = len(assets)
+    with stage("load_all_data.devices") as s:
+        devices = build_devices(tables["devices"], assets, device_classes)
+        s.rows = len(devices)
+    with stage("load_all_data.interfaces") as s:
+        interfaces = build_interfaces(tables["interfaces"], devices)
+        s.rows = len(interfaces)
+    with stage("load_all_data.events") as s:
+        events = build_events(tables["events"], devices, interfaces)
+        s.rows = len(events)
 
     logger.info("Loaded %d organizations", len(organizations))
     logger.info("Loaded %d device_classes", len(device_classes))
@@ -243,4 +177,4 @@ def load_all_data():
 
 
 if __name__ == "__main__":
-    db = load_all_data()
\ No newline at end of file
+    db = load_all_data()
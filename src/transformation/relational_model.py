@@ -3,8 +3,20 @@
 from datetime import datetime, date
 from typing import List, Optional
 
+from transformation.encoding import (
+    bytes_to_uuid, int_to_ip, int_to_mac, intern_str, ip_to_int, mac_to_int, uuid_to_bytes
+)
+
+# Entities use __slots__ and keep identifiers in binary form (IPv4 as an int,
+# MAC as a 48-bit int, serial UUID as 16 bytes) with low-cardinality strings
+# interned. The text attributes are properties that decode on access, and
+# assigning text encodes it (malformed values raise ValueError).
+
 
 class Organization:
+    __slots__ = ("organization_id", "org_name", "org_industry", "org_address", "org_email",
+                 "org_phone", "org_country", "assets")
+
     def __init__(self, organization_id: int, org_name: str, org_industry: str = "",
                  org_address: str = "", org_email: str = "", org_phone: str = "",
                  org_country: str = ""):  # <-- added country
@@ -14,7 +26,7 @@ class Organization:
         self.org_address = org_address
         self.org_email = org_email
         self.org_phone = org_phone
-        self.org_country = org_country  # store country
+        self.org_country = intern_str(org_country)  # store country
         self.assets: List["Asset"] = []
 
     def add_asset(self, asset: "Asset"):
@@ -22,6 +34,9 @@ class Organization:
 
 
 class Asset:
+    __slots__ = ("asset_id", "asset_name", "organization", "asset_location", "asset_purchase_date",
+                 "asset_owner", "devices")
+
     def __init__(self, asset_id: int, asset_name: str, organization: Organization,
                  asset_location: str = "", asset_purchase_date: Optional[date] = None,
                  asset_owner: str = ""):
@@ -33,14 +48,17 @@ class Asset:
         self.asset_owner = asset_owner
         self.devices: List["Device"] = []
 
-        # Link asset to organization
-        organization.add_asset(self)
+        # Link asset to organization if exists
+        if organization is not None:
+            organization.add_asset(self)
 
     def add_device(self, device: "Device"):
         self.devices.append(device)
 
 
 class DeviceClass:
+    __slots__ = ("device_class_id", "device_class_name", "device_class_description", "devices")
+
     def __init__(self, device_class_id: int, device_class_name: str,
                  device_class_description: str = ""):
         self.device_class_id = device_class_id
@@ -53,6 +71,9 @@ class DeviceClass:
 
 
 class Device:
+    __slots__ = ("device_id", "_ip", "asset", "device_class", "_serial", "device_manufacturer",
+                 "interfaces", "events")
+
     def __init__(self, device_id: int, device_ip: str, asset: Asset,
                  device_class: Optional[DeviceClass] = None,  # <-- make optional
                  device_serial: str = "",
@@ -62,7 +83,7 @@ class Device:
         self.asset = asset
         self.device_class = device_class  # can be None if missing
         self.device_serial = device_serial
-        self.device_manufacturer = device_manufacturer
+        self.device_manufacturer = intern_str(device_manufacturer)
         self.interfaces: List["Interface"] = []
         self.events: List["Event"] = []
 
@@ -72,6 +93,22 @@ class Device:
         if device_class is not None:
             device_class.add_device(self)
 
+    @property
+    def device_ip(self) -> str:
+        return int_to_ip(self._ip)
+
+    @device_ip.setter
+    def device_ip(self, value: str):
+        self._ip = ip_to_int(value)
+
+    @property
+    def device_serial(self) -> str:
+        return bytes_to_uuid(self._serial)
+
+    @device_serial.setter
+    def device_serial(self, value: str):
+        self._serial = uuid_to_bytes(value)
+
     def add_interface(self, interface: "Interface"):
         self.interfaces.append(interface)
 
@@ -80,23 +117,35 @@ class Device:
 
 
 class Interface:
+    __slots__ = ("interface_id", "interface_name", "device", "interface_status", "_mac", "events")
+
     def __init__(self, interface_id: int, interface_name: str, device: Device,
                  interface_status: str = "", interface_mac: str = ""):
         self.interface_id = interface_id
         self.interface_name = interface_name
         self.device = device
-        self.interface_status = interface_status
+        self.interface_status = intern_str(interface_status)
         self.interface_mac = interface_mac
         self.events: List["Event"] = []
 
         # Link interface to device
         device.add_interface(self)
 
+    @property
+    def interface_mac(self) -> str:
+        return int_to_mac(self._mac)
+
+    @interface_mac.setter
+    def interface_mac(self, value: str):
+        self._mac = mac_to_int(value)
+
     def add_event(self, event: "Event"):
         self.events.append(event)
 
 
 class Event:
+    __slots__ = ("event_id", "event_timestamp", "device", "interface", "event_type", "event_description")
+
     def __init__(self, event_id: int, event_timestamp: datetime, device: Device,
                  interface: Optional[Interface] = None, event_type: str = "",
                  event_description: str = ""):
@@ -104,7 +153,7 @@ class Event:
         self.event_timestamp = event_timestamp
         self.device = device
         self.interface = interface
-        self.event_type = event_type
+        self.event_type = intern_str(event_type)
         self.event_description = event_description
 
         # Link event to device and interface
@@ -0,0 +1,371 @@
+# src/transformation/snapshots.py
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from transformation.validation import SPECS, read_table_range, validate_table, validate_tables
+from utils.config import get_section
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+
+logger = get_logger("snapshots")
+
+# -----------------------
+# Config
+# -----------------------
+SNAPSHOT_CONFIG = get_section("snapshots")
+SNAPSHOT_DIR = REPO_ROOT / SNAPSHOT_CONFIG.get("dir", "data/processed/snapshots")
+PARTITION_IDS = SNAPSHOT_CONFIG.get("partition_ids", 4096)
+DATA_DIR = REPO_ROOT / "data" / "raw"
+PROCESSED_DIR = REPO_ROOT / "data" / "processed"
+
+# -----------------------
+# Layout
+# -----------------------
+# data/processed/snapshots/
+#     manifest.json                  version, source offsets, totals, current partition files
+#     devices/part-00002-v7.parquet  device_id in [2 * partition_ids, 3 * partition_ids), written at version 7
+#     assets/part-00000-v1.parquet
+#     keys/<table>-v<version>.npy    ids accepted at each version (for key and foreign-key checks of appended rows)
+#
+# Partition files are copy-on-write: an update writes new files for the
+# partitions it touches and then swaps the manifest, so readers always see a
+# consistent version and a crash mid-update leaves the previous one intact.
+DEVICE_COLUMNS = ["device_id", "device_ip", "device_serial", "device_manufacturer", "asset_id",
+                  "org_country", "device_class_id", "num_interfaces", "num_events"]
+ASSET_COLUMNS = ["asset_id", "asset_name", "organization_id", "org_country", "asset_location",
+                 "asset_owner", "asset_purchase_date", "num_devices"]
+SNAPSHOT_KEYS = {"devices": "device_id", "assets": "asset_id"}
+SOURCES = ("assets", "devices", "interfaces", "events")    # append-only, consumed by byte offset
+REFERENCE = ("organizations", "device_classes")            # small, re-read on every update
+
+
+# -----------------------
+# Snapshot rows from validated tables
+# -----------------------
+def _country_map(organizations: pd.DataFrame) -> pd.Series:
+    return pd.Series(organizations["country"].to_numpy(), index=organizations["organization_id"].to_numpy())
+
+
+def asset_rows(assets: pd.DataFrame, countries: pd.Series) -> pd.DataFrame:
+    return pd.DataFrame({
+        "asset_id": assets["asset_id"].astype("int64"),
+        "asset_name": assets["name"],
+        "organization_id": assets["organization_id"].astype("int64"),
+        "org_country": assets["organization_id"].map(countries).fillna(""),
+        "asset_location": assets["location"],
+        "asset_owner": assets["owner"],
+        "asset_purchase_date": assets["purchase_date"].dt.strftime("%Y-%m-%d").fillna(""),
+        "num_devices": np.zeros(len(assets), dtype=np.int64),
+    })
+
+
+def device_rows(devices: pd.DataFrame, asset_countries: pd.Series) -> pd.DataFrame:
+    return pd.DataFrame({
+        "device_id": devices["device_id"].astype("int64"),
+        "device_ip": devices["ip_address"],
+        "device_serial": devices["serial_number"],
+        "device_manufacturer": devices["manufacturer"],
+        "asset_id": devices["asset_id"].astype("int64"),
+        "org_country": devices["asset_id"].map(asset_countries).fillna(""),
+        "device_class_id": devices["device_class_id"].astype("int64"),
+        "num_interfaces": np.zeros(len(devices), dtype=np.int64),
+        "num_events": np.zeros(len(devices), dtype=np.int64),
+    })
+
+
+def _counts(ids: pd.Series) -> pd.Series:
+    """Rows per id (the counter delta contributed by appended child rows)."""
+    return ids.astype("int64").value_counts()
+
+
+# -----------------------
+# Store
+# -----------------------
+class SnapshotStore:
+    """
+    Denormalized device and asset snapshots kept current from the append-only raw CSVs.
+
+    ``build`` computes everything from scratch; ``update`` reads only the bytes
+    appended to each source since the last version, validates them against the
+    keys already in the snapshot, turns them into new rows and counter deltas
+    and rewrites only the partitions those touch.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_DIR, data_dir: Path = DATA_DIR,
+                 partition_ids: int = PARTITION_IDS):
+        self.root = Path(root)
+        self.data_dir = Path(data_dir)
+        self.partition_ids = partition_ids
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def manifest(self) -> Optional[dict]:
+        if not self.manifest_path.exists():
+            return None
+        return json.loads(self.manifest_path.read_text())
+
+    @property
+    def version(self) -> Optional[int]:
+        manifest = self.manifest()
+        return manifest["version"] if manifest else None
+
+    def totals(self) -> Optional[Dict[str, int]]:
+        """Entity and event counts of the current version (no partition reads)."""
+        manifest = self.manifest()
+        return manifest["totals"] if manifest else None
+
+    def read(self, name: str, manifest: Optional[dict] = None) -> pd.DataFrame:
+        """The full ``devices`` or ``assets`` snapshot, ordered by id."""
+        manifest = manifest or self.manifest()
+        columns = DEVICE_COLUMNS if name == "devices" else ASSET_COLUMNS
+        files = [self.root / name / f for _, f in sorted(manifest["partitions"][name].items(), key=lambda p: int(p[0]))]
+        if not files:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)[columns]
+
+    def _keys(self, manifest: dict, table: str) -> pd.Index:
+        arrays = [np.load(self.root / "keys" / f) for f in manifest["keys"][table]]
+        return pd.Index(np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64))
+
+    # -----------------------
+    # Writing
+    # -----------------------
+    def _partition(self, ids) -> np.ndarray:
+        return np.asarray(ids, dtype=np.int64) // self.partition_ids
+
+    def _write_partitions(self, name: str, df: pd.DataFrame, version: int) -> Dict[str, str]:
+        """Write ``df`` (whole partitions) as new versioned files; returns partition -> file name."""
+        (self.root / name).mkdir(parents=True, exist_ok=True)
+        written = {}
+        key = SNAPSHOT_KEYS[name]
+        for part, rows in df.groupby(self._partition(df[key]), sort=True):
+            file_name = f"part-{int(part):05d}-v{version}.parquet"
+            tmp = self.root / name / f".{file_name}.tmp"
+            rows.sort_values(key).to_parquet(tmp, index=False)
+            os.replace(tmp, self.root / name / file_name)
+            written[str(int(part))] = file_name
+        return written
+
+    def _write_keys(self, table: str, ids, version: int) -> Optional[str]:
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return None
+        (self.root / "keys").mkdir(parents=True, exist_ok=True)
+        file_name = f"{table}-v{version}.npy"
+        np.save(self.root / "keys" / file_name, ids)
+        return file_name
+
+    def _commit(self, manifest: dict, previous: Optional[dict]):
+        """Swap in the new manifest, then drop files only the previous version used."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / ".manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.manifest_path)
+        if previous is None:
+            return
+        for name in SNAPSHOT_KEYS:
+            live = set(manifest["partitions"][name].values())
+            for f in set(previous["partitions"][name].values()) - live:
+                (self.root / name / f).unlink(missing_ok=True)
+        live = {f for files in manifest["keys"].values() for f in files}
+        for f in {f for files in previous["keys"].values() for f in files} - live:
+            (self.root / "keys" / f).unlink(missing_ok=True)
+
+    def _source_state(self, name: str, offset: int, rows: int) -> dict:
+        path = self.data_dir / SPECS[name].path
+        with open(path, "rb") as f:
+            header = f.readline()
+        return {"path": str(path), "offset": offset, "rows": rows, "header": header.decode("utf-8-sig").strip()}
+
+    def _reference_signature(self) -> Dict[str, List[int]]:
+        signature = {}
+        for name in REFERENCE:
+            st = (self.data_dir / SPECS[name].path).stat()
+            signature[name] = [st.st_size, st.st_mtime_ns]
+        return signature
+
+    # -----------------------
+    # Full build
+    # -----------------------
+    @timed("snapshots.build")
+    def build(self) -> dict:
+        """Recompute both snapshots from all source rows and publish them as a new version."""
+        previous = self.manifest()
+        version = (previous["version"] + 1) if previous else 1
+
+        frames, sources = {}, {}
+        for name in SOURCES:
+            frames[name], end = read_table_range(SPECS[name], self.data_dir)
+            sources[name] = (end, len(frames[name]))
+        tables = validate_tables(self.data_dir, frames=frames).tables
+
+        assets = asset_rows(tables["assets"], _country_map(tables["organizations"]))
+        assets["num_devices"] = assets["asset_id"].map(_counts(tables["devices"]["asset_id"])).fillna(0).astype("int64")
+        devices = device_rows(tables["devices"], assets.set_index("asset_id")["org_country"])
+        devices["num_interfaces"] = devices["device_id"].map(_counts(tables["interfaces"]["device_id"])).fillna(0).astype("int64")
+        devices["num_events"] = devices["device_id"].map(_counts(tables["events"]["device_id"])).fillna(0).astype("int64")
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "partition_ids": self.partition_ids,
+            "sources": {name: self._source_state(name, *sources[name]) for name in SOURCES},
+            "reference": self._reference_signature(),
+            "partitions": {"devices": self._write_partitions("devices", devices, version),
+                           "assets": self._write_partitions("assets", assets, version)},
+            "keys": {name: [f] for name in SOURCES
+                     if (f := self._write_keys(name, tables[name][SPECS[name].key], version))},
+            "totals": {"assets": len(assets), "devices": len(devices),
+                       "interfaces": len(tables["interfaces"]), "events": len(tables["events"])},
+        }
+        for name in SOURCES:
+            manifest["keys"].setdefault(name, [])
+        self._commit(manifest, previous)
+        logger.info(f"Snapshots v{version} built: {manifest['totals']}")
+        return {"version": version, "full": True}
+
+    # -----------------------
+    # Incremental update
+    # -----------------------
+    def _rebuild_reason(self, manifest: dict) -> Optional[str]:
+        if manifest.get("partition_ids") != self.partition_ids:
+            return "partition size changed"
+        if set(SOURCES) - set(manifest.get("keys", {})):
+            return "manifest predates per-source keys"
+        if manifest.get("reference") != self._reference_signature():
+            return "organizations or device classes changed"
+        for name in SOURCES:
+            state = manifest["sources"][name]
+            path = self.data_dir / SPECS[name].path
+            if state["path"] != str(path) or path.stat().st_size < state["offset"]:
+                return f"{SPECS[name].path} was replaced or truncated"
+            if self._source_state(name, 0, 0)["header"] != state["header"]:
+                return f"{SPECS[name].path} header changed"
+        return None
+
+    @timed("snapshots.update")
+    def update(self) -> dict:
+        """Fold rows appended since the last version into the snapshots (full build when needed)."""
+        manifest = self.manifest()
+        reason = "no snapshot yet" if manifest is None else self._rebuild_reason(manifest)
+        if reason:
+            logger.info(f"Full snapshot build: {reason}")
+            return self.build()
+
+        version = manifest["version"] + 1
+        reference = {name: validate_table(SPECS[name], read_table_range(SPECS[name], self.data_dir)[0], {}).accepted
+                     for name in REFERENCE}
+        parent_keys = {name: pd.Index(df[SPECS[name].key].astype("int64")) for name, df in reference.items()}
+
+        # Appended rows of each source, checked against everything accepted so far
+        appended, sources = {}, dict(manifest["sources"])
+        with stage("snapshots.read_appended") as s:
+            for name in SOURCES:
+                state = manifest["sources"][name]
+                df, end = read_table_range(SPECS[name], self.data_dir, start=state["offset"], first_row=state["rows"])
+                known = self._keys(manifest, name)
+                result = validate_table(SPECS[name], df, parent_keys)
+                result.log()
+                accepted = result.accepted
+                repeated = accepted[SPECS[name].key].astype("int64").isin(known).to_numpy()
+                if repeated.any():
+                    logger.warning(f"{name}: {int(repeated.sum())} appended rows rejected "
+                                   f"(duplicate {SPECS[name].key})")
+                    accepted = accepted.loc[~repeated]
+                parent_keys[name] = known.append(pd.Index(accepted[SPECS[name].key].astype("int64")))
+                appended[name] = accepted
+                sources[name] = {**state, "offset": end, "rows": state["rows"] + len(df)}
+            s.rows = sum(len(df) for df in appended.values())
+
+        if not any(len(df) for df in appended.values()):
+            return {"version": manifest["version"], "full": False, "appended": {}}
+
+        # New rows and counter deltas, grouped by the partition they land in
+        current_assets = self.read("assets", manifest)
+        new_assets = asset_rows(appended["assets"], _country_map(reference["organizations"]))
+        asset_countries = pd.concat([current_assets, new_assets]).set_index("asset_id")["org_country"]
+        new_devices = device_rows(appended["devices"], asset_countries)
+        deltas = {
+            "assets": {"num_devices": _counts(appended["devices"]["asset_id"])},
+            "devices": {"num_interfaces": _counts(appended["interfaces"]["device_id"]),
+                        "num_events": _counts(appended["events"]["device_id"])},
+        }
+        partitions = {name: dict(manifest["partitions"][name]) for name in SNAPSHOT_KEYS}
+        rewritten = {}
+        with stage("snapshots.rewrite") as s:
+            for name, new_rows in (("assets", new_assets), ("devices", new_devices)):
+                key = SNAPSHOT_KEYS[name]
+                touched = set(self._partition(new_rows[key]).tolist())
+                for delta in deltas[name].values():
+                    touched |= set(self._partition(delta.index).tolist())
+                frames = []
+                for part in sorted(touched):
+                    current = manifest["partitions"][name].get(str(part))
+                    parts = [pd.read_parquet(self.root / name / current)] if current else []
+                    parts.append(new_rows[self._partition(new_rows[key]) == part])
+                    frames.append(pd.concat([p for p in parts if len(p)], ignore_index=True))
+                if frames:
+                    df = pd.concat(frames, ignore_index=True)
+                    for column, delta in deltas[name].items():
+                        df[column] = df[column] + df[key].map(delta).fillna(0).astype("int64")
+                    partitions[name].update(self._write_partitions(name, df, version))
+                rewritten[name] = len(touched)
+            s.rows = len(new_assets) + len(new_devices)
+
+        keys = {name: list(manifest["keys"][name]) for name in SOURCES}
+        for name in SOURCES:
+            f = self._write_keys(name, appended[name][SPECS[name].key], version)
+            if f:
+                keys[name].append(f)
+        totals = {name: manifest["totals"][name] + len(appended[name]) for name in SOURCES}
+        self._commit({**manifest, "version": version, "created_at": datetime.now().isoformat(timespec="seconds"),
+                      "sources": sources, "partitions": partitions, "keys": keys, "totals": totals}, manifest)
+
+        summary = {"version": version, "full": False,
+                   "appended": {name: len(df) for name, df in appended.items()},
+                   "partitions_rewritten": rewritten}
+        logger.info(f"Snapshots v{version} updated: {summary}")
+        return summary
+
+    # -----------------------
+    # Export
+    # -----------------------
+    def export_csv(self, out_dir: Path = PROCESSED_DIR):
+        """Write ``devices_snapshot.csv`` and ``assets_snapshot.csv`` (full rewrite) for CSV consumers."""
+        manifest = self.manifest()
+        self.read("devices", manifest).to_csv(Path(out_dir) / "devices_snapshot.csv", index=False)
+        self.read("assets", manifest).to_csv(Path(out_dir) / "assets_snapshot.csv", index=False)
+        logger.info(f"Snapshots v{manifest['version']} exported to {out_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or incrementally update the device / asset snapshots.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--full", action="store_true", help="recompute from all source rows")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="also write devices_snapshot.csv / assets_snapshot.csv under data/processed")
+    args = parser.parse_args()
+
+    store = SnapshotStore(data_dir=args.data_dir)
+    store.build() if args.full else store.update()
+    if args.export_csv:
+        store.export_csv()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# src/transformation/validation.py
+
+import json
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+from transformation.encoding import is_valid
+from utils.config import get_section
+from utils.logger import get_logger
+from utils.metrics import stage, timed
+
+logger = get_logger("validation")
+
+# -----------------------
+# Config
+# -----------------------
+VALIDATION_CONFIG = get_section("validation")
+QUARANTINE_DIR = REPO_ROOT / VALIDATION_CONFIG.get("quarantine_dir", "data/processed/quarantine")
+DATA_DIR = REPO_ROOT / "data" / "raw"
+
+
+# -----------------------
+# Table specs
+# -----------------------
+class TableSpec:
+    """
+    Schema of one raw table: primary key, typed columns (first alias found in
+    the CSV header wins) and foreign keys to tables validated before it.
+
+    Column kinds: int, str, date, datetime, ipv4, mac, uuid. Rows with a bad
+    key, a missing/invalid ``required`` value or an orphan foreign key are
+    rejected; invalid optional values are cleared and counted.
+    """
+
+    def __init__(self, name: str, path: str, key: str, columns: Dict[str, str],
+                 aliases: Optional[Dict[str, Sequence[str]]] = None,
+                 required: Sequence[str] = (), foreign_keys: Optional[Dict[str, str]] = None,
+                 nullable_foreign_keys: Sequence[str] = ()):
+        self.name = name
+        self.path = path
+        self.key = key
+        self.columns = {key: "int", **columns}
+        self.aliases = aliases or {}
+        self.required = [key, *required]
+        self.foreign_keys = foreign_keys or {}
+        self.nullable_foreign_keys = set(nullable_foreign_keys)
+
+
+# Dependency order: parents before children
+TABLES: List[TableSpec] = [
+    TableSpec("organizations", "organization/organization.csv", "organization_id",
+              {"name": "str", "industry": "str", "address": "str", "contact_email": "str",
+               "contact_phone": "str", "country": "str"},
+              aliases={"name": ["org_name"], "industry": ["org_industry"], "address": ["org_address"],
+                       "contact_email": ["org_email"], "contact_phone": ["org_phone"]}),
+    TableSpec("device_classes", "device_class/device_class.csv", "device_class_id",
+              {"name": "str", "description": "str"},
+              aliases={"name": ["device_class_name"], "description": ["device_class_description"]}),
+    TableSpec("assets", "asset/assets.csv", "asset_id",
+              {"name": "str", "organization_id": "int", "location": "str", "purchase_date": "date",
+               "owner": "str"},
+              foreign_keys={"organization_id": "organizations"}),
+    TableSpec("devices", "device/devices.csv", "device_id",
+              {"asset_id": "int", "device_class_id": "int", "ip_address": "ipv4", "serial_number": "uuid",
+               "manufacturer": "str"},
+              aliases={"ip_address": ["device_ip"], "serial_number": ["device_serial"],
+                       "manufacturer": ["device_manufacturer"]},
+              foreign_keys={"asset_id": "assets", "device_class_id": "device_classes"}),
+    TableSpec("interfaces", "interface/interfaces.csv", "interface_id",
+              {"device_id": "int", "name": "str", "mac_address": "mac", "status": "str"},
+              aliases={"name": ["interface_name"], "mac_address": ["interface_mac"],
+                       "status": ["interface_status"]},
+              foreign_keys={"device_id": "devices"}),
+    TableSpec("events", "event/events.csv", "event_id",
+              {"event_timestamp": "datetime", "device_id": "int", "interface_id": "int",
+               "event_type": "str", "event_description": "str"},
+              aliases={"event_timestamp": ["timestamp"]},
+              required=["event_timestamp"],
+              foreign_keys={"device_id": "devices", "interface_id": "interfaces"},
+              nullable_foreign_keys=["interface_id"]),
+]
+SPECS: Dict[str, TableSpec] = {spec.name: spec for spec in TABLES}
+
+
+# -----------------------
+# Column checks (whole columns at once)
+# -----------------------
+def _parse(text: pd.Series, kind: str):
+    """(typed values, valid mask) for non-empty cells; empty cells are reported as invalid."""
+    present = (text != "").to_numpy()
+    if kind == "int":
+        numbers = pd.to_numeric(text, errors="coerce")
+        valid = numbers.notna().to_numpy() & (numbers == np.floor(numbers)).to_numpy()
+        return numbers.where(valid).astype("Int64"), valid
+    if kind in ("date", "datetime"):
+        fmt = "%Y-%m-%d" if kind == "date" else "ISO8601"
+        # utc=True: rows with a "Z" / "+02:00" suffix are converted instead of failing the whole column
+        parsed = pd.to_datetime(text.where(present), format=fmt, errors="coerce", utc=True).dt.tz_localize(None)
+        return parsed, parsed.notna().to_numpy()
+    return text, present & is_valid(text, kind)
+
+
+def read_table(spec: TableSpec, data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """The raw CSV as stripped strings under the spec's canonical column names."""
+    return read_table_range(spec, data_dir)[0]
+
+
+def read_table_range(spec: TableSpec, data_dir: Path = DATA_DIR, start: int = 0, stop: Optional[int] = None,
+                     first_row: int = 0):
+    """
+    Rows stored in bytes ``[start, stop)`` of the CSV (``start`` 0 = after the
+    header), cut at the last complete line. Returns the frame, indexed from
+    ``first_row``, and the byte offset just past the last row read, so an
+    append-only file can be consumed incrementally.
+    """
+    path = Path(data_dir) / spec.path
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(start, len(header)))
+        body = f.read(None if stop is None else max(stop - f.tell(), 0))
+    body = body[:body.rfind(b"\n") + 1]
+    end = max(start, len(header)) + len(body)
+
+    df = pd.read_csv(BytesIO(header + body), dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    df.index += first_row
+    df.columns = df.columns.str.strip()
+    for column, aliases in spec.aliases.items():
+        if column not in df.columns:
+            found = next((a for a in aliases if a in df.columns), None)
+            if found is not None:
+                df = df.rename(columns={found: column})
+    missing = [c for c in spec.required + list(spec.foreign_keys) if c not in df.columns
+               and c not in spec.nullable_foreign_keys]
+    if missing:
+        raise ValueError(f"{path} is missing required columns: {missing}")
+    for column in spec.columns:
+        df[column] = df[column].str.strip() if column in df.columns else ""
+    return df, end
+
+
+class TableResult:
+    """Accepted (typed) rows of one table plus its rejected rows and issue counts."""
+
+    def __init__(self, name: str, accepted: pd.DataFrame, rejected: pd.DataFrame,
+                 reasons: Dict[str, int], cleared: Dict[str, int]):
+        self.name = name
+        self.accepted = accepted
+        self.rejected = rejected
+        self.reasons = reasons
+        self.cleared = cleared
+
+    def summary(self) -> dict:
+        return {"rows": len(self.accepted) + len(self.rejected), "accepted": len(self.accepted),
+                "rejected": len(self.rejected), "reasons": self.reasons, "cleared": self.cleared}
+
+    def log(self):
+        """One warning line per rejection / clearing reason."""
+        for reason, count in {**self.reasons, **self.cleared}.items():
+            action = "rejected" if reason in self.reasons else "cleared"
+            logger.warning(f"{self.name}: {count} rows {action} ({reason})")
+
+
+def validate_table(spec: TableSpec, df: pd.DataFrame, parent_keys: Dict[str, pd.Index]) -> TableResult:
+    """Type, key and foreign-key checks for a whole table with vectorized set membership."""
+    typed = pd.DataFrame(index=df.index)
+    checks = []                                      # (reason, failing-row mask), in priority order
+    cleared = {}
+
+    for column, kind in spec.columns.items():
+        text = df[column]
+        values, valid = _parse(text, kind)
+        present = (text != "").to_numpy()
+        if column in spec.required:
+            checks.append((f"missing {column}", ~present))
+            checks.append((f"invalid {column}", present & ~valid))
+        elif column in spec.foreign_keys:
+            if column not in spec.nullable_foreign_keys:
+                checks.append((f"missing {column}", ~present))
+            checks.append((f"invalid {column}", present & ~valid))
+        elif (present & ~valid).any():
+            cleared[f"invalid {column}"] = int((present & ~valid).sum())
+            values = values.where(valid, pd.NaT if kind in ("date", "datetime") else "")
+        typed[column] = values
+
+    keys = typed[spec.key]
+    checks.append((f"duplicate {spec.key}", (keys.duplicated(keep="first") & keys.notna()).to_numpy()))
+    for column, parent in spec.foreign_keys.items():
+        refs = typed[column]
+        orphan = refs.notna().to_numpy() & ~refs.isin(parent_keys[parent]).to_numpy()
+        if column in spec.nullable_foreign_keys:
+            if orphan.any():
+                cleared[f"unknown {column}"] = int(orphan.sum())
+                typed[column] = refs.mask(orphan)
+        else:
+            checks.append((f"unknown {column}", orphan))
+
+    reasons = {reason: int(mask.sum()) for reason, mask in checks if mask.any()}
+    if reasons:
+        masks = [mask for _, mask in checks]
+        rejected_rows = np.logical_or.reduce(masks)
+        first_reason = np.select(masks, [reason for reason, _ in checks], default="")
+    else:
+        rejected_rows = np.zeros(len(df), dtype=bool)
+        first_reason = np.full(len(df), "")
+
+    rejected = pd.DataFrame({
+        "table": spec.name,
+        "line": df.index[rejected_rows] + 2,             # header is line 1
+        "reason": first_reason[rejected_rows],
+        "record": df.loc[rejected_rows].to_json(orient="records", lines=True).splitlines()
+        if rejected_rows.any() else [],
+    })
+    return TableResult(spec.name, typed.loc[~rejected_rows].reset_index(drop=True), rejected, reasons, cleared)
+
+
+# -----------------------
+# All tables
+# -----------------------
+class ValidationReport:
+    def __init__(self, results: Dict[str, TableResult]):
+        self.results = results
+
+    @property
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        return {name: result.accepted for name, result in self.results.items()}
+
+    @property
+    def rejected(self) -> pd.DataFrame:
+        return pd.concat([r.rejected for r in self.results.values()], ignore_index=True)
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: result.summary() for name, result in self.results.items()}
+
+    def write_quarantine(self, out_dir: Path = QUARANTINE_DIR):
+        """``quarantine.csv`` (one line per rejected row: table, line, reason, raw record) and ``summary.json``."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.rejected.to_csv(out_dir / "quarantine.csv", index=False)
+        summary = {"created_at": datetime.now().isoformat(timespec="seconds"), "tables": self.summary()}
+        (out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+        return out_dir
+
+
+@timed("validate_tables", rows=lambda report: sum(len(t) for t in report.tables.values()))
+def validate_tables(data_dir: Path = DATA_DIR, specs: Sequence[TableSpec] = TABLES,
+                    frames: Optional[Dict[str, pd.DataFrame]] = None) -> ValidationReport:
+    """
+    Validate every raw table in dependency order; children are checked against
+    accepted parent keys. ``frames`` supplies already-read tables by name.
+    """
+    results: Dict[str, TableResult] = {}
+    parent_keys: Dict[str, pd.Index] = {}
+    frames = frames or {}
+    for spec in specs:
+        with stage(f"validate.{spec.name}") as s:
+            df = frames[spec.name] if spec.name in frames else read_table(spec, data_dir)
+            result = validate_table(spec, df, parent_keys)
+            s.rows = len(result.accepted) + len(result.rejected)
+        results[spec.name] = result
+        parent_keys[spec.name] = pd.Index(result.accepted[spec.key].astype("int64"))
+        result.log()
+    return ValidationReport(results)
+
+
+if __name__ == "__main__":
+    report = validate_tables()
+    logger.info(f"Quarantine written to {report.write_quarantine()}")
@@ -0,0 +1,24 @@
+# src/utils/config.py
+
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = REPO_ROOT / "config.yaml"
+
+
+@lru_cache(maxsize=None)
+def load_config(path: Path = CONFIG_PATH) -> dict:
+    """Load ``config.yaml`` once per process. Missing or empty files yield ``{}``."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_section(name: str, path: Path = CONFIG_PATH) -> dict:
+    """Return a top-level config section (``{}`` when absent)."""
+    return load_config(path).get(name) or {}
@@ -1,39 +1,110 @@
 # src/utils/logger.py
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
-LOG_FILE = "logs/pipeline.log"  # consolidated log
+# Consolidated log under the repo root whatever the working directory (env var wins)
+LOG_FILE = os.environ.get("DEVICE_HEALTH_LOG_FILE", str(Path(__file__).resolve().parents[2] / "logs" / "pipeline.log"))
 MAX_BYTES = 5 * 1024 * 1024     # 5 MB
 BACKUP_COUNT = 3                # keep last 3 log files
 
+# Background (queue) logging: hot paths only enqueue records; a single
+# listener thread formats them and does the console/file I/O.
+# Enable with DEVICE_HEALTH_LOG_QUEUE=1 or configure_logging(queue_mode=True).
+QUEUE_MODE = os.environ.get("DEVICE_HEALTH_LOG_QUEUE", "0") == "1"
+
+_FORMATTER = logging.Formatter(
+    '%(asctime)s | %(levelname)s | %(filename)s::%(funcName)s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+_managed_loggers = []   # loggers configured by get_logger
+_queue = None
+_listener = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+def _build_handlers(level=logging.NOTSET):
+    # Console handler
+    ch = logging.StreamHandler()
+    ch.setLevel(level)
+    ch.setFormatter(_FORMATTER)
+
+    # Rotating file handler
+    Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+    fh = RotatingFileHandler(LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, delay=True)
+    fh.setLevel(level)
+    fh.setFormatter(_FORMATTER)
+    return [ch, fh]
+
+
+def _queue_handler():
+    global _queue, _listener
+    if _listener is None:
+        _queue = queue.SimpleQueue()
+        _listener = QueueListener(_queue, *_build_handlers(), respect_handler_level=True)
+        _listener.start()
+    return _DeferredQueueHandler(_queue)
+
+
+def _attach_handlers(logger, level):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        if not isinstance(handler, QueueHandler):
+            handler.close()
+    if QUEUE_MODE:
+        logger.addHandler(_queue_handler())
+    else:
+        for handler in _build_handlers(level):
+            logger.addHandler(handler)
+
+
 def get_logger(name: str, level=logging.INFO):
     """
     Returns a logger that logs to console and a single consolidated file with rollover.
     Log format: YYYY-MM-DD HH:MM:SS | LEVEL | filename::function | message
+    In queue mode the handlers run on a background listener thread.
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
     if not logger.handlers:
-        # Formatter including file name and function
-        formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)s | %(filename)s::%(funcName)s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(level)
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-
-        # Rotating file handler
-        Path("logs").mkdir(parents=True, exist_ok=True)
-        fh = RotatingFileHandler(LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT)
-        fh.setLevel(level)
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
-
-    return logger
\ No newline at end of file
+        _attach_handlers(logger, level)
+        _managed_loggers.append(logger)
+
+    return logger
+
+
+def configure_logging(queue_mode: bool):
+    """Switch every logger created by ``get_logger`` between direct and queue handlers."""
+    global QUEUE_MODE
+    if queue_mode == QUEUE_MODE:
+        return
+    QUEUE_MODE = queue_mode
+    if not queue_mode:
+        shutdown_logging()
+    for logger in _managed_loggers:
+        _attach_handlers(logger, logger.level)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread (safe to call repeatedly)."""
+    global _listener, _queue
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener, _queue = None, None
+
+
+atexit.register(shutdown_logging)
+
@@ -0,0 +1,294 @@
+# src/utils/metrics.py
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource  # POSIX only
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+from utils.config import get_section
+from utils.logger import get_logger
+
+logger = get_logger("metrics")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# -----------------------
+# Settings (config.yaml "metrics" section, env vars win)
+# -----------------------
+METRICS_CONFIG = get_section("metrics")
+# Config paths are relative to the repo root (not the working directory)
+METRICS_FILE = os.environ.get("DEVICE_HEALTH_METRICS_FILE",
+                              str(REPO_ROOT / METRICS_CONFIG.get("file", "logs/metrics.jsonl")))
+METRICS_PORT = int(os.environ.get("DEVICE_HEALTH_METRICS_PORT") or METRICS_CONFIG.get("prometheus_port") or 0)
+
+# Opt-in profiling: "cprofile" (deterministic, .prof files for pstats/snakeviz)
+# or "sample" (low-overhead stack sampling, collapsed stacks for flamegraph.pl/speedscope)
+PROFILE_MODE = os.environ.get("DEVICE_HEALTH_PROFILE", METRICS_CONFIG.get("profile") or "")
+PROFILE_STAGES = set(filter(None, os.environ.get(
+    "DEVICE_HEALTH_PROFILE_STAGES", ",".join(METRICS_CONFIG.get("profile_stages") or [])
+).split(",")))  # empty = every stage
+PROFILE_DIR = REPO_ROOT / METRICS_CONFIG.get("profile_dir", "logs/profiles")
+SAMPLE_INTERVAL = METRICS_CONFIG.get("sample_interval_ms", 5) / 1000
+
+RUN_ID = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+
+_lock = threading.Lock()
+_stack = threading.local()
+_totals: Dict[str, Counter] = defaultdict(Counter)   # per-stage aggregates for /metrics
+_server = None
+
+
+# -----------------------
+# Resource probes
+# -----------------------
+def peak_rss_bytes() -> Optional[int]:
+    """Process high-water RSS (``None`` where ``resource`` is unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+# -----------------------
+# Stage records
+# -----------------------
+class StageRecord:
+    """Mutable handle yielded by ``stage``; set ``rows`` once the row count is known."""
+
+    def __init__(self, name: str, rows: Optional[int] = None, parent: Optional[str] = None):
+        self.name = name
+        self.rows = rows
+        self.parent = parent
+        self.extra: dict = {}
+        self.result: Optional[dict] = None   # the written metrics line, set when the stage ends
+
+    def as_dict(self) -> dict:
+        return {"run_id": RUN_ID, "stage": self.name, "parent": self.parent,
+                "rows": self.rows, **self.extra}
+
+
+def _write(record: dict):
+    path = Path(METRICS_FILE)
+    line = json.dumps(record, default=str)
+    with _lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        totals = _totals[record["stage"]]
+        totals["runs"] += 1
+        totals["wall_seconds"] += record["wall_seconds"]
+        totals["cpu_seconds"] += record["cpu_seconds"]
+        totals["rows"] += record["rows"] or 0
+        if record["peak_rss_bytes"] is not None:
+            totals["peak_rss_bytes"] = max(totals["peak_rss_bytes"], record["peak_rss_bytes"])
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None):
+    """
+    Time a pipeline stage and append one JSON line to ``METRICS_FILE``:
+    wall/CPU seconds, process peak RSS (and its growth during the stage),
+    row count and rows/s. Stages nest; each record names its parent.
+
+        with stage("aggregate", rows=len(df)) as s:
+            out = aggregate(df)
+            s.extra["output_rows"] = len(out)
+    """
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+    names: List[str] = _stack.__dict__.setdefault("names", [])
+    record = StageRecord(name, rows, parent=names[-1] if names else None)
+    names.append(name)
+
+    profiler = _start_profiler(name)
+    rss_before = peak_rss_bytes()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    status = "ok"
+    try:
+        yield record
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rss_after = peak_rss_bytes()
+        names.pop()
+        if profiler is not None:
+            _stack.profilers.remove(profiler)
+            record.extra["profile"] = profiler.stop()
+
+        result = record.as_dict()
+        result.update({
+            "status": status,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(cpu, 6),
+            "peak_rss_bytes": rss_after,
+            "peak_rss_growth_bytes": (rss_after - rss_before) if rss_after is not None else None,
+            "rows_per_second": round(record.rows / wall, 1) if record.rows and wall > 0 else None,
+        })
+        record.result = result
+        _write(result)
+        logger.info("stage %s: %.3fs wall, %.3fs cpu, rows=%s, peak_rss=%s MB",
+                    name, wall, cpu, record.rows,
+                    f"{rss_after / 2**20:.0f}" if rss_after is not None else "n/a")
+
+
+def timed(name: Optional[str] = None, rows: Optional[Callable] = None):
+    """
+    Decorator form of ``stage``. ``rows`` maps the return value to a row count,
+    e.g. ``@timed("load_all_data", rows=lambda db: len(db["events"]))``.
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as record:
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    record.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+
+# -----------------------
+# Opt-in profilers
+# -----------------------
+def _profile_path(name: str, suffix: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR / f"{name.replace('/', '_')}-{RUN_ID}{suffix}"
+
+
+class _CProfileHook:
+    def __init__(self, name: str):
+        self.path = _profile_path(name, ".prof")
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self) -> str:
+        self.profiler.disable()
+        self.profiler.dump_stats(self.path)
+        return str(self.path)
+
+
+class _SamplingHook:
+    """Samples the calling thread's stack every ``SAMPLE_INTERVAL`` from a helper thread."""
+
+    def __init__(self, name: str):
+        self.path = _profile_path(name, ".collapsed")
+        self.thread_id = threading.get_ident()
+        self.samples: Counter = Counter()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        self._done.set()
+        self._thread.join()
+        with open(self.path, "w", encoding="utf-8") as f:
+            for collapsed, count in self.samples.most_common():
+                f.write(f"{collapsed} {count}\n")
+        return str(self.path)
+
+
+def _start_profiler(name: str):
+    if not PROFILE_MODE or (PROFILE_STAGES and name not in PROFILE_STAGES):
+        return None
+    if PROFILE_MODE == "cprofile":
+        # cProfile is per-process; nested profiled stages are covered by the outer one
+        if any(isinstance(p, _CProfileHook) for p in _stack.__dict__.get("profilers", [])):
+            return None
+        hook = _CProfileHook(name)
+    elif PROFILE_MODE == "sample":
+        hook = _SamplingHook(name)
+    else:
+        logger.warning("Unknown profile mode %r (expected 'cprofile' or 'sample')", PROFILE_MODE)
+        return None
+    _stack.__dict__.setdefault("profilers", []).append(hook)
+    return hook
+
+
+# -----------------------
+# Prometheus text endpoint
+# -----------------------
+def render_prometheus() -> str:
+    """Per-stage totals in the Prometheus text exposition format."""
+    metrics = [
+        ("pipeline_stage_runs_total", "counter", "runs", "Completed runs of the stage"),
+        ("pipeline_stage_wall_seconds_total", "counter", "wall_seconds", "Wall time spent in the stage"),
+        ("pipeline_stage_cpu_seconds_total", "counter", "cpu_seconds", "CPU time spent in the stage"),
+        ("pipeline_stage_rows_total", "counter", "rows", "Rows processed by the stage"),
+        ("pipeline_stage_peak_rss_bytes", "gauge", "peak_rss_bytes", "Process peak RSS seen at stage end"),
+    ]
+    with _lock:
+        snapshot = {name: dict(totals) for name, totals in _totals.items()}
+    lines = []
+    for metric, kind, key, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for stage_name, totals in sorted(snapshot.items()):
+            lines.append(f'{metric}{{stage="{stage_name}"}} {totals.get(key, 0)}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serve ``/metrics`` on a daemon thread (idempotent, local-only by default)."""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server or None
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            _server = False  # don't retry on every stage
+            logger.warning("Metrics endpoint not started on %s:%d: %s", host, port, e)
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Metrics endpoint: http://%s:%d/metrics", host, port)
+    return _server
@@ -0,0 +1,53 @@
+# tests/conftest.py
+
+import os
+
+# Keep test runs from appending stage metrics to logs/metrics.jsonl
+os.environ.setdefault("DEVICE_HEALTH_METRICS_FILE", os.devnull)
+
+import pandas as pd
+import pytest
+
+
+def write_csv(path, rows, columns):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+
+def append_csv(path, rows, columns):
+    pd.DataFrame(rows, columns=columns).to_csv(path, mode="a", header=False, index=False)
+
+
+EVENT_COLUMNS = ["event_id", "event_timestamp", "device_id", "interface_id", "org_country",
+                 "event_type", "event_description"]
+INTERFACE_COLUMNS = ["interface_id", "device_id", "name", "mac_address", "status"]
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """A tiny, valid raw data tree (2 organizations, 2 assets, 3 devices, 3 interfaces, 3 events)."""
+    root = tmp_path / "raw"
+    write_csv(root / "organization" / "organization.csv",
+              [[1, "Nexora", "IT", "", "noc@nexora.com", "", "USA"],
+               [2, "BlueWave", "Banking", "", "noc@bluewave.ca", "", "Canada"]],
+              ["organization_id", "name", "industry", "address", "contact_email", "contact_phone", "country"])
+    write_csv(root / "device_class" / "device_class.csv",
+              [[1, "Router", ""], [2, "Switch", ""]], ["device_class_id", "name", "description"])
+    write_csv(root / "asset" / "assets.csv",
+              [[1, "db-1", 1, "Berlin", "2024-01-02", "Ann"], [2, "db-2", 2, "Toronto", "2023-05-06", "Bob"]],
+              ["asset_id", "name", "organization_id", "location", "purchase_date", "owner"])
+    write_csv(root / "device" / "devices.csv",
+              [[1, 1, 1, "10.0.0.1", "ca736c01-915e-4d81-aed4-953eaa0cacbf", "Acme"],
+               [2, 1, 2, "10.0.0.2", "6e243272-0f5d-4052-a5f9-7496e6d80a50", "Acme"],
+               [3, 2, 1, "10.0.0.3", "0b7c6c7e-27a9-4cf4-9a43-5d8f6e1f2a10", "Initech"]],
+              ["device_id", "asset_id", "device_class_id", "ip_address", "serial_number", "manufacturer"])
+    write_csv(root / "interface" / "interfaces.csv",
+              [[1, 1, "eth0", "72:49:ab:d9:98:75", "up"], [2, 1, "eth1", "24:95:78:7e:73:87", "down"],
+               [3, 3, "eth0", "02:00:00:00:00:03", "up"]],
+              INTERFACE_COLUMNS)
+    write_csv(root / "event" / "events.csv",
+              [[10, "2025-07-17 23:56:41", 1, 1, "", "link_down", ""],
+               [11, "2025-07-18 01:00:00", 1, "", "", "high_cpu", ""],
+               [12, "2025-07-18 02:30:00", 3, 3, "", "error", ""]],
+              EVENT_COLUMNS)
+    return root
@@ -0,0 +1,87 @@
+# tests/test_anomaly_detection.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import models.anomaly_detection as anomaly_detection
+from models.anomaly_detection import BatchAnomalyScorer, StreamingAnomalyDetector, window_features
+
+
+def test_sparse_and_negative_device_ids():
+    detector = StreamingAnomalyDetector(metrics=["total_events"], warmup=3)
+    ids = np.array([-7, 10**12, 3])
+    for _ in range(5):
+        detector.update(ids, [[2.0], [2.0], [2.0]])
+    result = detector.update(np.array([3, -7, 42]), [[2.0], [50.0], [1.0]])
+
+    assert result["is_anomaly"].tolist() == [False, True, False]
+    assert detector.device_ids.tolist() == [-7, 3, 10**12, 42]
+    assert detector.state_frame().set_index("device_id")["windows_seen"].to_dict() == {-7: 6, 3: 6, 10**12: 5, 42: 1}
+
+
+def windows_frame():
+    """Two regular device classes (1: noisy counts, 2: sparse failures) and a small class 3."""
+    rng = np.random.default_rng(0)
+    noisy = pd.DataFrame({"device_class_id": 1, "total_events": rng.poisson(20, 200) + 1,
+                          "failure_events": rng.binomial(5, 0.2, 200)})
+    sparse = pd.DataFrame({"device_class_id": 2, "total_events": 10,
+                           "failure_events": (np.arange(150) % 10 < 3).astype(int)})
+    small = pd.DataFrame({"device_class_id": 3, "total_events": rng.poisson(5, 20) + 1, "failure_events": 0})
+    df = pd.concat([noisy, sparse, small], ignore_index=True)
+    df["device_id"] = np.arange(len(df))
+    df.loc[7, ["total_events", "failure_events"]] = [400, 380]        # planted spike in class 1
+    return df
+
+
+def test_robust_scorer_uses_per_class_median_and_mad_with_fleet_fallback():
+    df = windows_frame()
+    scorer = BatchAnomalyScorer(min_class_rows=100, n_jobs=1).fit(df)
+    features = window_features(df)
+
+    assert scorer.classes_.tolist() == [1, 2]
+    assert scorer._class_positions(np.array([1, 2, 3, 99])).tolist() == [1, 2, 0, 0]
+    np.testing.assert_allclose(scorer.medians_[0], np.median(features, axis=0))
+    np.testing.assert_allclose(scorer.medians_[1], np.median(features[df["device_class_id"] == 1], axis=0))
+
+    # class 2 failures are mostly 0, so MAD == 0 and the scale is 1.2533 * mean absolute deviation
+    failures = features[df["device_class_id"] == 2, 1]
+    assert np.median(np.abs(failures - np.median(failures))) == 0
+    assert scorer.scales_[2, 1] == pytest.approx(1.2533 * np.abs(failures).mean())
+
+    scored = scorer.score(df)
+    assert scored.loc[7, "is_anomaly"]
+    assert scored["is_anomaly"].sum() == 1
+    small = df["device_class_id"] == 3
+    expected = ((features[small] - scorer.medians_[0]) / scorer.scales_[0]).max(axis=1)
+    np.testing.assert_allclose(scored.loc[small, "anomaly_score"], expected)
+
+
+def test_isolation_forest_flags_match_each_class_model_predict():
+    df = windows_frame()
+    scorer = BatchAnomalyScorer(method="isolation_forest", contamination=0.05, min_class_rows=100,
+                                chunk_size=100, n_jobs=1).fit(df)
+    scored = scorer.score(df)
+    features = window_features(df)
+    pos = scorer._class_positions(df["device_class_id"].to_numpy())
+
+    assert sorted(scorer.models_) == [0, 1, 2]
+    for cls, model in scorer.models_.items():
+        rows = pos == cls
+        np.testing.assert_array_equal(scored.loc[rows, "is_anomaly"], model.predict(features[rows]) == -1)
+    assert scored.loc[7, "is_anomaly"]
+
+
+def test_backfill_writes_scored_history(tmp_path, monkeypatch):
+    df = windows_frame()
+    df.drop(columns="device_class_id").assign(timestamp="2025-07-01 00:00:00") \
+        .to_csv(tmp_path / "aggregated_device_1h.csv", index=False)
+    df[["device_id", "device_class_id"]].to_csv(tmp_path / "devices_snapshot.csv", index=False)
+    monkeypatch.setattr(anomaly_detection, "AGGREGATED_DEVICE_PATH", tmp_path / "aggregated_device_1h.csv")
+    monkeypatch.setattr(anomaly_detection, "DEVICES_SNAPSHOT_PATH", tmp_path / "devices_snapshot.csv")
+    monkeypatch.setattr(anomaly_detection, "ANOMALY_OUTPUT_DIR", tmp_path / "anomaly")
+
+    path = anomaly_detection.backfill("device", n_jobs=1)
+    scored = pd.read_parquet(path)
+    assert path == tmp_path / "anomaly" / "device_anomalies_robust.parquet"
+    assert len(scored) == len(df) and scored.loc[scored["is_anomaly"], "device_id"].tolist() == [7]
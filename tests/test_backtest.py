@@ -0,0 +1,36 @@
+# tests/test_backtest.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from models.backtest import label_times, run_backtest
+
+
+def test_label_time_is_the_next_window_of_the_same_device():
+    keys = {"device_id": np.array([2, 1, 1, 2, 1]),
+            "timestamp": pd.to_datetime(["2025-07-01 00:00", "2025-07-01 00:00", "2025-07-01 01:00",
+                                         "2025-07-10 00:00", "2025-07-20 00:00"]).to_numpy()}
+    expected = pd.to_datetime(["2025-07-10 00:00", "2025-07-01 01:00", "2025-07-20 00:00",
+                               "2025-07-10 00:00", "2025-07-20 00:00"]).to_numpy()
+    np.testing.assert_array_equal(label_times(keys), expected)
+
+
+def test_training_excludes_rows_labelled_from_windows_past_the_cut():
+    rng = np.random.default_rng(0)
+    hours = pd.date_range("2025-07-01", periods=96, freq="1h")
+    # Device 1 reports hourly; device 2 reports once early on and next only at the very end,
+    # so its first row's target comes from a window after every cut-point.
+    device = np.r_[np.ones(len(hours), dtype=np.int64), 2, 2]
+    timestamp = np.r_[hours.to_numpy(), np.datetime64("2025-07-01T00:30", "ns"), hours[-1].to_datetime64()]
+    y = np.r_[rng.integers(0, 2, len(hours)), 1, 0].astype(np.int8)
+    matrix = SimpleNamespace(X=rng.random((len(y), 3), dtype=np.float32), y=y,
+                             keys={"device_id": device, "timestamp": timestamp})
+
+    results = run_backtest(matrix, step="24h", horizon="1h", embargo=None, model="forest", workers=1)
+    label = label_times(matrix.keys)
+    for cut, train_rows in zip(results["cut"], results["train_rows"]):
+        cut = np.datetime64(cut, "ns")
+        assert train_rows == int(((timestamp < cut) & (label < cut)).sum())
+        assert train_rows < int((timestamp < cut).sum())
@@ -0,0 +1,49 @@
+# tests/test_change_feed.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from services.change_feed import MAX_NEW_EVENTS, ChangeFeed, diff_snapshots
+
+
+def snapshot(events: int, statuses: dict):
+    df = pd.DataFrame({"event_id": np.arange(events), "device_id": 1})
+    counts = pd.Series(statuses).value_counts().to_dict()
+    return SimpleNamespace(counts={"Devices": len(statuses), "Events": events}, health_status=statuses,
+                           health_counts=counts, event_ids=df["event_id"].to_numpy(),
+                           tables={"events": SimpleNamespace(df=df)})
+
+
+def test_diff_snapshots_reports_only_what_changed():
+    old = snapshot(3, {1: "Healthy", 2: "Healthy"})
+    assert diff_snapshots(old, snapshot(3, {1: "Healthy", 2: "Healthy"})) == {}
+
+    delta = diff_snapshots(old, snapshot(5, {1: "Healthy", 2: "Critical", 3: "Warning"}))
+    assert delta["counts"] == {"Devices": 3, "Events": 5}
+    assert delta["health_counts"] == {"Healthy": 1, "Critical": 1, "Warning": 1}
+    assert delta["changed_statuses"] == {2: "Critical", 3: "Warning"}
+    assert delta["new_event_count"] == 2
+    assert [e["event_id"] for e in delta["new_events"]] == [3, 4]
+
+
+def test_new_events_are_capped():
+    delta = diff_snapshots(snapshot(1, {1: "Healthy"}), snapshot(MAX_NEW_EVENTS + 11, {1: "Healthy"}))
+    assert delta["new_event_count"] == MAX_NEW_EVENTS + 10
+    assert len(delta["new_events"]) == MAX_NEW_EVENTS
+
+
+def test_feed_merges_deltas_since_the_client_version():
+    feed = ChangeFeed(max_entries=2)
+    feed.publish(1, {}, totals={"counts": {"Events": 1}})
+    feed.publish(2, {"changed_statuses": {1: "Warning"}, "new_event_count": 2}, totals={"counts": {"Events": 3}})
+    feed.publish(3, {"changed_statuses": {1: "Critical", 2: "Warning"}, "new_event_count": 1},
+                 totals={"counts": {"Events": 4}})
+
+    assert feed.since(3) is None
+    assert feed.since(1) == {"version": 3, "changed_statuses": {1: "Critical", 2: "Warning"}, "new_event_count": 3}
+    assert feed.since(2) == {"version": 3, "changed_statuses": {1: "Critical", 2: "Warning"}, "new_event_count": 1}
+    # Older than the retained window (or a new client): absolute totals instead of a delta
+    assert feed.since(0) == {"version": 3, "reset": True, "counts": {"Events": 4}}
+    assert feed.since(None)["reset"]
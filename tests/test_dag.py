@@ -0,0 +1,116 @@
+# tests/test_dag.py
+
+import threading
+
+import pytest
+
+from pipeline.dag import Pipeline, Stage
+from pipeline.run_pipeline import build_dag
+
+
+def copy_stage(name, src, dst, calls, **kwargs):
+    def run():
+        calls.append(name)
+        dst.write_text(src.read_text() + f"|{name}")
+    return Stage(name, run, inputs=[src], outputs=[dst], **kwargs)
+
+
+@pytest.fixture
+def chain(tmp_path):
+    """raw.txt -> a -> a.txt -> b -> b.txt, with the calls made so far."""
+    raw, calls = tmp_path / "raw.txt", []
+    raw.write_text("v1")
+    stages = [copy_stage("a", raw, tmp_path / "a.txt", calls),
+              copy_stage("b", tmp_path / "a.txt", tmp_path / "b.txt", calls)]
+    return (lambda **kw: Pipeline(stages, cache_path=tmp_path / "cache.json").run(**kw)), raw, calls
+
+
+def statuses(results):
+    return {name: result["status"] for name, result in results.items()}
+
+
+def test_unchanged_stages_are_cached_and_changed_inputs_rerun(chain, tmp_path):
+    run, raw, calls = chain
+    assert statuses(run()) == {"a": "ran", "b": "ran"}
+    assert statuses(run()) == {"a": "cached", "b": "cached"}
+
+    raw.write_text("v2")
+    assert statuses(run()) == {"a": "ran", "b": "ran"}
+    assert (tmp_path / "b.txt").read_text() == "v2|a|b"
+
+    (tmp_path / "b.txt").unlink()
+    assert statuses(run()) == {"a": "cached", "b": "ran"}
+    assert statuses(run(targets=["a"], force=True)) == {"a": "ran"}
+    assert calls == ["a", "b", "a", "b", "b", "a"]
+
+
+def test_dry_run_marks_downstream_stale_without_running(chain):
+    run, raw, calls = chain
+    run()
+    raw.write_text("v2")
+    assert statuses(run(dry_run=True)) == {"a": "stale", "b": "stale"}
+    assert calls == ["a", "b"]
+    assert statuses(run()) == {"a": "ran", "b": "ran"}
+
+
+def test_params_and_code_are_part_of_the_stage_key(tmp_path):
+    raw, code, calls = tmp_path / "raw.txt", tmp_path / "stage.py", []
+    raw.write_text("v1")
+    code.write_text("# v1")
+
+    def run(freq):
+        stage = copy_stage("a", raw, tmp_path / "a.txt", calls, code=[code], params={"freq": freq})
+        return statuses(Pipeline([stage], cache_path=tmp_path / "cache.json").run())
+
+    assert [run("1h"), run("1h"), run("15min")] == [{"a": "ran"}, {"a": "cached"}, {"a": "ran"}]
+    code.write_text("# v2")
+    assert run("15min") == {"a": "ran"}
+
+
+def test_failed_stage_skips_its_dependents_and_is_not_cached(tmp_path):
+    raw, calls = tmp_path / "raw.txt", []
+    raw.write_text("v1")
+
+    def broken():
+        calls.append("broken")
+        raise RuntimeError("boom")
+
+    stages = [Stage("broken", broken, inputs=[raw], outputs=[tmp_path / "broken.txt"]),
+              copy_stage("downstream", tmp_path / "broken.txt", tmp_path / "out.txt", calls),
+              copy_stage("independent", raw, tmp_path / "other.txt", calls)]
+    pipeline = Pipeline(stages, cache_path=tmp_path / "cache.json")
+
+    results = pipeline.run()
+    assert statuses(results) == {"broken": "failed", "downstream": "skipped", "independent": "ran"}
+    assert results["broken"]["error"] == "boom"
+    assert statuses(pipeline.run())["broken"] == "failed"
+    assert calls.count("broken") == 2 and "downstream" not in calls
+
+
+def test_stage_missing_its_declared_output_fails(tmp_path):
+    stage = Stage("lazy", lambda: None, outputs=[tmp_path / "never.txt"])
+    result = Pipeline([stage], cache_path=tmp_path / "cache.json").run()["lazy"]
+    assert result["status"] == "failed" and "did not produce" in result["error"]
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    both_started = threading.Barrier(2, timeout=5)   # a sequential runner would time out here
+
+    def meet(path):
+        def run():
+            both_started.wait()
+            path.write_text("done")
+        return run
+
+    stages = [Stage(name, meet(tmp_path / f"{name}.txt"), outputs=[tmp_path / f"{name}.txt"])
+              for name in ("relational", "snapshots")]
+    results = Pipeline(stages, cache_path=tmp_path / "cache.json", max_workers=2).run()
+    assert statuses(results) == {"relational": "ran", "snapshots": "ran"}
+
+
+def test_pipeline_dependencies():
+    upstream = build_dag().upstream
+    assert upstream["relational"] == set() and upstream["snapshots"] == set() and upstream["ingest"] == set()
+    assert upstream["features"] == {"ingest"}
+    assert upstream["train"] == {"features"}
+    assert upstream["predict"] == {"features", "train"}
@@ -0,0 +1,63 @@
+# tests/test_decay.py
+
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from health.decay import DecayedHealthTracker, decay_loads, decayed_health_score
+from health.event_index import EventIndex
+from health.health_scoring import score_all_devices_decayed, score_all_interfaces_decayed
+from health.rules import HealthRules
+from transformation.relational_model import Asset, Device, Event
+
+RULES = HealthRules.from_config({"decay": {"half_life_hours": 24, "failure_penalty": 10}})
+NOW = datetime(2025, 7, 2)
+# (device_id, hours before NOW, failures): one failure now, one a day ago plus one now,
+# three now, and one half a day ago
+FAILURES = [(1, 0, 1), (2, 24, 1), (2, 0, 1), (3, 0, 3), (4, 12, 1)]
+EXPECTED = {1: 90.0, 2: 85.0, 3: 70.0, 4: 100 - 10 / math.sqrt(2)}   # 92.93
+
+
+def test_incremental_tracker_matches_batch_decay():
+    tracker = DecayedHealthTracker(RULES)
+    for device_id, hours, failures in reversed(FAILURES):      # out of order on purpose
+        tracker.update(device_id, NOW - timedelta(hours=hours), failures)
+    assert tracker.scores(NOW) == pytest.approx(EXPECTED)
+    assert tracker.score(99, NOW) == 100.0
+
+    # batch: the same windows plus an empty one for device 4 at NOW to read its load there
+    agg = pd.DataFrame([*FAILURES, (4, 0, 0)], columns=["device_id", "hours", "failure_events"])
+    agg["timestamp"] = pd.Timestamp(NOW) - pd.to_timedelta(agg["hours"], unit="h")
+    health = decayed_health_score(agg, "device_id", RULES)
+    assert health.groupby(agg["device_id"]).last().to_dict() == pytest.approx(EXPECTED)
+    assert health.tolist() == pytest.approx([90.0, 90.0, 85.0, 70.0, 90.0, EXPECTED[4]])
+
+    ts = np.array([0.0, 0.0, 12 * 3600.0, 24 * 3600.0])
+    loads = decay_loads(ts, np.array([0, 1, 0, 1]), np.array([1.0, 2.0, 0.0, 1.0]), math.log(2) / (24 * 3600))
+    np.testing.assert_allclose(loads, [1.0, 2.0, 1 / math.sqrt(2), 2.0])
+
+
+def index_with_failures(decay):
+    asset = Asset(1, "rack-1", None)
+    devices = {device_id: Device(device_id, "10.0.0.1", asset) for device_id in EXPECTED}
+    events = {}
+    for event_id, (device_id, hours, failures) in enumerate(
+            (row for row in FAILURES for _ in range(row[2])), start=1):
+        events[event_id] = Event(event_id, NOW - timedelta(hours=hours), devices[device_id], event_type="error")
+    return devices, EventIndex.build(events, rules=RULES, decay=decay)
+
+
+def test_decayed_scorers_use_the_index_trackers():
+    devices, index = index_with_failures(decay=True)
+    assert score_all_devices_decayed(devices, index) == pytest.approx(EXPECTED)
+
+
+def test_decayed_scorers_require_a_decay_index():
+    devices, index = index_with_failures(decay=False)
+    with pytest.raises(ValueError, match="decay=True"):
+        score_all_devices_decayed(devices, index)
+    with pytest.raises(ValueError, match="decay=True"):
+        score_all_interfaces_decayed({}, index)
@@ -0,0 +1,24 @@
+# tests/test_device_health_app.py
+
+import pandas as pd
+
+from services.device_health_app import compute_device_health
+
+
+def test_dashboard_status_uses_score_bands():
+    devices = pd.DataFrame({"device_id": [1, 2, 3, 4]})
+    events = pd.DataFrame({
+        "device_id": [1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3],
+        "event_type": ["high_cpu", "critical_error"] + ["critical_error"] * 5 + ["critical_error"] * 6,
+    })
+    status, counts = compute_device_health(devices, events)
+    # Scores 85 / 50 / 40 / 100. The old exact-score mapping (90 -> Critical, 95 -> Warning, else
+    # Healthy) reported all four as Healthy.
+    assert status == {1: "Healthy", 2: "Warning", 3: "Critical", 4: "Healthy"}
+    assert counts == {"Healthy": 2, "Warning": 1, "Critical": 1}
+
+
+def test_single_critical_error_is_no_longer_critical():
+    status, _ = compute_device_health(pd.DataFrame({"device_id": [7]}),
+                                      pd.DataFrame({"device_id": [7], "event_type": ["critical_error"]}))
+    assert status == {7: "Healthy"}     # score 90: Critical under the old exact-score mapping
@@ -0,0 +1,61 @@
+# tests/test_encoding.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from transformation.encoding import (
+    bytes_to_uuid, decode_frame, decode_series, encode_frame, encode_series, encode_value,
+    int_to_ip, int_to_mac, ip_to_int, is_valid, mac_to_int, uuid_to_bytes,
+)
+
+IPS = ["10.0.0.1", "255.255.255.255", "", "192.168.1.20"]
+MACS = ["72:49:ab:d9:98:75", "", "02:00:00:00:00:01", "ff:ff:ff:ff:ff:ff"]
+UUIDS = ["ca736c01-915e-4d81-aed4-953eaa0cacbf", "", "6e243272-0f5d-4052-a5f9-7496e6d80a50",
+         "00000000-0000-0000-0000-000000000001"]
+
+
+@pytest.mark.parametrize("kind, values", [("ipv4", IPS), ("mac", MACS), ("uuid", UUIDS)])
+def test_series_round_trip(kind, values):
+    series = pd.Series(values, name="col")
+    encoded = encode_series(series, kind)
+    assert encode_series(encoded, kind) is encoded          # already encoded: left alone
+    assert decode_series(encoded, kind).tolist() == values
+
+
+def test_scalar_codecs_agree_with_vectorized_ones():
+    ips = encode_series(pd.Series(IPS), "ipv4").to_numpy()
+    assert [ip_to_int(v) for v in IPS] == ips.tolist()
+    assert [int_to_ip(int(c)) for c in ips] == IPS
+    macs = encode_series(pd.Series(MACS), "mac").to_numpy()
+    assert [mac_to_int(v) for v in MACS] == macs.tolist()
+    assert [int_to_mac(int(c)) for c in macs] == MACS
+    assert [bytes_to_uuid(uuid_to_bytes(v)) for v in UUIDS] == UUIDS
+
+
+def test_alternative_spellings_are_normalized():
+    assert decode_series(encode_series(pd.Series(["72-49-AB-D9-98-75"]), "mac"), "mac").tolist() == [MACS[0]]
+    assert mac_to_int("7249.abd9.9875") == mac_to_int(MACS[0])
+    assert bytes_to_uuid(uuid_to_bytes("{" + UUIDS[0].upper() + "}")) == UUIDS[0]
+
+
+def test_malformed_values_are_invalid_and_stored_as_missing():
+    values = pd.Series(["10.0.0.256", "10.0.0", "not an ip", "", "10.0.0.1"])
+    assert is_valid(values, "ipv4").tolist() == [False, False, False, True, True]
+    assert encode_series(values, "ipv4").tolist() == [0, 0, 0, 0, ip_to_int("10.0.0.1")]
+    with pytest.raises(ValueError):
+        encode_value("10.0.0.256", "ipv4")
+    with pytest.raises(ValueError):
+        uuid_to_bytes("ca736c01")
+
+
+def test_frame_round_trip_keeps_other_columns():
+    df = pd.DataFrame({"device_id": [1, 2, 3, 4], "ip_address": IPS, "serial_number": UUIDS,
+                       "manufacturer": ["Acme", "Acme", "Initech", "Acme"]})
+    encoded = encode_frame(df)
+    assert encoded["ip_address"].dtype == np.uint32
+    assert isinstance(encoded["manufacturer"].dtype, pd.CategoricalDtype)
+    decoded = decode_frame(encoded)
+    pd.testing.assert_frame_equal(decoded.drop(columns="manufacturer"), df.drop(columns="manufacturer"),
+                                  check_dtype=False)
+    assert decoded["manufacturer"].astype(str).tolist() == df["manufacturer"].tolist()
@@ -0,0 +1,58 @@
+# tests/test_event_ingest.py
+
+import numpy as np
+import pandas as pd
+
+from health.event_ingest import ACCEPTED, DUPLICATE, TOO_LATE, EventIngestor
+from health.window_aggregation import aggregate_entity
+
+
+def events_frame(n, rng):
+    start = pd.Timestamp("2025-07-01")
+    return pd.DataFrame({
+        "event_id": np.arange(1, n + 1),
+        "timestamp": start + pd.to_timedelta(np.sort(rng.integers(0, 5 * 86400, n)), unit="s"),
+        "device_id": rng.integers(1, 6, n),
+        "interface_id": np.where(rng.random(n) < 0.3, np.nan, rng.integers(1, 11, n)),
+        "is_failure": (rng.random(n) < 0.2).astype(int),
+    })
+
+
+def test_incremental_aggregates_match_a_batch_recomputation(tmp_path):
+    rng = np.random.default_rng(0)
+    events = events_frame(2_000, rng)
+    # redeliver some recent events, and one event from well past the lateness horizon
+    stream = pd.concat([events, events.tail(300).sample(100, random_state=1)], ignore_index=True)
+    stream.loc[len(stream)] = [99_999, pd.Timestamp("2025-06-01"), 1, np.nan, 1]
+
+    ingestor = EventIngestor(tmp_path / "ingest", max_lateness_hours=48)
+    statuses = []
+    for batch, start in enumerate(range(0, len(stream), 500), 1):
+        statuses.append(ingestor.ingest(stream.iloc[start:start + 500]))
+        if batch % 2 == 0:
+            ingestor.commit()
+            ingestor = EventIngestor(tmp_path / "ingest", max_lateness_hours=48)   # resume from disk
+    ingestor.commit()
+    status = np.concatenate(statuses)
+
+    assert (status == ACCEPTED).sum() == len(events)
+    assert (status[len(events):-1] == DUPLICATE).all()
+    assert status[-1] == TOO_LATE
+    assert ingestor.totals["duplicates"] == 100 and ingestor.totals["too_late"] == 1
+
+    accepted = stream.loc[status == ACCEPTED]
+    for id_col in ("device_id", "interface_id"):
+        expected = aggregate_entity(accepted, id_col, ingestor.freq)
+        got = EventIngestor(tmp_path / "ingest").aggregates[id_col].frame()
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_exact=False, rtol=1e-9)
+
+
+def test_replaying_a_committed_batch_accepts_nothing(tmp_path):
+    events = events_frame(300, np.random.default_rng(1))
+    ingestor = EventIngestor(tmp_path / "ingest")
+    ingestor.ingest(events)
+    ingestor.commit()
+
+    replay = EventIngestor(tmp_path / "ingest")
+    assert (replay.ingest(events) == DUPLICATE).all()
+    assert replay.totals["accepted"] == len(events)
@@ -0,0 +1,54 @@
+# tests/test_feature_matrix.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from features.feature_engineering import FEATURE_COLS, save_features
+from features.feature_matrix import load_features
+from models.failure_prediction import FailurePredictionModel
+
+
+def features_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "device_id": np.repeat([1, 2], n // 2),
+        "timestamp": pd.date_range("2025-07-01", periods=n, freq="h"),
+        "total_events": rng.integers(1, 20, n),
+        "failure_events": rng.integers(0, 3, n),
+        "health_score": rng.uniform(50, 100, n),
+        "failure_rate": rng.random(n),
+        "rolling_failure_3": rng.random(n),
+        "target": rng.integers(0, 2, n),
+    })
+
+
+def test_features_for_another_csv_are_not_shadowed_by_the_default_matrix(tmp_path):
+    matrix_dir = tmp_path / "feature_matrix"
+    save_features(features_frame(20, 0), tmp_path / "device_features.csv", matrix_dir)
+    other = features_frame(8, 1)
+    other.to_csv(tmp_path / "other.csv", index=False)
+
+    X, y = FailurePredictionModel().load_data(path=tmp_path / "other.csv", matrix_dir=matrix_dir)
+    np.testing.assert_array_equal(X, other[FEATURE_COLS].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(y, other["target"])
+
+    own = load_features(tmp_path / "device_features.csv", FEATURE_COLS, matrix_dir)
+    assert isinstance(own.X, np.memmap) and len(own) == 20
+
+
+def test_rewritten_csv_rebuilds_the_matrix_and_other_columns_convert_the_csv(tmp_path):
+    csv_path, matrix_dir = tmp_path / "device_features.csv", tmp_path / "feature_matrix"
+    save_features(features_frame(20, 0), csv_path, matrix_dir)
+    rewritten = features_frame(12, 2)
+    rewritten.to_csv(csv_path, index=False)
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    matrix = load_features(csv_path, FEATURE_COLS, matrix_dir)
+    np.testing.assert_array_equal(matrix.X, rewritten[FEATURE_COLS].to_numpy(dtype=np.float32))
+    assert isinstance(load_features(csv_path, FEATURE_COLS, matrix_dir).X, np.memmap)
+
+    subset = load_features(csv_path, FEATURE_COLS[:2], matrix_dir)
+    assert subset.columns == FEATURE_COLS[:2] and not isinstance(subset.X, np.memmap)
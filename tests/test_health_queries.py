@@ -0,0 +1,47 @@
+# tests/test_health_queries.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from health.health_queries import highest_k, highest_k_series, latest_per_entity, lowest_k, lowest_k_series
+
+SCORES = {"a": 50.0, "b": 20.0, "c": 50.0, "d": 20.0, "e": 90.0, "f": 50.0, "g": np.nan}
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 4, 7, 20])
+def test_series_queries_match_a_stable_sort(k):
+    series = pd.Series(SCORES)
+    pd.testing.assert_series_equal(lowest_k_series(series, k), series.sort_values(kind="stable").head(k))
+    pd.testing.assert_series_equal(highest_k_series(series, k),
+                                   series.sort_values(ascending=False, kind="stable").head(k))
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 4, 6, 20])
+def test_dict_queries_match_a_stable_sort(k):
+    scores = {key: value for key, value in SCORES.items() if not np.isnan(value)}
+    reference = pd.Series(scores)
+    assert lowest_k(scores, k) == list(reference.sort_values(kind="stable").head(k).items())
+    assert highest_k(scores, k) == list(reference.sort_values(ascending=False, kind="stable").head(k).items())
+
+
+def test_ties_are_resolved_by_position_on_larger_inputs():
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.integers(0, 5, 1_000).astype(float))
+    for k in (1, 10, 250, 999):
+        pd.testing.assert_series_equal(lowest_k_series(series, k), series.sort_values(kind="stable").head(k))
+        pd.testing.assert_series_equal(highest_k_series(series, k),
+                                       series.sort_values(ascending=False, kind="stable").head(k))
+
+
+def test_latest_per_entity_takes_the_first_row_at_the_latest_time():
+    df = pd.DataFrame({
+        "device_id": [1, 2, 1, 2, 1, 3],
+        "timestamp": pd.to_datetime(["2025-07-01 02:00", "2025-07-01 01:00", "2025-07-01 03:00",
+                                     "2025-07-01 01:00", "2025-07-01 03:00", "2025-07-01 00:00"]),
+        "health_score": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+    })
+    reference = (df.sort_values("timestamp", ascending=False, kind="stable")
+                 .drop_duplicates("device_id").set_index("device_id")["health_score"].sort_index())
+    pd.testing.assert_series_equal(latest_per_entity(df, "device_id").sort_index(), reference)
+    assert latest_per_entity(df, "device_id").to_dict() == {1: 30.0, 2: 20.0, 3: 60.0}
@@ -0,0 +1,27 @@
+# tests/test_health_scoring.py
+
+from datetime import datetime
+
+from health.event_index import EventIndex
+from health.health_scoring import (calculate_device_health, calculate_interface_health, score_all_devices,
+                                   score_all_interfaces)
+from transformation.relational_model import Asset, Device, Event, Interface
+
+
+def test_legacy_and_indexed_scores_normalize_event_types_alike():
+    asset = Asset(1, "rack-1", None)
+    devices = {1: Device(1, "10.0.0.1", asset), 2: Device(2, "10.0.0.2", asset)}
+    interfaces = {10: Interface(10, "eth0", devices[1])}
+    at = datetime(2025, 7, 1)
+    types = [(1, 10, " ERROR "), (1, 10, "Down\t"), (1, None, "info"), (2, None, "failure "), (2, None, None)]
+    events = {i: Event(i, at, devices[d], interfaces.get(f), event_type=t)
+              for i, (d, f, t) in enumerate(types, start=1)}
+
+    index = EventIndex.build(events)
+    assert index.event_type_counts() == {"error": 1, "down": 1, "info": 1, "failure": 1, "": 1}
+    device_scores = score_all_devices(devices, events, index)
+    interface_scores = score_all_interfaces(interfaces, events, index)
+    assert device_scores == {1: calculate_device_health(devices[1], devices[1].events),
+                             2: calculate_device_health(devices[2], devices[2].events)}
+    assert interface_scores == {10: calculate_interface_health(interfaces[10], interfaces[10].events)}
+    assert interface_scores[10] == 0.0
@@ -0,0 +1,45 @@
+# tests/test_registry.py
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from models.registry import ModelRegistry, TreeEnsemble
+
+FEATURES = ["f0", "f1", "f2", "f3"]
+
+
+def training_data(n=400):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n, len(FEATURES))).astype(np.float32)
+    y = ((X[:, 0] + 0.5 * X[:, 1] ** 2 + rng.normal(scale=0.3, size=n)) > 0.5).astype(int)
+    return X, y
+
+
+def test_forest_ensemble_matches_native_predictions():
+    X, y = training_data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    ensemble = TreeEnsemble.from_sklearn_forest(model)
+    assert ensemble.n_trees == 20
+    np.testing.assert_allclose(ensemble.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+
+def test_registered_forest_round_trips_through_memory_mapped_trees(tmp_path):
+    X, y = training_data()
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    registry = ModelRegistry(tmp_path)
+    assert registry.register("failure_model", model, 0.4, FEATURES, metrics={"f1_score": 0.8}) == 1
+
+    loaded = registry.load("failure_model")
+    assert loaded.ensemble is not None and loaded.threshold == 0.4 and loaded.feature_columns == FEATURES
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-6)
+    np.testing.assert_allclose(loaded.native.predict_proba(X), model.predict_proba(X))
+
+
+def test_xgboost_ensemble_matches_native_predictions_with_missing_values():
+    xgboost = pytest.importorskip("xgboost")
+    X, y = training_data()
+    X[::7, 2] = np.nan
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    ensemble = TreeEnsemble.from_xgboost(model.get_booster(), FEATURES)
+    np.testing.assert_allclose(ensemble.predict_proba(X), model.predict_proba(X), atol=1e-5)
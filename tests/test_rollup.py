@@ -0,0 +1,48 @@
+# tests/test_rollup.py
+
+import numpy as np
+import pandas as pd
+
+from health.rollup import HealthRollup
+from services.device_health_app import compute_health_rollup, country_kpis, update_health_rollup
+
+ORGS = pd.DataFrame({"organization_id": [1, 2, 3], "country": ["USA", "Canada", None]})
+ASSETS = pd.DataFrame({"asset_id": [10, 11, 12], "organization_id": [1, 1, 2]})
+DEVICES = pd.DataFrame({"device_id": [100, 101, 102, 103], "asset_id": [10, 11, 12, 99]})
+INTERFACES = pd.DataFrame({"interface_id": [1000, 1001, 1002], "device_id": [100, 100, 102]})
+
+
+def test_counts_roll_up_the_hierarchy():
+    rollup = HealthRollup.from_frames(ORGS, ASSETS, DEVICES, INTERFACES)
+    country = rollup.frame("country")
+    assert country.index.tolist() == ["USA", "Canada", "Unknown"]
+    assert country["organizations"].tolist() == [1, 1, 1]
+    assert country["assets"].tolist() == [2, 1, 0]
+    assert country["devices"].tolist() == [2, 1, 0]          # device 103 has no known asset
+    assert country["interfaces"].tolist() == [2, 1, 0]
+
+
+def test_health_means_and_incremental_update_match_a_full_rollup():
+    rollup = HealthRollup.from_frames(ORGS, ASSETS, DEVICES, INTERFACES)
+    rollup.set_health("device", {100: 90.0, 101: 50.0, 102: 70.0, 103: 10.0})
+    assert rollup.avg_health("country").loc["USA"] == 70.0
+
+    rollup.update("device", 101, "device_health_sum", 80.0)
+    rollup.update("interface", 1002, "alarms", 3.0)     # a metric first seen through update
+    expected = HealthRollup.from_frames(ORGS, ASSETS, DEVICES, INTERFACES)
+    expected.set_health("device", {100: 90.0, 101: 80.0, 102: 70.0, 103: 10.0}, rollup=False)
+    expected.set_leaf("interface", "alarms", {1002: 3.0})
+    for level in ("device", "asset", "organization", "country"):
+        pd.testing.assert_frame_equal(rollup.frame(level), expected.frame(level), check_like=True)
+    assert rollup.avg_health("country").loc["USA"] == 85.0
+
+
+def test_status_changes_update_the_dashboard_rollup_in_place():
+    before = {100: "Healthy", 101: "Healthy", 102: "Warning", 103: "Critical"}
+    after = {100: "Critical", 101: "Healthy", 102: "Healthy", 103: "Critical"}
+    rollup = compute_health_rollup(ORGS, ASSETS, DEVICES, INTERFACES, before)
+    updated = update_health_rollup(rollup, before, after)
+    assert updated is rollup
+    pd.testing.assert_frame_equal(country_kpis(updated),
+                                  country_kpis(compute_health_rollup(ORGS, ASSETS, DEVICES, INTERFACES, after)))
+    assert np.array_equal(country_kpis(updated).set_index("country")["Critical"].to_numpy(), [1, 0, 0])
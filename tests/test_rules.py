@@ -0,0 +1,43 @@
+# tests/test_rules.py
+
+import numpy as np
+import pandas as pd
+
+from health.rules import DEFAULT_RULES, HealthRules, get_rules
+
+
+def test_from_config_falls_back_to_defaults_per_key():
+    rules = HealthRules.from_config({"penalties": {"High_CPU": 7}})
+    assert rules.penalty(" high_cpu ") == 7
+    assert rules.penalty("interface_down") == 0
+    assert rules.max_score == DEFAULT_RULES["max_score"]
+    assert rules.statuses == ["Healthy", "Warning", "Critical"]
+
+
+def test_failure_types_are_normalized():
+    rules = HealthRules.from_config()
+    assert rules.is_failure("ERROR ", "device")
+    assert not rules.is_failure("link_down", "device")
+    assert rules.is_failure("link_down", "interface")
+    np.testing.assert_array_equal(
+        rules.failure_mask(pd.Series(["Down", None, "high_cpu", "down"]), "window"), [True, False, False, True])
+
+
+def test_scalar_and_vectorized_classification_agree():
+    rules = HealthRules.from_config()
+    scores = [-5, 0, 49.9, 50, 79, 80, 100, 120]
+    expected = ["Critical", "Critical", "Critical", "Warning", "Warning", "Healthy", "Healthy", "Healthy"]
+    assert [rules.classify(s) for s in rules.clamp_series(scores)] == expected
+    assert rules.classify_series(rules.clamp_series(scores)).tolist() == expected
+
+
+def test_penalties_and_status_counts():
+    rules = HealthRules.from_config()
+    np.testing.assert_array_equal(rules.penalty_series(pd.Series(["high_cpu", "CRITICAL_ERROR", "other", None])),
+                                  [5, 10, 0, 0])
+    assert rules.status_counts(["Healthy", "Healthy", "Critical"]) == {"Healthy": 2, "Warning": 0, "Critical": 1}
+
+
+def test_get_rules_is_compiled_once_from_config():
+    assert get_rules() is get_rules()
+    assert get_rules().statuses == ["Healthy", "Warning", "Critical"]
@@ -0,0 +1,56 @@
+# tests/test_sharded.py
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from models.sharded import OTHER_SHARD, ShardedFailureModel, plan_shards
+
+
+def labelled(sizes):
+    """Classes and labels with ``(rows, positives)`` per class id."""
+    classes = np.concatenate([np.full(rows, cls) for cls, (rows, _) in sizes.items()])
+    y = np.concatenate([np.arange(rows) < positives for rows, positives in sizes.values()]).astype(int)
+    return classes, y
+
+
+def test_small_classes_are_pooled_and_an_undersized_pool_joins_the_largest_shard():
+    classes, y = labelled({1: (600, 60), 2: (400, 40), 3: (250, 5), 4: (250, 5)})
+    assert plan_shards(classes, y, min_rows=200, min_positives=10) == \
+        {1: "class_1", 2: "class_2", 3: OTHER_SHARD, 4: OTHER_SHARD}
+    assert plan_shards(classes, y, min_rows=200, min_positives=20) == \
+        {1: "class_1", 2: "class_2", 3: "class_1", 4: "class_1"}
+    assert plan_shards(classes, y, min_rows=200, min_positives=10, groups={3: "edge", 4: "edge"}) == \
+        {1: "class_1", 2: "class_2", 3: "edge", 4: "edge"}
+    assert set(plan_shards(classes, y, min_rows=10_000, min_positives=1).values()) == {OTHER_SHARD}
+
+
+def features(n, rng):
+    X = pd.DataFrame({"total_events": rng.poisson(10, n), "failure_events": rng.poisson(1, n),
+                      "failure_rate": rng.random(n)})
+    y = ((X["failure_events"] + rng.normal(0, 1, n)) > 2).astype(int)
+    return X, y
+
+
+def test_rows_are_routed_to_their_shard_and_unseen_classes_to_the_fallback():
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(0)
+    classes = np.repeat([1, 2, 3], [600, 400, 40])
+    X, y = features(len(classes), rng)
+    model = ShardedFailureModel(partial(LogisticRegression, max_iter=1000), min_rows=200, min_positives=10,
+                                max_workers=2)
+    model.train(X, y, classes)
+
+    assert model.routing == {1: "class_1", 2: "class_2", 3: "class_1"}
+    assert sorted(model.shards) == ["class_1", "class_2"] and model.fallback == "class_1"
+    assert model.shard_metrics["class_1"]["rows"] == 640
+
+    X_new, _ = features(90, rng)
+    new_classes = np.tile([2, 3, 9], 30)            # class 9 was never seen in training
+    preds, probs = model.predict(X_new, new_classes)
+    for key, rows in (("class_1", new_classes != 2), ("class_2", new_classes == 2)):
+        expected = model.shards[key].predict_proba(X_new[rows])[:, 1]
+        np.testing.assert_allclose(probs[rows], expected)
+        np.testing.assert_array_equal(preds[rows], (expected >= model.thresholds[key]).astype(int))
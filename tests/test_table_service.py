@@ -0,0 +1,53 @@
+# tests/test_table_service.py
+
+import pandas as pd
+
+from services.table_service import TableSource, split_filter_part
+from transformation.encoding import COLUMN_KINDS, encode_frame
+
+DEVICES = pd.DataFrame({
+    "device_id": [1, 2, 3, 4, 5],
+    "ip_address": ["10.0.0.2", "10.0.0.10", "192.168.1.1", "10.0.0.3", ""],
+    "manufacturer": ["Acme", "Initech", "Acme", "Globex", "Acme"],
+    "HealthStatus": ["Healthy", "Critical", "Warning", "Healthy", "Critical"],
+})
+
+
+def ids(records):
+    return [r["device_id"] for r in records]
+
+
+def test_split_filter_part():
+    assert split_filter_part("{device_id} ge 3") == ("device_id", "ge", 3.0)
+    assert split_filter_part("{HealthStatus} eq \"Critical\"") == ("HealthStatus", "eq", "Critical")
+    assert split_filter_part("{manufacturer} contains Ac") == ("manufacturer", "contains", "Ac")
+
+
+def test_pages_cover_every_row_once():
+    source = TableSource(DEVICES)
+    pages = [source.page(p, 2) for p in range(3)]
+    assert [page_count for _, page_count in pages] == [3, 3, 3]
+    assert [ids(records) for records, _ in pages] == [[1, 2], [3, 4], [5]]
+
+
+def test_sort_and_filter_combine():
+    source = TableSource(DEVICES)
+    records, page_count = source.page(0, 10, sort_by=[{"column_id": "device_id", "direction": "desc"}],
+                                      filter_query="{manufacturer} eq Acme && {device_id} gt 1")
+    assert ids(records) == [5, 3]
+    assert page_count == 1
+    records, page_count = source.page(0, 10, filter_query="{HealthStatus} eq Nothing")
+    assert records == [] and page_count == 1
+
+
+def test_initial_sort_is_kept():
+    source = TableSource(DEVICES, sort_by="device_id", ascending=False)
+    assert ids(source.page(0, 2)[0]) == [5, 4]
+
+
+def test_encoded_columns_sort_numerically_and_filter_on_text():
+    source = TableSource(encode_frame(DEVICES), encodings=COLUMN_KINDS)
+    records, _ = source.page(0, 10, sort_by=[{"column_id": "ip_address", "direction": "asc"}])
+    assert [r["ip_address"] for r in records] == ["", "10.0.0.2", "10.0.0.3", "10.0.0.10", "192.168.1.1"]
+    assert ids(source.page(0, 10, filter_query="{ip_address} eq 10.0.0.10")[0]) == [2]
+    assert ids(source.page(0, 10, filter_query="{ip_address} contains 10.0.0.")[0]) == [1, 2, 4]
@@ -0,0 +1,81 @@
+# tests/test_validation.py
+
+import json
+
+import pandas as pd
+
+from conftest import EVENT_COLUMNS, append_csv
+from transformation.validation import SPECS, validate_table, validate_tables
+
+DEVICE_COLUMNS = ["device_id", "asset_id", "device_class_id", "ip_address", "serial_number", "manufacturer"]
+
+
+def events_frame(timestamps):
+    n = len(timestamps)
+    return pd.DataFrame({
+        "event_id": [str(i) for i in range(1, n + 1)],
+        "event_timestamp": timestamps,
+        "device_id": ["1"] * n,
+        "interface_id": [""] * n,
+        "event_type": ["error"] * n,
+        "event_description": [""] * n,
+    })
+
+
+PARENTS = {"devices": pd.Index([1]), "interfaces": pd.Index([], dtype="int64")}
+
+
+def test_timezone_suffixes_are_converted_not_fatal():
+    df = events_frame(["2025-07-17 23:56:41", "2025-07-17T21:56:41Z", "2025-07-17 23:56:41+02:00"])
+    result = validate_table(SPECS["events"], df, PARENTS)
+    assert result.rejected.empty
+    stamps = result.accepted["event_timestamp"]
+    assert stamps.dt.tz is None
+    assert list(stamps.astype(str)) == ["2025-07-17 23:56:41", "2025-07-17 21:56:41", "2025-07-17 21:56:41"]
+
+
+def test_unparseable_timestamp_is_quarantined():
+    df = events_frame(["2025-07-17 23:56:41", "2025-07-17T21:56:41Z", "yesterday"])
+    result = validate_table(SPECS["events"], df, PARENTS)
+    assert len(result.accepted) == 2
+    assert result.rejected["reason"].tolist() == ["invalid event_timestamp"]
+    assert result.rejected["line"].tolist() == [4]
+
+
+def test_quarantine_lists_rejected_rows_with_their_first_reason(raw_dir, tmp_path):
+    append_csv(raw_dir / "device" / "devices.csv",
+               [[4, 9, 1, "10.0.0.4", "", "Acme"],                  # unknown asset
+                [5, 1, 1, "10.0.0.999", "not-a-uuid", "Acme"],      # bad optional values: cleared, kept
+                [2, 1, 1, "10.0.0.9", "", "Acme"]],                 # duplicate device_id
+               DEVICE_COLUMNS)
+    append_csv(raw_dir / "event" / "events.csv",
+               [[13, "2025-07-19T00:00:00Z", 1, "", "", "error", ""],
+                [14, "2025-07-19 01:00:00+02:00", 5, 77, "", "error", ""],   # unknown interface: cleared
+                [15, "not a time", 1, "", "", "error", ""],
+                [16, "2025-07-19 02:00:00", 4, "", "", "error", ""],          # device was rejected
+                ["x", "2025-07-19 03:00:00", 1, "", "", "error", ""]],
+               EVENT_COLUMNS)
+
+    report = validate_tables(raw_dir)
+    quarantine = pd.read_csv(report.write_quarantine(tmp_path / "quarantine") / "quarantine.csv")
+    assert quarantine[["table", "line", "reason"]].values.tolist() == [
+        ["devices", 5, "unknown asset_id"],
+        ["devices", 7, "duplicate device_id"],
+        ["events", 7, "invalid event_timestamp"],
+        ["events", 8, "unknown device_id"],
+        ["events", 9, "invalid event_id"],
+    ]
+    assert json.loads(quarantine.loc[2, "record"])["event_timestamp"] == "not a time"
+
+    devices = report.tables["devices"].set_index("device_id")
+    assert devices.loc[5, "ip_address"] == "" and devices.loc[5, "serial_number"] == ""
+    assert report.results["devices"].cleared == {"invalid ip_address": 1, "invalid serial_number": 1}
+    events = report.tables["events"].set_index("event_id")
+    assert str(events.loc[14, "event_timestamp"]) == "2025-07-18 23:00:00"
+    assert pd.isna(events.loc[14, "interface_id"])
+
+    summary = json.loads((tmp_path / "quarantine" / "summary.json").read_text())["tables"]
+    assert summary["events"] == {"rows": 8, "accepted": 5, "rejected": 3,
+                                 "reasons": {"invalid event_id": 1, "invalid event_timestamp": 1,
+                                             "unknown device_id": 1},
+                                 "cleared": {"unknown interface_id": 1}}